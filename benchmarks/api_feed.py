@@ -0,0 +1,100 @@
+"""
+Стоимость страницы ленты из 10 постов: сериализация строк values_list
+в JSON против django.core.serializers по объектам моделей, и полный
+запрос GET /api/v1/posts/ против HTML-страницы /. Настройки prod,
+кэш фрагментов отключен, HTML рендерится на каждом запросе.
+
+Запуск из корня репозитория:
+
+    python benchmarks/api_feed.py [--repeat 2000]
+
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "yatube"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
+os.environ.update(
+    YATUBE_ENV="prod",
+    YATUBE_SECRET_KEY="benchmark",
+    YATUBE_ALLOWED_HOSTS="testserver",
+)
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core import serializers  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.http import JsonResponse  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from api.views import FEED_KEYS, POST_FIELDS, serializer  # noqa: E402
+from posts.models import Group, Post  # noqa: E402
+
+
+def timed(function, repeat):
+    function()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    }
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        author = get_user_model().objects.create_user(username="bench")
+        group = Group.objects.create(title="Группа", slug="group")
+        Post.objects.bulk_create(
+            Post(text=f"Пост номер {n} " * 20, author=author, group=group)
+            for n in range(100)
+        )
+        names = list(POST_FIELDS)
+        lookups, serialize = serializer(names, POST_FIELDS)
+        rows = list(
+            Post.objects.order_by("-pub_date", "-pk").values_list(
+                *lookups, *FEED_KEYS
+            )[:10]
+        )
+        posts = list(
+            Post.objects.select_related("author", "group").order_by(
+                "-pub_date", "-pk"
+            )[:10]
+        )
+
+        def api_page():
+            JsonResponse(
+                {"results": [serialize(row) for row in rows], "next": None}
+            )
+
+        def model_page():
+            serializers.serialize("json", posts)
+
+        print(
+            f"сериализация: values_list {timed(api_page, args.repeat):.3f} мс,"
+            f" serializers по моделям {timed(model_page, args.repeat):.3f} мс"
+        )
+        client = Client()
+        repeat = args.repeat // 10
+        api = timed(lambda: client.get("/api/v1/posts/"), repeat)
+        html = timed(lambda: client.get("/"), repeat)
+        print(f"запрос: GET /api/v1/posts/ {api:.2f} мс, GET / {html:.2f} мс")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Время подсказки @username по индексу в памяти на --users случайных
+именах и время первоначальной сборки индекса.
+
+Запуск из корня репозитория:
+
+    python benchmarks/autocomplete.py [--users 1000000]
+
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "yatube"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
+django.setup()
+
+from posts.autocomplete import PrefixIndex  # noqa: E402
+
+ALPHABET = string.ascii_letters + string.digits + "_"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000000)
+    args = parser.parse_args()
+    random.seed(0)
+    names = {
+        "".join(random.choices(ALPHABET, k=random.randint(4, 14)))
+        for _ in range(args.users)
+    }
+    rows = list(enumerate(names, 1))
+    index = PrefixIndex()
+    started = time.perf_counter()
+    index.load(rows)
+    print(
+        f"{len(rows)} имен загружено "
+        f"за {time.perf_counter() - started:.2f} с"
+    )
+    prefixes = [
+        name[:length]
+        for name in random.sample(sorted(names), 1000)
+        for length in (1, 2, 3, 5)
+    ]
+    started = time.perf_counter()
+    for prefix in prefixes:
+        index.search(prefix, 10)
+    elapsed = (time.perf_counter() - started) / len(prefixes) * 1000
+    print(f"подсказка: {elapsed:.4f} мс в среднем")
+    started = time.perf_counter()
+    for pk in range(len(rows) + 1, len(rows) + 1001):
+        index.add(pk, f"new_user_{pk}")
+    elapsed = (time.perf_counter() - started) * 1000 / 1000
+    print(f"добавление пользователя: {elapsed:.4f} мс в среднем")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Прием комментариев к одному посту: синхронный INSERT в add_comment
+против очереди comment_buffer со сбросом пачками.
+
+Каждый режим запускается в отдельном процессе на своей копии базы.
+Для очереди печатается и время, за которое фоновый поток записал
+все принятые комментарии.
+
+Запуск из корня репозитория:
+
+    python benchmarks/comment_ingest.py [--writers 8] [--seconds 10]
+
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = ("sync", "buffered")
+
+
+def run(mode, directory, args):
+    """Дочерний процесс: потоки, которые пишут комментарии."""
+    sys.path.insert(0, str(ROOT / "yatube"))
+    os.environ["DJANGO_SETTINGS_MODULE"] = "yatube.settings"
+    if mode == "buffered":
+        os.environ["YATUBE_COMMENT_BUFFER"] = "1"
+        os.environ["YATUBE_COMMENT_BUFFER_PATH"] = os.path.join(
+            directory, "buffer.sqlite3"
+        )
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.DEBUG = False
+    settings.DATABASES["default"]["NAME"] = os.path.join(
+        directory, "db.sqlite3"
+    )
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+
+    from posts.comment_buffer import get_buffer
+    from posts.models import Comment, Post
+
+    setup_test_environment()
+    call_command("migrate", verbosity=0)
+    user = get_user_model().objects.create_user(username="bench")
+    post = Post.objects.create(text="трансляция", author=user)
+    url = reverse("posts:add_comment", args=(post.pk,))
+    connections.close_all()
+
+    stop = time.monotonic() + args.seconds
+    counts = {"accepted": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def worker():
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        while time.monotonic() < stop:
+            response = client.post(url, {"text": "текст"})
+            with lock:
+                if response.status_code >= 500:
+                    counts["errors"] += 1
+                else:
+                    counts["accepted"] += 1
+        connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    finished = time.monotonic()
+    line = (
+        f"{mode}: принято {counts['accepted'] / args.seconds:.0f}/с, "
+        f"ошибок {counts['errors']}"
+    )
+    if mode == "buffered":
+        while get_buffer().size():
+            time.sleep(0.05)
+        line += f", очередь записана за {time.monotonic() - finished:.2f} с"
+    print(f"{line}, в базе {Comment.objects.count()}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--mode", choices=MODES)
+    parser.add_argument("--directory")
+    args = parser.parse_args()
+    if args.mode:
+        run(args.mode, args.directory, args)
+        return
+    for mode in MODES:
+        with tempfile.TemporaryDirectory() as directory:
+            subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--mode",
+                    mode,
+                    "--directory",
+                    directory,
+                    "--writers",
+                    str(args.writers),
+                    "--seconds",
+                    str(args.seconds),
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
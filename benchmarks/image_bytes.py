@@ -0,0 +1,64 @@
+"""
+Байты картинки на пост в ленте: прежняя миниатюра 960x339 (JPEG
+с качеством sorl-thumbnail по умолчанию) против вариантов из srcset
+для типичных ширин экрана.
+
+Запуск из корня репозитория:
+
+    python benchmarks/image_bytes.py
+
+"""
+import os
+import sys
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "yatube"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
+django.setup()
+
+from django.core.files.base import ContentFile  # noqa: E402
+from django.core.files.storage import FileSystemStorage  # noqa: E402
+from PIL import Image, ImageFilter, ImageOps  # noqa: E402
+from sorl.thumbnail.conf import settings as sorl_settings  # noqa: E402
+
+from posts.images import build_variants  # noqa: E402
+
+SOURCE_SIZE = (2400, 1600)
+
+
+def make_photo():
+    """Шум с размытием - по сжимаемости ближе к фото, чем заливка."""
+    noise = Image.effect_noise(SOURCE_SIZE, 64).convert("RGB")
+    gradient = Image.linear_gradient("L").resize(SOURCE_SIZE).convert("RGB")
+    photo = Image.blend(noise, gradient, 0.5)
+    return photo.filter(ImageFilter.GaussianBlur(2))
+
+
+def main():
+    photo = make_photo()
+    buffer = BytesIO()
+    photo.save(buffer, "JPEG", quality=95)
+    with tempfile.TemporaryDirectory() as location:
+        storage = FileSystemStorage(location=location)
+        name = storage.save("posts/photo.jpg", ContentFile(buffer.getvalue()))
+        thumbnail = BytesIO()
+        ImageOps.fit(photo, (960, 339), Image.LANCZOS).save(
+            thumbnail, "JPEG", quality=sorl_settings.THUMBNAIL_QUALITY
+        )
+        baseline = thumbnail.tell()
+        print(f"миниатюра 960x339 JPEG: {baseline} байт")
+        variants = build_variants(name, storage=storage)
+    for source in variants["sources"]:
+        for variant_name, width, size in source["files"]:
+            print(
+                f"{source['type']:<11} {width:>4}w: {size:>7} байт, "
+                f"в {baseline / size:.1f} раза меньше"
+            )
+
+
+if __name__ == "__main__":
+    main()
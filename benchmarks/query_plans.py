@@ -0,0 +1,78 @@
+"""
+Планы запросов горячих путей до и после миграции с составными
+индексами (posts 0011_hot_path_indexes).
+
+Запуск из корня репозитория:
+
+    python benchmarks/query_plans.py
+
+"""
+import os
+import sys
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "yatube"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+
+BEFORE = "0010_counters"
+
+HOT_QUERIES = {
+    "profile: подписан ли читатель": lambda models: (
+        models["Follow"].objects.filter(user_id=1, author_id=2)
+    ),
+    "profile: посты автора": lambda models: (
+        models["Post"]
+        .objects.filter(author_id=1)
+        .order_by("-pub_date", "-pk")[:11]
+    ),
+    "group_list: посты группы": lambda models: (
+        models["Post"]
+        .objects.filter(group_id=1)
+        .order_by("-pub_date", "-pk")[:11]
+    ),
+    "post_detail: комментарии": lambda models: (
+        models["Comment"].objects.filter(post_id=1).order_by("created", "pk")
+    ),
+}
+
+
+def explain_all(title, migration=None):
+    """
+    Модели берутся из состояния миграций, примененных к базе: модели
+    приложения видят поля более поздних миграций, которых еще нет.
+
+    """
+    from django.db.migrations.executor import MigrationExecutor
+
+    nodes = ("posts", migration) if migration else None
+    state = MigrationExecutor(connection).loader.project_state(nodes)
+    models = {
+        name: state.apps.get_model("posts", name)
+        for name in ("Comment", "Follow", "Post")
+    }
+    print(f"\n=== {title}")
+    for name, build in HOT_QUERIES.items():
+        print(f"\n{name}:")
+        print(build(models).explain())
+
+
+def main():
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        call_command("migrate", "posts", BEFORE, verbosity=0)
+        explain_all(f"до индексов ({BEFORE})", BEFORE)
+        call_command("migrate", "posts", verbosity=0)
+        explain_all("после индексов")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
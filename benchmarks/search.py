@@ -0,0 +1,98 @@
+"""
+Время поиска по постам: индекс FTS5 против LIKE '%q%' на синтетической
+базе из --posts постов.
+
+Запуск из корня репозитория:
+
+    python benchmarks/search.py [--posts 1000000]
+
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "yatube"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+
+from posts.models import Post  # noqa: E402
+from posts.search import (  # noqa: E402
+    DatabaseSearchBackend,
+    SQLiteFTSBackend,
+    parse_terms,
+)
+
+random.seed(0)
+ALPHABET = "абвгдежзиклмнопрстуфхцчшщэюя"
+WORDS = sorted({"".join(random.choices(ALPHABET, k=7)) for _ in range(50000)})
+# частоты слов по закону Ципфа, как в живом тексте
+CUM_WEIGHTS = list(
+    itertools.accumulate(1 / rank for rank in range(1, len(WORDS) + 1))
+)
+QUERIES = {
+    "частое слово": WORDS[0],
+    "редкое слово": WORDS[30000],
+    "два слова": f"{WORDS[5]} {WORDS[200]}",
+    "префикс": WORDS[100][:4] + "*",
+}
+BATCH = 10000
+
+
+def fill(posts):
+    author = get_user_model().objects.create_user(username="bench")
+    random.seed(0)
+    with transaction.atomic():
+        for start in range(0, posts, BATCH):
+            Post.objects.bulk_create(
+                Post(
+                    text=" ".join(
+                        random.choices(WORDS, cum_weights=CUM_WEIGHTS, k=30)
+                    ),
+                    author=author,
+                )
+                for _ in range(min(BATCH, posts - start))
+            )
+    SQLiteFTSBackend().rebuild()
+
+
+def timed(backend, query, repeat=5):
+    terms = parse_terms(query)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        backend.search(terms, 11)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=200000)
+    args = parser.parse_args()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        started = time.perf_counter()
+        fill(args.posts)
+        print(
+            f"{args.posts} постов проиндексировано "
+            f"за {time.perf_counter() - started:.1f} с"
+        )
+        for name, query in QUERIES.items():
+            fts = timed(SQLiteFTSBackend(), query)
+            like = timed(DatabaseSearchBackend(), query, repeat=1)
+            print(f"{name}: FTS5 {fts:.2f} мс, LIKE {like:.1f} мс")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
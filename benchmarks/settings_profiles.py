@@ -0,0 +1,117 @@
+"""
+Время запуска (django.setup, загрузка URLconf и WSGI-приложения)
+и время запроса главной страницы в профилях настроек dev и prod.
+
+Каждый замер запуска - отдельный процесс, запросы идут через
+тестовый клиент Django к временной базе.
+
+Запуск из корня репозитория:
+
+    python benchmarks/settings_profiles.py [--starts 5] [--requests 200]
+
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROFILES = ("dev", "prod")
+
+
+def startup():
+    """Дочерний процесс: время от импорта Django до готового WSGI."""
+    started = time.perf_counter()
+    import django
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+
+    django.setup()
+    get_resolver().url_patterns
+    get_wsgi_application()
+    return {
+        "startup": time.perf_counter() - started,
+        "modules": len(sys.modules),
+    }
+
+
+def requests(count):
+    """Дочерний процесс: среднее время GET / после прогрева."""
+    import django
+
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+
+    from posts.models import Post
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        author = get_user_model().objects.create_user(username="bench")
+        Post.objects.bulk_create(
+            Post(text=f"Пост номер {n}", author=author) for n in range(30)
+        )
+        client = Client()
+        client.get("/")
+        started = time.perf_counter()
+        for _ in range(count):
+            client.get("/")
+        return {"request": (time.perf_counter() - started) / count}
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def run_child(profile, mode, count):
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "yatube.settings",
+        "YATUBE_ENV": profile,
+        "YATUBE_SECRET_KEY": "benchmark",
+        "YATUBE_ALLOWED_HOSTS": "testserver",
+    }
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", mode, "--requests", str(count)],
+        env=env,
+        cwd=ROOT / "yatube",
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--starts", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--child", choices=("startup", "requests"))
+    args = parser.parse_args()
+    if args.child:
+        sys.path.insert(0, str(ROOT / "yatube"))
+        if args.child == "startup":
+            result = startup()
+        else:
+            result = requests(args.requests)
+        print(json.dumps(result))
+        return
+    for profile in PROFILES:
+        starts = [run_child(profile, "startup", 0) for _ in range(args.starts)]
+        request = run_child(profile, "requests", args.requests)["request"]
+        startup_time = statistics.median(item["startup"] for item in starts)
+        print(
+            f"{profile}: запуск {startup_time * 1000:.0f} мс "
+            f"({starts[0]['modules']} модулей), "
+            f"GET / {request * 1000:.2f} мс"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Пропускная способность SQLite при одновременной записи комментариев
+(add_comment) и чтении главной страницы (index) в профилях default
+и tuned из core.db.SQLITE_PROFILES.
+
+Каждый профиль запускается в отдельном процессе на своей копии базы.
+
+Запуск из корня репозитория:
+
+    python benchmarks/sqlite_concurrency.py [--writers 4] [--readers 4]
+        [--seconds 10]
+
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROFILES = ("default", "tuned")
+
+
+def run(profile, database, args):
+    """Дочерний процесс: потоки-писатели и потоки-читатели."""
+    sys.path.insert(0, str(ROOT / "yatube"))
+    os.environ["DJANGO_SETTINGS_MODULE"] = "yatube.settings"
+    os.environ["YATUBE_SQLITE_PROFILE"] = profile
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.DEBUG = False
+    settings.DATABASES["default"]["NAME"] = database
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    }
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+
+    from posts.models import Post
+
+    setup_test_environment()
+    call_command("migrate", verbosity=0)
+    user = get_user_model().objects.create_user(username="bench")
+    posts = [
+        Post.objects.create(text=f"пост {n}", author=user) for n in range(20)
+    ]
+    connections.close_all()
+
+    stop = time.monotonic() + args.seconds
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def worker(make_request, kind):
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        while time.monotonic() < stop:
+            response = make_request(client)
+            with lock:
+                if response.status_code >= 500:
+                    counts["errors"] += 1
+                else:
+                    counts[kind] += 1
+        connections.close_all()
+
+    def write(client):
+        post = posts[counts["writes"] % len(posts)]
+        return client.post(
+            reverse("posts:add_comment", args=(post.pk,)), {"text": "текст"}
+        )
+
+    def read(client):
+        return client.get(reverse("posts:index"))
+
+    threads = [
+        threading.Thread(target=worker, args=(write, "writes"))
+        for _ in range(args.writers)
+    ] + [
+        threading.Thread(target=worker, args=(read, "reads"))
+        for _ in range(args.readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(
+        f"{profile}: записей {counts['writes'] / args.seconds:.0f}/с, "
+        f"чтений {counts['reads'] / args.seconds:.0f}/с, "
+        f"ошибок {counts['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--profile", choices=PROFILES)
+    parser.add_argument("--database")
+    args = parser.parse_args()
+    if args.profile:
+        run(args.profile, args.database, args)
+        return
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as directory:
+            subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--profile",
+                    profile,
+                    "--database",
+                    os.path.join(directory, "db.sqlite3"),
+                    "--writers",
+                    str(args.writers),
+                    "--readers",
+                    str(args.readers),
+                    "--seconds",
+                    str(args.seconds),
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Время рендеринга posts/index.html с десятью постами: загрузчики
+без кэша (как в dev), cached.Loader (prod) и InliningLoader, который
+встраивает {% include %} в шаблон. Кэш фрагментов отключен, чтобы
+лента рендерилась на каждом вызове.
+
+Запуск из корня репозитория:
+
+    python benchmarks/template_render.py [--renders 500]
+
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "yatube"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.template.backends.django import DjangoTemplates  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from posts.models import Group, Post  # noqa: E402
+from posts.utils import feed_generation, get_paginator  # noqa: E402
+
+FILE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+VARIANTS = {
+    "без кэша": FILE_LOADERS,
+    "cached.Loader": [("django.template.loaders.cached.Loader", FILE_LOADERS)],
+    "InliningLoader": [("core.loaders.InliningLoader", FILE_LOADERS)],
+}
+
+
+def make_backend(loaders):
+    params = settings.TEMPLATES[0]
+    return DjangoTemplates(
+        {
+            "NAME": "bench",
+            "DIRS": params["DIRS"],
+            "APP_DIRS": False,
+            "OPTIONS": {
+                **params["OPTIONS"],
+                "debug": False,
+                "loaders": loaders,
+            },
+        }
+    )
+
+
+def make_context():
+    author = get_user_model().objects.create_user(
+        username="bench", first_name="Лев", last_name="Толстой"
+    )
+    group = Group.objects.create(title="Группа", slug="group")
+    Post.objects.bulk_create(
+        Post(text=f"Пост номер {n}", author=author, group=group)
+        for n in range(30)
+    )
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    page_obj = get_paginator(
+        Post.objects.select_related("author", "group"), request
+    )
+    list(page_obj)
+    context = {"page_obj": page_obj, "feed_generation": feed_generation("i")}
+    return context, request
+
+
+def measure(loaders, context, request, renders):
+    backend = make_backend(loaders)
+    html = backend.get_template("posts/index.html").render(context, request)
+    started = time.perf_counter()
+    for _ in range(renders):
+        backend.get_template("posts/index.html").render(context, request)
+    return (time.perf_counter() - started) / renders * 1000, html
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--renders", type=int, default=500)
+    args = parser.parse_args()
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    }
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        context, request = make_context()
+        expected = None
+        for name, loaders in VARIANTS.items():
+            elapsed, html = measure(loaders, context, request, args.renders)
+            expected = expected or html
+            same = "совпадает" if html == expected else "ОТЛИЧАЕТСЯ"
+            print(f"{name}: {elapsed:.2f} мс на страницу, HTML {same}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Пиковая память процесса сервера при параллельной загрузке картинок
+по 50 МБ через PostForm: стандартные обработчики загрузки Django
+и forms.ImageField против BoundedUploadHandler и bound_image_field.
+
+Сервер запускается отдельным процессом, клиент читает тело запроса
+с диска, поэтому в замер попадает только память сервера.
+
+Запуск из корня репозитория:
+
+    python benchmarks/upload_memory.py [--clients 8]
+
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IMAGE_SIDE = 4096
+BOUNDARY = uuid.uuid4().hex
+
+MODES = {
+    "django": "стандартные обработчики и forms.ImageField",
+    "bounded": "BoundedUploadHandler, лимит 64 МБ",
+    "bounded-limit": "BoundedUploadHandler, лимит 20 МБ",
+}
+
+
+def serve(mode):
+    """Дочерний процесс: WSGI-сервер, который валидирует PostForm."""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import (
+        WSGIRequestHandler,
+        WSGIServer,
+        make_server,
+    )
+
+    import django
+
+    sys.path.insert(0, str(ROOT / "yatube"))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
+    django.setup()
+
+    from django import forms
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIRequest
+
+    from posts.forms import PostForm
+
+    form_class = PostForm
+    if mode == "django":
+        settings.FILE_UPLOAD_HANDLERS = [
+            "django.core.files.uploadhandler.MemoryFileUploadHandler",
+            "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+        ]
+
+        class DjangoPostForm(PostForm):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.fields["image"] = forms.ImageField(required=False)
+
+        form_class = DjangoPostForm
+    elif mode == "bounded":
+        settings.FILE_UPLOAD_MAX_SIZE = 64 * 1024 * 1024
+
+    def app(environ, start_response):
+        if environ["PATH_INFO"] == "/rss":
+            body = json.dumps(read_memory()).encode()
+        else:
+            request = WSGIRequest(environ)
+            form = form_class(request.POST, request.FILES)
+            body = json.dumps({"valid": form.is_valid()}).encode()
+            request.close()
+        start_response("200 OK", [("Content-Type", "application/json")])
+        return [body]
+
+    class Server(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = make_server(
+        "127.0.0.1", 0, app, server_class=Server, handler_class=QuietHandler
+    )
+    print(server.server_port, flush=True)
+    server.serve_forever()
+
+
+def read_memory():
+    status = Path("/proc/self/status").read_text()
+    values = dict(
+        line.split(":", 1) for line in status.splitlines() if ":" in line
+    )
+    return {
+        "rss": int(values["VmRSS"].split()[0]) // 1024,
+        "peak": int(values["VmHWM"].split()[0]) // 1024,
+    }
+
+
+def make_image(path):
+    """PNG из случайных байтов: не сжимается, около 50 МБ."""
+    from PIL import Image
+
+    pixels = os.urandom(IMAGE_SIDE * IMAGE_SIDE * 3)
+    image = Image.frombytes("RGB", (IMAGE_SIDE, IMAGE_SIDE), pixels)
+    image.save(path, "PNG", compress_level=1)
+
+
+def upload(port, path, results):
+    head = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="text"\r\n\r\ntext\r\n'
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="image"; '
+        'filename="photo.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+    length = len(head) + os.path.getsize(path) + len(tail)
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+    connection.putrequest("POST", "/")
+    connection.putheader(
+        "Content-Type", f"multipart/form-data; boundary={BOUNDARY}"
+    )
+    connection.putheader("Content-Length", str(length))
+    connection.endheaders()
+    connection.send(head)
+    with open(path, "rb") as image_file:
+        while True:
+            chunk = image_file.read(64 * 1024)
+            if not chunk:
+                break
+            connection.send(chunk)
+    connection.send(tail)
+    results.append(json.loads(connection.getresponse().read())["valid"])
+    connection.close()
+
+
+def get_memory(port):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("GET", "/rss")
+    memory = json.loads(connection.getresponse().read())
+    connection.close()
+    return memory
+
+
+def measure(mode, path, clients):
+    server = subprocess.Popen(
+        [sys.executable, __file__, "--serve", mode],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        port = int(server.stdout.readline())
+        before = get_memory(port)
+        results = []
+        threads = [
+            threading.Thread(target=upload, args=(port, path, results))
+            for _ in range(clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        after = get_memory(port)
+    finally:
+        server.terminate()
+        server.wait()
+    print(
+        f"{MODES[mode]}: принято {sum(results)} из {clients}, "
+        f"RSS до {before['rss']} МБ, пик {after['peak']} МБ "
+        f"(+{after['peak'] - before['rss']} МБ)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--serve", choices=MODES)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "photo.png")
+        make_image(path)
+        size = os.path.getsize(path) / 1024 / 1024
+        print(f"картинка {IMAGE_SIDE}x{IMAGE_SIDE}, {size:.0f} МБ")
+        for mode in MODES:
+            measure(mode, path, args.clients)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.group = Group.objects.create(
+            title="Группа", slug="group", description="Описание"
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f"Пост {n}",
+                author=cls.author,
+                group=cls.group if n % 2 else None,
+            )
+            for n in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text="Комментарий"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def collect(self, url, **params):
+        """Проходит все страницы ленты по курсорам."""
+        ids = []
+        params = {"fields": "id", "limit": 2, **params}
+        while True:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids += [item["id"] for item in data["results"]]
+            if not data["next"]:
+                return ids
+            params["cursor"] = data["next"]
+
+    def test_feeds_paginated_by_cursor(self):
+        """
+        Ленты отдаются целиком по курсорам, новые посты первыми.
+
+        """
+        newest_first = [post.pk for post in reversed(self.posts)]
+        self.assertEqual(self.collect(reverse("api:index")), newest_first)
+        self.assertEqual(
+            self.collect(reverse("api:group_posts", args=["group"])),
+            [post.pk for post in reversed(self.posts) if post.group_id],
+        )
+        self.assertEqual(
+            self.collect(reverse("api:profile_posts", args=["author"])),
+            newest_first,
+        )
+
+    def test_fields(self):
+        """?fields= ограничивает набор полей, лишние поля - ошибка 400."""
+        response = self.client.get(
+            reverse("api:index"), {"fields": "text,author", "limit": 1}
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [{"text": "Пост 4", "author": "author"}],
+        )
+        response = self.client.get(reverse("api:index"), {"fields": "email"})
+        self.assertEqual(response.status_code, 400)
+        results = self.client.get(reverse("api:index")).json()["results"]
+        item = results[1]
+        self.assertEqual(
+            set(item),
+            {
+                "id",
+                "text",
+                "pub_date",
+                "author",
+                "group",
+                "image",
+                "comments_count",
+            },
+        )
+        self.assertEqual(item["group"], "group")
+        self.assertIsNone(results[0]["group"])
+        self.assertIsNone(item["image"])
+
+    def test_bad_cursor(self):
+        response = self.client.get(reverse("api:index"), {"cursor": "xx"})
+        self.assertEqual(response.status_code, 400)
+        pub_date = self.posts[0].pub_date.isoformat()
+        for pk in (10 ** 30, float("inf")):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps([pub_date, pk]).encode()
+            ).decode()
+            response = self.client.get(
+                reverse("api:index"), {"cursor": cursor}
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_follow_feed(self):
+        """Лента подписок требует входа и содержит посты авторов."""
+        url = reverse("api:follow_index")
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_login(self.reader)
+        self.assertEqual(self.collect(url), [])
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(
+            self.collect(url), [post.pk for post in reversed(self.posts)]
+        )
+
+    @override_settings(COMMENTS_PAGE_SIZE=2, COMMENTS_MAX_PAGE_SIZE=3)
+    def test_post_detail_comments_paged(self):
+        """
+        Комментарии поста отдаются страницами по курсору, размер
+        страницы ограничен COMMENTS_MAX_PAGE_SIZE.
+
+        """
+        post = self.posts[1]
+        Comment.objects.bulk_create(
+            Comment(post=post, author=self.reader, text=f"c{n}")
+            for n in range(7)
+        )
+        url = reverse("api:post_detail", args=[post.pk])
+        data = self.client.get(url).json()
+        self.assertEqual(len(data["comments"]), 2)
+        texts = [comment["text"] for comment in data["comments"]]
+        while data["comments_next"]:
+            params = {"comments_cursor": data["comments_next"]}
+            data = self.client.get(url, {**params, "comments_limit": 50})
+            data = data.json()
+            self.assertLessEqual(len(data["comments"]), 3)
+            texts += [comment["text"] for comment in data["comments"]]
+        self.assertEqual(texts, [f"c{n}" for n in range(7)])
+        response = self.client.get(url, {"comments_cursor": "xx"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_detail(self):
+        """Пост отдается с комментариями, несуществующий - 404."""
+        post = self.posts[0]
+        data = self.client.get(
+            reverse("api:post_detail", args=[post.pk]), {"fields": "id,text"}
+        ).json()
+        self.assertEqual(data["id"], post.pk)
+        self.assertEqual(data["text"], post.text)
+        self.assertEqual(
+            [(c["author"], c["text"]) for c in data["comments"]],
+            [("reader", "Комментарий")],
+        )
+        self.assertIsNone(data["comments_next"])
+        response = self.client.get(reverse("api:post_detail", args=[0]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response["Content-Type"], "application/json")
+        response = self.client.get(
+            reverse("api:group_posts", args=["missing"])
+        )
+        self.assertEqual(response.status_code, 404)
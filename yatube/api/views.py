@@ -0,0 +1,223 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils.dateparse import parse_datetime
+
+from core.routers import replica_reads
+from posts import comments as comment_pages
+from posts.models import Comment, Group, Post, User
+from posts.timeline import timeline_source
+from posts.utils import is_bigint
+
+# поле ответа -> выражение для values_list
+POST_FIELDS = {
+    "id": "pk",
+    "text": "text",
+    "pub_date": "pub_date",
+    "author": "author__username",
+    "group": "group__slug",
+    "image": "image",
+    "comments_count": "comments_count",
+}
+
+COMMENT_FIELDS = {
+    "id": "pk",
+    "author": "author__username",
+    "text": "text",
+    "created": "created",
+}
+
+# ключи сортировки ленты, по ним строится курсор
+FEED_KEYS = ("pub_date", "pk")
+ENTRY_FEED_KEYS = ("pub_date", "post_id")
+
+
+class BadRequest(Exception):
+    pass
+
+
+def error(detail, status):
+    return JsonResponse({"detail": detail}, status=status)
+
+
+def parse_fields(request, available):
+    """
+    Поля из ?fields=id,text. Без параметра отдаются все поля.
+
+    """
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(available)
+    names = list(dict.fromkeys(name for name in raw.split(",") if name))
+    unknown = [name for name in names if name not in available]
+    if unknown or not names:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get("limit", settings.NUM_OF_POSTS_ON_PAGE))
+    except ValueError:
+        raise BadRequest("limit must be an integer")
+    return min(max(limit, 1), settings.API_MAX_LIMIT)
+
+
+def encode_cursor(pub_date, pk):
+    payload = json.dumps([pub_date.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        pub_date, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, ValueError, TypeError, OverflowError):
+        raise BadRequest("Invalid cursor")
+    if pub_date is None or not is_bigint(pk):
+        raise BadRequest("Invalid cursor")
+    return pub_date, pk
+
+
+def serializer(names, available):
+    """
+    Строки values_list и функция, которая превращает строку
+    в словарь ответа.
+
+    """
+    lookups = [available[name] for name in names]
+    image = names.index("image") if "image" in names else None
+
+    def serialize(row):
+        item = dict(zip(names, row))
+        if image is not None:
+            value = row[image]
+            item["image"] = default_storage.url(value) if value else None
+        return item
+
+    return lookups, serialize
+
+
+def feed(request, queryset, prefix="", keys=FEED_KEYS):
+    """
+    Страница ленты: проекция values_list только нужных полей
+    и keyset-курсор по (pub_date, pk) вместо номера страницы.
+    prefix - путь к посту, если queryset выбирает не посты, а keys -
+    ключи сортировки этой модели в том же порядке.
+
+    """
+    try:
+        names = parse_fields(request, POST_FIELDS)
+        limit = parse_limit(request)
+        cursor = request.GET.get("cursor")
+        after = decode_cursor(cursor) if cursor else None
+    except BadRequest as exc:
+        return error(str(exc), 400)
+    date_key, pk_key = keys
+    queryset = queryset.order_by(f"-{date_key}", f"-{pk_key}")
+    if after is not None:
+        pub_date, pk = after
+        queryset = queryset.filter(
+            Q(**{f"{date_key}__lt": pub_date})
+            | Q(**{date_key: pub_date, f"{pk_key}__lt": pk}),
+            **{f"{date_key}__lte": pub_date},
+        )
+    lookups, serialize = serializer(names, POST_FIELDS)
+    lookups = [prefix + lookup for lookup in lookups]
+    rows = list(queryset.values_list(*lookups, *keys)[: limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*rows[-1][-2:])
+    return JsonResponse(
+        {"results": [serialize(row) for row in rows], "next": next_cursor}
+    )
+
+
+@replica_reads
+def index(request):
+    return feed(request, Post.objects.all())
+
+
+@replica_reads
+def group_posts(request, slug):
+    group_id = (
+        Group.objects.filter(slug=slug).values_list("pk", flat=True).first()
+    )
+    if group_id is None:
+        return error("Group not found", 404)
+    return feed(request, Post.objects.filter(group_id=group_id))
+
+
+@replica_reads
+def profile_posts(request, username):
+    author_id = (
+        User.objects.filter(username=username)
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if author_id is None:
+        return error("User not found", 404)
+    return feed(request, Post.objects.filter(author_id=author_id))
+
+
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return error("Authentication required", 401)
+    timeline, merged = timeline_source(request.user)
+    if merged:
+        return feed(request, timeline)
+    # записи ленты: ключ (pub_date, post_id) совпадает с ключом поста
+    return feed(request, timeline, prefix="post__", keys=ENTRY_FEED_KEYS)
+
+
+@replica_reads
+def post_detail(request, post_id):
+    """
+    Пост с первой страницей комментариев. ?fields= относится к полям
+    поста, ?comments_cursor= и ?comments_limit= - к комментариям,
+    курсор следующей страницы отдается в comments_next.
+
+    """
+    try:
+        names = parse_fields(request, POST_FIELDS)
+        cursor = request.GET.get("comments_cursor")
+        after = comment_pages.decode_cursor(cursor) if cursor else None
+        if cursor and after is None:
+            raise BadRequest("Invalid cursor")
+    except BadRequest as exc:
+        return error(str(exc), 400)
+    limit = comment_pages.page_size(request.GET.get("comments_limit"))
+    lookups, serialize = serializer(names, POST_FIELDS)
+    row = Post.objects.filter(pk=post_id).values_list(*lookups).first()
+    if row is None:
+        return error("Post not found", 404)
+    comments = Comment.objects.filter(post_id=post_id)
+    if after is not None:
+        comments = comment_pages.seek(comments, after)
+    comment_names = list(COMMENT_FIELDS)
+    rows = list(
+        comments.order_by("created", "pk").values_list(
+            *COMMENT_FIELDS.values(), "created", "pk"
+        )[: limit + 1]
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = comment_pages.encode_key(*rows[-1][-2:])
+    return JsonResponse(
+        {
+            **serialize(row),
+            "comments": [
+                dict(zip(comment_names, comment)) for comment in rows
+            ],
+            "comments_next": next_cursor,
+        }
+    )
@@ -1,5 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.template.backends.django import Template
+from django.utils.module_loading import import_string
 
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self):
+        from .db import apply_sqlite_pragmas
+        from .metrics import counted_get, instrument, timed_render
+
+        connection_created.connect(
+            apply_sqlite_pragmas, dispatch_uid="core.apply_sqlite_pragmas"
+        )
+        instrument(Template, "render", timed_render)
+        for cache in settings.CACHES.values():
+            instrument(import_string(cache["BACKEND"]), "get", counted_get)
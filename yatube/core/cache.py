@@ -0,0 +1,317 @@
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Состояние процесса, общее для экземпляров бэкенда во всех потоках
+# (Django создает отдельный экземпляр кэша на поток).
+_local_tiers = {}
+_stats = {}
+_sync_state = {}
+_locks = {}
+
+CLEAR_ALL = "*"
+INVALIDATION_LOG_SIZE = 10000
+
+
+def key_prefix(key):
+    """
+    Префикс ключа для счетчиков попаданий: часть до первого «:»,
+    а для ключей фрагментов шаблонов - имя фрагмента.
+
+    """
+    if ":" in key:
+        return key.split(":", 1)[0]
+    return key.rsplit(".", 1)[0]
+
+
+class SharedCache(BaseCache):
+    """
+    Кэш в файле SQLite, общий для всех процессов сервера.
+
+    При LOCAL_MAX_ENTRIES > 0 включается второй уровень - LRU в памяти
+    процесса. Каждая запись в общий кэш попадает в журнал инвалидаций,
+    который процессы читают не чаще раза в INVALIDATION_POLL секунд
+    и выбрасывают измененные ключи из своего LRU.
+
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._path = location
+        self._local_max = int(options.get("LOCAL_MAX_ENTRIES", 0))
+        self._local_timeout = float(options.get("LOCAL_TIMEOUT", 60))
+        self._poll_interval = float(options.get("INVALIDATION_POLL", 0.5))
+        self._local = _local_tiers.setdefault(location, OrderedDict())
+        self._stats = _stats.setdefault(location, defaultdict(Counter))
+        self._sync = _sync_state.setdefault(
+            location, {"last_event": None, "last_poll": 0.0}
+        )
+        self._lock = _locks.setdefault(location, threading.RLock())
+        self._thread = threading.local()
+
+    @property
+    def _connection(self):
+        connection = getattr(self._thread, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self._path, timeout=30, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value, expires REAL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS invalidations "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL)"
+            )
+            self._thread.connection = connection
+        return connection
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _count(self, key, event):
+        with self._lock:
+            self._stats[key_prefix(key)][event] += 1
+
+    def get_stats(self):
+        """Счетчики hits/local_hits/misses по префиксам ключей."""
+        with self._lock:
+            return {
+                prefix: dict(counts) for prefix, counts in self._stats.items()
+            }
+
+    # Локальный уровень
+
+    def _poll_invalidations(self):
+        now = time.monotonic()
+        if now - self._sync["last_poll"] < self._poll_interval:
+            return
+        with self._lock:
+            self._sync["last_poll"] = now
+            last_event = self._sync["last_event"]
+            if last_event is None:
+                row = self._connection.execute(
+                    "SELECT MAX(id) FROM invalidations"
+                ).fetchone()
+                self._sync["last_event"] = row[0] or 0
+                self._local.clear()
+                return
+            rows = self._connection.execute(
+                "SELECT id, key FROM invalidations WHERE id > ? ORDER BY id",
+                (last_event,),
+            ).fetchall()
+            for event_id, key in rows:
+                if key == CLEAR_ALL:
+                    self._local.clear()
+                else:
+                    self._local.pop(key, None)
+                self._sync["last_event"] = event_id
+
+    def _local_get(self, key):
+        with self._lock:
+            item = self._local.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return item
+
+    def _local_set(self, key, value, expires):
+        if not self._local_max:
+            return
+        local_expires = time.monotonic() + self._local_timeout
+        if expires is not None:
+            local_expires = min(
+                local_expires, time.monotonic() + expires - time.time()
+            )
+        with self._lock:
+            self._local[key] = (value, local_expires)
+            self._local.move_to_end(key)
+            while len(self._local) > self._local_max:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+
+    # Общий уровень
+
+    def _broadcast(self, key):
+        cursor = self._connection.execute(
+            "INSERT INTO invalidations (key) VALUES (?)", (key,)
+        )
+        if cursor.lastrowid % 1000 == 0:
+            self._connection.execute(
+                "DELETE FROM invalidations WHERE id <= ?",
+                (cursor.lastrowid - INVALIDATION_LOG_SIZE,),
+            )
+
+    def _read(self, key):
+        row = self._connection.execute(
+            "SELECT value, expires FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= time.time():
+            self._connection.execute(
+                "DELETE FROM cache WHERE key = ? AND expires <= ?",
+                (key, time.time()),
+            )
+            return None
+        return row
+
+    def _cull(self):
+        """
+        Как db- и файловый бэкенды Django: когда записей MAX_ENTRIES
+        и больше, удаляются просроченные, а если их не хватило - каждая
+        CULL_FREQUENCY-я запись (0 - все), первыми истекающие раньше.
+
+        """
+        connection = self._connection
+        count = connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count < self._max_entries:
+            return
+        connection.execute(
+            "DELETE FROM cache WHERE expires <= ?", (time.time(),)
+        )
+        count = connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count < self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            connection.execute("DELETE FROM cache")
+            return
+        connection.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+            "ORDER BY expires IS NULL, expires LIMIT ?)",
+            (count // self._cull_frequency,),
+        )
+
+    def _write(self, key, value, expires):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) "
+            "VALUES (?, ?, ?)",
+            (key, self._encode(value), expires),
+        )
+        self._broadcast(key)
+
+    def get(self, key, default=None, version=None):
+        raw_key = key
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        if self._local_max:
+            self._poll_invalidations()
+            item = self._local_get(key)
+            if item is not None:
+                self._count(raw_key, "local_hits")
+                return item[0]
+        row = self._read(key)
+        if row is None:
+            self._count(raw_key, "misses")
+            return default
+        self._count(raw_key, "hits")
+        value = self._decode(row[0])
+        self._local_set(key, value, row[1])
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        expires = self.get_backend_timeout(timeout)
+        self._cull()
+        self._write(key, value, expires)
+        self._local_delete(key)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        expires = self.get_backend_timeout(timeout)
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._cull()
+            connection.execute(
+                "DELETE FROM cache WHERE key = ? AND expires <= ?",
+                (key, time.time()),
+            )
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO cache (key, value, expires) "
+                "VALUES (?, ?, ?)",
+                (key, self._encode(value), expires),
+            )
+            added = cursor.rowcount == 1
+            if added:
+                self._broadcast(key)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        if added:
+            self._local_delete(key)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        cursor = self._connection.execute(
+            "UPDATE cache SET expires = ? "
+            "WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (self.get_backend_timeout(timeout), key, time.time()),
+        )
+        self._local_delete(key)
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        """Атомарное увеличение в одной транзакции SQLite."""
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._read(key)
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = self._decode(row[0]) + delta
+            self._write(key, value, row[1])
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._local_delete(key)
+        return value
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._read(key) is not None
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+        self._broadcast(key)
+        self._local_delete(key)
+
+    def clear(self):
+        self._connection.execute("DELETE FROM cache")
+        self._broadcast(CLEAR_ALL)
+        with self._lock:
+            self._local.clear()
@@ -0,0 +1,30 @@
+from django.conf import settings
+
+# PRAGMA, которые выполняются на каждом новом соединении с SQLite
+SQLITE_PROFILES = {
+    "default": {},
+    "tuned": {
+        # читатели не блокируют писателя и наоборот
+        "journal_mode": "WAL",
+        # в WAL fsync только на контрольных точках, без риска порчи базы
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 256 * 1024 * 1024,
+        # отрицательное значение - размер в КиБ
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Применяет профиль SQLITE_PROFILE к новому соединению с SQLite.
+
+    """
+    if connection.vendor != "sqlite":
+        return
+    pragmas = SQLITE_PROFILES[settings.SQLITE_PROFILE]
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
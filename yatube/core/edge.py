@@ -0,0 +1,152 @@
+import logging
+import urllib.request
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import cc_delim_re, patch_cache_control
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_METHODS = ("GET", "HEAD")
+CACHEABLE_STATUSES = (200, 304)
+
+
+def edge_cacheable(keys):
+    """
+    Помечает представление как пригодное для кэша перед сайтом.
+    keys(request, *args, **kwargs) возвращает суррогатные ключи
+    страницы, по которым ее потом можно сбросить.
+
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            request.surrogate_keys = list(keys(request, *args, **kwargs))
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def remove_vary(response, header):
+    if not response.has_header("Vary"):
+        return
+    values = [
+        value
+        for value in cc_delim_re.split(response["Vary"])
+        if value and value.lower() != header.lower()
+    ]
+    if values:
+        response["Vary"] = ", ".join(values)
+    else:
+        del response["Vary"]
+
+
+class EdgeCacheMiddleware:
+    """
+    Выставляет Cache-Control ответам представлений с edge_cacheable.
+    Анонимная страница без cookie в ответе одинакова для всех
+    анонимов: она получает public с s-maxage, суррогатные ключи
+    и Vary без Cookie, который добавляют сессии и CSRF. Остальным
+    ответам - private. Должен стоять в MIDDLEWARE до сессий и CSRF,
+    чтобы видеть их заголовки.
+
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        keys = getattr(request, "surrogate_keys", None)
+        if (
+            keys is None
+            or request.method not in CACHEABLE_METHODS
+            or response.status_code not in CACHEABLE_STATUSES
+        ):
+            return response
+        # без max-age браузер может сам решить, сколько хранить
+        # страницу с Last-Modified, поэтому max-age=0 есть всегда
+        if request.user.is_authenticated or response.cookies:
+            patch_cache_control(response, private=True, max_age=0)
+            return response
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=0,
+            s_maxage=settings.EDGE_CACHE_SECONDS,
+        )
+        remove_vary(response, "Cookie")
+        if keys:
+            response[settings.SURROGATE_KEY_HEADER] = " ".join(keys)
+        return response
+
+
+class PurgeBackend:
+    """
+    Интерфейс сброса страниц в кэше перед сайтом по суррогатным
+    ключам.
+
+    """
+
+    enabled = True
+
+    def purge(self, keys):
+        raise NotImplementedError
+
+
+class NullPurgeBackend(PurgeBackend):
+    """Кэша перед сайтом нет, сбрасывать нечего."""
+
+    enabled = False
+
+    def purge(self, keys):
+        pass
+
+
+class HTTPPurgeBackend(PurgeBackend):
+    """
+    Запрос EDGE_PURGE_METHOD на EDGE_PURGE_URL с ключами через пробел
+    в заголовке SURROGATE_KEY_HEADER, как ждут Varnish с xkey
+    и похожие прокси. Ошибка сети только пишется в лог: страница
+    устареет не дольше чем на EDGE_CACHE_SECONDS.
+
+    """
+
+    def purge(self, keys):
+        request = urllib.request.Request(
+            settings.EDGE_PURGE_URL,
+            method=settings.EDGE_PURGE_METHOD,
+            headers={
+                **settings.EDGE_PURGE_HEADERS,
+                settings.SURROGATE_KEY_HEADER: " ".join(keys),
+            },
+        )
+        try:
+            with urllib.request.urlopen(
+                request, timeout=settings.EDGE_PURGE_TIMEOUT
+            ):
+                pass
+        except OSError as exc:
+            logger.warning("Edge purge of %s failed: %s", keys, exc)
+
+
+@lru_cache(maxsize=None)
+def get_purge_backend():
+    return import_string(settings.EDGE_PURGE_BACKEND)()
+
+
+def purge(keys):
+    """
+    Сбрасывает страницы с этими ключами после фиксации текущей
+    транзакции: откаченное изменение ничего не сбрасывает.
+
+    """
+    backend = get_purge_backend()
+    keys = sorted(set(keys))
+    if backend.enabled and keys:
+        transaction.on_commit(lambda: backend.purge(keys))
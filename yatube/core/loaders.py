@@ -0,0 +1,135 @@
+import os
+
+from django.template import (
+    Node,
+    TemplateDoesNotExist,
+    TemplateSyntaxError,
+    engines,
+)
+from django.template.backends.django import DjangoTemplates
+from django.template.defaulttags import IfNode
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.template.loaders import cached
+
+
+def _loader_dirs(loaders):
+    for loader in loaders:
+        if isinstance(loader, cached.Loader):
+            yield from _loader_dirs(loader.loaders)
+        elif hasattr(loader, "get_dirs"):
+            yield from loader.get_dirs()
+
+
+def template_names(engine):
+    """
+    Имена всех шаблонов в каталогах, которые видят загрузчики движка.
+
+    """
+    names = set()
+    for directory in _loader_dirs(engine.template_loaders):
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                names.add(
+                    os.path.relpath(path, directory).replace(os.sep, "/")
+                )
+    return sorted(names)
+
+
+def warm_templates():
+    """
+    Компилирует все шаблоны движков Django. С кэширующим загрузчиком
+    они остаются в памяти процесса, и первые запросы воркера не платят
+    за разбор шаблонов. Возвращает число шаблонов и словарь ошибок.
+
+    """
+    count = 0
+    errors = {}
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend.engine):
+            try:
+                backend.engine.get_template(name)
+            except (TemplateSyntaxError, UnicodeDecodeError) as exc:
+                errors[name] = exc
+            else:
+                count += 1
+    return count, errors
+
+
+def child_nodelists(node):
+    if isinstance(node, IfNode):
+        return [nodelist for _, nodelist in node.conditions_nodelists]
+    return [
+        getattr(node, attr)
+        for attr in node.child_nodelists
+        if getattr(node, attr, None)
+    ]
+
+
+class InlinedIncludeNode(Node):
+    """
+    {% include %} с постоянным именем шаблона, разрешенный при
+    компиляции: узлы подключаемого шаблона рендерятся напрямую, без
+    поиска шаблона и Template.render на каждом вызове.
+
+    """
+
+    def __init__(self, include, template):
+        self.token = include.token
+        self.origin = include.origin
+        self.template = template
+        self.extra_context = include.extra_context
+        self.isolated_context = include.isolated_context
+
+    def render(self, context):
+        values = {
+            name: var.resolve(context)
+            for name, var in self.extra_context.items()
+        }
+        if self.isolated_context:
+            context = context.new(values)
+            values = {}
+        with context.render_context.push_state(self.template):
+            with context.push(**values):
+                return self.template.nodelist.render(context)
+
+
+class InliningLoader(cached.Loader):
+    """
+    Кэширующий загрузчик, который при первой загрузке шаблона заменяет
+    {% include "имя" %} на узлы подключаемого шаблона. Включения
+    с именем из переменной и шаблоны с {% extends %} не трогаются.
+
+    """
+
+    def get_template(self, template_name, skip=None):
+        template = super().get_template(template_name, skip)
+        if not getattr(template, "includes_inlined", False):
+            template.includes_inlined = True
+            self.inline_includes(template.nodelist)
+        return template
+
+    def inline_includes(self, nodelist):
+        for index, node in enumerate(nodelist):
+            if isinstance(node, IncludeNode):
+                inlined = self.inline(node)
+                if inlined is not None:
+                    nodelist[index] = inlined
+                continue
+            for child in child_nodelists(node):
+                self.inline_includes(child)
+
+    def inline(self, node):
+        name = node.template.var
+        if node.template.filters or not isinstance(name, str):
+            return None
+        try:
+            template = self.get_template(name)
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            # ошибка останется на месте и проявится при рендеринге
+            return None
+        if template.nodelist.get_nodes_by_type(ExtendsNode):
+            return None
+        return InlinedIncludeNode(node, template)
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loaders import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Компилирует все шаблоны и сообщает об ошибках. Воркеры "
+        "прогревают свой кэш шаблонов сами при TEMPLATE_WARMUP"
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count, errors = warm_templates()
+        for name, exc in errors.items():
+            self.stderr.write(f"{name}: {exc}")
+        if errors:
+            raise CommandError(f"Шаблонов с ошибками: {len(errors)}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Скомпилировано шаблонов: {count} "
+                f"за {time.perf_counter() - started:.2f} с"
+            )
+        )
@@ -0,0 +1,272 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+UNRESOLVED = "<unresolved>"
+
+_current = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными границами в стиле Prometheus:
+    счетчик на корзину, сумма и число наблюдений.
+
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Пары (граница, число наблюдений не больше нее)."""
+        total = 0
+        bounds = [*self.buckets, "+Inf"]
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            yield bound, total
+
+
+HISTOGRAMS = {
+    "request_duration_seconds": (
+        "Total request latency.",
+        SECONDS_BUCKETS,
+    ),
+    "db_queries": ("SQL queries per request.", QUERY_BUCKETS),
+    "db_duration_seconds": (
+        "Time spent in SQL queries per request.",
+        SECONDS_BUCKETS,
+    ),
+    "template_render_seconds": (
+        "Time spent rendering templates per request.",
+        SECONDS_BUCKETS,
+    ),
+}
+
+COUNTERS = {
+    "cache_hits_total": "Cache reads that found a value.",
+    "cache_misses_total": "Cache reads that found nothing.",
+    "query_budget_exceeded_total": "Requests over the view query budget.",
+}
+
+
+class Registry:
+    """
+    Метрики процесса по имени представления. Обновляются один раз
+    в конце запроса под общей блокировкой.
+
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.histograms = {name: {} for name in HISTOGRAMS}
+        self.counters = {name: {} for name in COUNTERS}
+
+    def record(self, view, stats, duration):
+        values = {
+            "request_duration_seconds": duration,
+            "db_queries": stats.queries,
+            "db_duration_seconds": stats.sql_time,
+            "template_render_seconds": stats.render_time,
+        }
+        increments = {
+            "cache_hits_total": stats.cache_hits,
+            "cache_misses_total": stats.cache_misses,
+            "query_budget_exceeded_total": int(
+                stats.queries > query_budget(view)
+            ),
+        }
+        with self.lock:
+            for name, value in values.items():
+                histogram = self.histograms[name].get(view)
+                if histogram is None:
+                    histogram = self.histograms[name][view] = Histogram(
+                        HISTOGRAMS[name][1]
+                    )
+                histogram.observe(value)
+            for name, value in increments.items():
+                counters = self.counters[name]
+                counters[view] = counters.get(view, 0) + value
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus."""
+        lines = []
+        with self.lock:
+            for name, (help_text, _) in HISTOGRAMS.items():
+                metric = f"{settings.METRICS_PREFIX}{name}"
+                lines += [
+                    f"# HELP {metric} {help_text}",
+                    f"# TYPE {metric} histogram",
+                ]
+                for view, histogram in sorted(self.histograms[name].items()):
+                    label = f'view="{escape_label(view)}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(
+                            f'{metric}_bucket{{{label},le="{bound}"}} {count}'
+                        )
+                    lines.append(f"{metric}_sum{{{label}}} {histogram.sum}")
+                    lines.append(
+                        f"{metric}_count{{{label}}} {histogram.count}"
+                    )
+            for name, help_text in COUNTERS.items():
+                metric = f"{settings.METRICS_PREFIX}{name}"
+                lines += [
+                    f"# HELP {metric} {help_text}",
+                    f"# TYPE {metric} counter",
+                ]
+                for view, value in sorted(self.counters[name].items()):
+                    lines.append(
+                        f'{metric}{{view="{escape_label(view)}"}} {value}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def query_budget(view):
+    return settings.METRICS_QUERY_BUDGETS.get(
+        view, settings.METRICS_DEFAULT_QUERY_BUDGET
+    )
+
+
+class RequestStats:
+    """Счетчики одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def timed_render(render):
+    """
+    Обертка Template.render шаблонного бэкенда: время рендеринга
+    попадает в статистику текущего запроса.
+
+    """
+
+    @wraps(render)
+    def wrapper(*args, **kwargs):
+        stats = _current.get()
+        if stats is None:
+            return render(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return render(*args, **kwargs)
+        finally:
+            stats.render_time += time.perf_counter() - started
+
+    return wrapper
+
+
+_missing = object()
+
+
+def counted_get(get):
+    """
+    Обертка BaseCache.get: считает попадания и промахи. get_many
+    бэкендов Django по умолчанию вызывает get, поэтому тоже учтен.
+
+    """
+
+    @wraps(get)
+    def wrapper(self, key, default=None, version=None):
+        stats = _current.get()
+        if stats is None:
+            return get(self, key, default, version)
+        value = get(self, key, _missing, version)
+        if value is _missing:
+            stats.cache_misses += 1
+            return default
+        stats.cache_hits += 1
+        return value
+
+    return wrapper
+
+
+def instrument(cls, name, decorator):
+    """Оборачивает метод класса один раз, повторный вызов ничего не делает."""
+    method = cls.__dict__.get(name) or getattr(cls, name)
+    if getattr(method, "instrumented", False):
+        return
+    wrapper = decorator(method)
+    wrapper.instrumented = True
+    setattr(cls, name, wrapper)
+
+
+class MetricsMiddleware:
+    """
+    Собирает по каждому запросу число и время SQL-запросов, время
+    рендеринга шаблонов, попадания в кэш и общую задержку и копит их
+    в registry по имени представления. Запрос сверх бюджета
+    METRICS_QUERY_BUDGETS пишется в лог предупреждением.
+
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(stats.sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else UNRESOLVED
+        registry.record(view, stats, duration)
+        budget = query_budget(view)
+        if stats.queries > budget:
+            logger.warning(
+                "%s made %d SQL queries, budget is %d (%s)",
+                view,
+                stats.queries,
+                budget,
+                request.path,
+            )
+        return response
@@ -0,0 +1,59 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class PurgeHandler(BaseHTTPRequestHandler):
+    def do_PURGE(self):
+        self.server.record(self.command, self.path, dict(self.headers))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_POST = do_PURGE
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalPurgeServer(ThreadingHTTPServer):
+    """
+    Локальная замена кэша перед сайтом для тестов и разработки:
+    принимает PURGE и POST и запоминает их. Работает в фоновом потоке
+    внутри with, адрес - в url.
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), PurgeHandler)
+        self.requests = []
+        self.received = threading.Condition()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def record(self, method, path, headers):
+        with self.received:
+            self.requests.append(
+                {"method": method, "path": path, "headers": headers}
+            )
+            self.received.notify_all()
+
+    def wait(self, count, timeout=5):
+        """Ждет, пока придет count запросов, и возвращает их."""
+        with self.received:
+            self.received.wait_for(
+                lambda: len(self.requests) >= count, timeout
+            )
+            return list(self.requests)
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
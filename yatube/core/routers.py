@@ -0,0 +1,92 @@
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+STICKY_COOKIE = "primary_until"
+
+# сессия читается на каждом запросе и должна видеть свежий логин
+PRIMARY_ONLY_APPS = {"sessions"}
+
+_replica_allowed = ContextVar("replica_allowed", default=False)
+
+
+def is_sticky(request):
+    """
+    Клиент недавно что-то записал и должен читать с основной базы,
+    пока реплики могут отставать.
+
+    """
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def replica_reads(view):
+    """
+    Разрешает представлению читать с реплик. Небезопасные запросы
+    и клиенты с недавней записью остаются на основной базе.
+
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        allowed = request.method in ("GET", "HEAD") and not is_sticky(request)
+        token = _replica_allowed.set(allowed)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_allowed.reset(token)
+
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """
+    Чтения внутри представлений с replica_reads уходят на случайную
+    реплику из DATABASE_REPLICAS, все остальное - на default.
+
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            settings.DATABASE_REPLICAS
+            and _replica_allowed.get()
+            and model._meta.app_label not in PRIMARY_ONLY_APPS
+        ):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+class ReplicaStickinessMiddleware:
+    """
+    После небезопасного запроса ставит cookie, по которой следующие
+    REPLICA_STICKY_SECONDS секунд клиент читает с основной базы
+    и видит свои изменения.
+
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS", "TRACE"):
+            until = time.time() + settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE,
+                f"{until:.3f}",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -6,3 +6,13 @@ register = template.Library()
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={"class": css})
+
+
+@register.filter
+def page_window(page):
+    """
+    Пары (номер, параметры запроса) для страниц пагинатора рядом
+    с текущей страницей.
+
+    """
+    return page.paginator.page_links(page)
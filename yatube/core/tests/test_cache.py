@@ -0,0 +1,122 @@
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from ..cache import SharedCache, key_prefix
+
+
+class SharedCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.location = str(Path(self.directory) / "cache.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_cache(self, **options):
+        return SharedCache(self.location, {"OPTIONS": options})
+
+    def test_set_get_delete(self):
+        """
+        Значения сохраняются, удаляются и истекают по таймауту.
+
+        """
+        cache = self.make_cache()
+        cache.set("key", {"a": 1})
+        self.assertEqual(cache.get("key"), {"a": 1})
+        cache.delete("key")
+        self.assertIsNone(cache.get("key"))
+        cache.set("short", "value", 0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("short"))
+        self.assertTrue(cache.add("short", "new"))
+        self.assertFalse(cache.add("short", "other"))
+        self.assertEqual(cache.get("short"), "new")
+
+    def test_incr(self):
+        """
+        incr работает для общего счетчика и требует существующий ключ.
+
+        """
+        cache = self.make_cache()
+        cache.set("counter", 1)
+        self.assertEqual(cache.incr("counter"), 2)
+        self.assertEqual(self.make_cache().incr("counter", 3), 5)
+        with self.assertRaises(ValueError):
+            cache.incr("missing")
+
+    def test_shared_between_instances(self):
+        """
+        Экземпляры с одним файлом видят записи друг друга.
+
+        """
+        self.make_cache().set("key", "value")
+        self.assertEqual(self.make_cache().get("key"), "value")
+
+    def test_local_tier_invalidation(self):
+        """
+        Локальный LRU обслуживает чтения и сбрасывается
+        по журналу инвалидаций после записи другим процессом.
+
+        """
+        cache = self.make_cache(LOCAL_MAX_ENTRIES=10, INVALIDATION_POLL=0)
+        cache.set("key", "old")
+        cache.get("key")
+        self.assertEqual(cache.get("key"), "old")
+        self.assertEqual(cache.get_stats()["key"]["local_hits"], 1)
+        connection = cache._connection
+        connection.execute(
+            "UPDATE cache SET value = ? WHERE key = ?",
+            (cache._encode("new"), cache.make_key("key")),
+        )
+        self.assertEqual(cache.get("key"), "old")
+        connection.execute(
+            "INSERT INTO invalidations (key) VALUES (?)",
+            (cache.make_key("key"),),
+        )
+        self.assertEqual(cache.get("key"), "new")
+
+    def test_stats_by_prefix(self):
+        """
+        Попадания и промахи считаются по префиксу ключа.
+
+        """
+        cache = self.make_cache()
+        cache.set("count:1:abc", 10)
+        cache.get("count:1:abc")
+        cache.get("count:2:abc")
+        self.assertEqual(
+            cache.get_stats()["count"], {"hits": 1, "misses": 1}
+        )
+        self.assertEqual(
+            key_prefix("template.cache.index_page.abc"),
+            "template.cache.index_page",
+        )
+
+    def test_expired_rows_removed_and_culled(self):
+        """
+        Просроченная запись удаляется при чтении, а при MAX_ENTRIES
+        записей часть из них вытесняется, первыми - истекающие раньше.
+
+        """
+        cache = self.make_cache(MAX_ENTRIES=4, CULL_FREQUENCY=2)
+        rows = cache._connection.execute
+        cache.set("short", "value", 0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(rows("SELECT COUNT(*) FROM cache").fetchone()[0], 0)
+        for number in range(4):
+            cache.set(f"key{number}", number, 100 + number)
+        cache.set("key4", 4, None)
+        self.assertEqual(
+            [key for key, in rows("SELECT key FROM cache ORDER BY key")],
+            [":1:key2", ":1:key3", ":1:key4"],
+        )
+        for number in range(20):
+            cache.set(f"more{number}", number)
+        self.assertLessEqual(
+            rows("SELECT COUNT(*) FROM cache").fetchone()[0], 4
+        )
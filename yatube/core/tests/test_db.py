@@ -0,0 +1,44 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+
+from ..db import SQLITE_PROFILES
+
+
+class SQLiteProfileTest(SimpleTestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        connections.databases["profile"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(Path(self.directory) / "profile.sqlite3"),
+        }
+
+    def tearDown(self):
+        connections["profile"].close()
+        del connections.databases["profile"]
+        del connections._connections.profile
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _pragma(self, name):
+        with connections["profile"].cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PROFILE="tuned")
+    def test_tuned_profile(self):
+        """Настроенный профиль применяется к каждому соединению."""
+        tuned = SQLITE_PROFILES["tuned"]
+        self.assertEqual(self._pragma("journal_mode"), "wal")
+        self.assertEqual(self._pragma("synchronous"), 1)
+        self.assertEqual(self._pragma("busy_timeout"), tuned["busy_timeout"])
+        self.assertEqual(self._pragma("cache_size"), tuned["cache_size"])
+
+    @override_settings(SQLITE_PROFILE="default")
+    def test_default_profile(self):
+        """Профиль default оставляет настройки SQLite по умолчанию."""
+        self.assertEqual(self._pragma("journal_mode"), "delete")
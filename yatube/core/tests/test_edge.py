@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from ..edge import HTTPPurgeBackend, get_purge_backend, purge, remove_vary
+from ..purge_server import LocalPurgeServer
+
+
+class RemoveVaryTest(SimpleTestCase):
+    def test_remove_vary(self):
+        response = HttpResponse()
+        response["Vary"] = "Cookie, Accept-Encoding"
+        remove_vary(response, "cookie")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        remove_vary(response, "Accept-Encoding")
+        self.assertNotIn("Vary", response)
+
+
+class HTTPPurgeBackendTest(TransactionTestCase):
+    def test_purge_request(self):
+        with LocalPurgeServer() as server, override_settings(
+            EDGE_PURGE_URL=server.url,
+            EDGE_PURGE_HEADERS={"Fastly-Key": "secret"},
+        ):
+            HTTPPurgeBackend().purge(["post-1", "index"])
+            (request,) = server.wait(1)
+        self.assertEqual(request["method"], "PURGE")
+        self.assertEqual(request["headers"]["Surrogate-Key"], "post-1 index")
+        self.assertEqual(request["headers"]["Fastly-Key"], "secret")
+
+    def test_unreachable_proxy_is_logged(self):
+        with LocalPurgeServer() as server:
+            url = server.url
+        with override_settings(EDGE_PURGE_URL=url), self.assertLogs(
+            "core.edge", "WARNING"
+        ):
+            HTTPPurgeBackend().purge(["index"])
+
+    def test_purge_waits_for_commit(self):
+        """
+        Ключи уходят после фиксации транзакции, откат ничего
+        не сбрасывает.
+
+        """
+        with LocalPurgeServer() as server, override_settings(
+            EDGE_PURGE_BACKEND="core.edge.HTTPPurgeBackend",
+            EDGE_PURGE_URL=server.url,
+        ):
+            get_purge_backend.cache_clear()
+            self.addCleanup(get_purge_backend.cache_clear)
+            try:
+                with transaction.atomic():
+                    purge(["post-1"])
+                    raise ValueError
+            except ValueError:
+                pass
+            with transaction.atomic():
+                purge(["post-2", "post-2", "index"])
+                self.assertEqual(server.requests, [])
+            (request,) = server.wait(1)
+        self.assertEqual(request["headers"]["Surrogate-Key"], "index post-2")
@@ -0,0 +1,94 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import Context, Engine, engines
+from django.test import SimpleTestCase, override_settings
+
+from ..loaders import InlinedIncludeNode, template_names, warm_templates
+
+TEMPLATES = {
+    "page.html": (
+        "{% for item in items %}{% include 'item.html' %}{% endfor %}"
+        "{% include 'item.html' with item='с' %}"
+        "{% include 'only.html' with item='о' only %}"
+        "{% include name %}"
+    ),
+    "item.html": "[{% cycle 'a' 'b' %}{{ item }}{% include 'leaf.html' %}]",
+    "leaf.html": "{{ item|upper }}",
+    "only.html": "({{ item }}{{ items|length }})",
+    "dynamic.html": "<{{ item }}>",
+}
+
+
+def make_engine(loader):
+    return Engine(
+        loaders=[
+            (loader, [("django.template.loaders.locmem.Loader", TEMPLATES)])
+        ]
+    )
+
+
+class InliningLoaderTest(SimpleTestCase):
+    def render(self, loader):
+        template = make_engine(loader).get_template("page.html")
+        context = Context(
+            {"items": ["x", "y"], "item": "-", "name": "dynamic.html"}
+        )
+        return template, template.render(context)
+
+    def test_same_output(self):
+        """
+        Встроенные включения рендерятся так же, как {% include %}:
+        with, only, cycle и включение по имени из переменной.
+
+        """
+        _, expected = self.render("django.template.loaders.cached.Loader")
+        template, inlined = self.render("core.loaders.InliningLoader")
+        self.assertEqual(inlined, expected)
+        self.assertEqual(inlined, "[axX][ayY][aсС](о0)<->")
+        self.assertEqual(
+            len(template.nodelist.get_nodes_by_type(InlinedIncludeNode)), 3
+        )
+
+
+class WarmTemplatesTest(SimpleTestCase):
+    def test_template_names(self):
+        names = template_names(engines["django"].engine)
+        self.assertIn("posts/index.html", names)
+        self.assertIn("includes/article.html", names)
+
+    @override_settings(
+        TEMPLATES=[
+            {
+                **settings.TEMPLATES[0],
+                "APP_DIRS": False,
+                "OPTIONS": {
+                    **settings.TEMPLATES[0]["OPTIONS"],
+                    "loaders": [
+                        (
+                            "django.template.loaders.cached.Loader",
+                            [
+                                "django.template.loaders.filesystem.Loader",
+                                "django.template.loaders.app_directories."
+                                "Loader",
+                            ],
+                        )
+                    ],
+                },
+            }
+        ]
+    )
+    def test_warm_templates(self):
+        """Прогрев кладет скомпилированные шаблоны в кэш загрузчика."""
+        count, errors = warm_templates()
+        self.assertEqual(errors, {})
+        loader = engines["django"].engine.template_loaders[0]
+        self.assertEqual(len(loader.get_template_cache), count)
+        self.assertIn("posts/index.html", loader.get_template_cache)
+
+    def test_command(self):
+        """Команда компилирует все шаблоны проекта без ошибок."""
+        out = StringIO()
+        call_command("warm_templates", stdout=out)
+        self.assertIn("Скомпилировано шаблонов", out.getvalue())
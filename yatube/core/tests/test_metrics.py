@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..metrics import Histogram, escape_label, registry
+
+User = get_user_model()
+
+
+class HistogramTest(SimpleTestCase):
+    def test_cumulative_buckets(self):
+        """Корзины накопительные, граница входит в свою корзину."""
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(
+            list(histogram.cumulative()), [(1, 2), (5, 3), ("+Inf", 4)]
+        )
+        self.assertEqual(histogram.sum, 14)
+
+    def test_escape_label(self):
+        self.assertEqual(escape_label('a"b\\c\n'), 'a\\"b\\\\c\\n')
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author")
+        cls.staff = User.objects.create_user(username="staff", is_staff=True)
+        Post.objects.create(text="Тестовый пост", author=cls.user)
+
+    def setUp(self):
+        registry.reset()
+        cache.clear()
+
+    def scrape(self):
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_records_view_metrics(self):
+        """
+        Задержка, SQL, шаблоны и кэш учитываются по имени представления.
+
+        """
+        self.client.get(reverse("posts:index"))
+        self.client.get(reverse("posts:index"))
+        body = self.scrape()
+        label = '{view="posts:index"}'
+        self.assertIn(f"yatube_request_duration_seconds_count{label} 2", body)
+        self.assertIn(f"yatube_template_render_seconds_count{label} 2", body)
+        self.assertIn(
+            'yatube_db_queries_bucket{view="posts:index",le="+Inf"} 2', body
+        )
+        self.assertIn(f"yatube_cache_misses_total{label}", body)
+        self.assertRegex(body, r'cache_hits_total\{view="posts:index"\} [1-9]')
+        self.assertIn(f"yatube_query_budget_exceeded_total{label} 0", body)
+
+    def test_query_budget_warning(self):
+        """Превышение бюджета запросов пишется в лог и в счетчик."""
+        with self.settings(METRICS_QUERY_BUDGETS={"posts:index": 0}):
+            with self.assertLogs("core.metrics", "WARNING") as logs:
+                self.client.get(reverse("posts:index"))
+        self.assertIn("posts:index made", logs.output[0])
+        self.assertIn(
+            'yatube_query_budget_exceeded_total{view="posts:index"} 1',
+            self.scrape(),
+        )
+
+    def test_endpoint_protected(self):
+        """/metrics отдается по токену или персоналу, остальным - 403."""
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.assertEqual(
+            self.client.get(
+                reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong"
+            ).status_code,
+            403,
+        )
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
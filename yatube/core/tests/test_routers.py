@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connections, router
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..routers import STICKY_COOKIE, replica_reads
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class PrimaryReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _read_db(self, request):
+        view = replica_reads(lambda request: router.db_for_read(Post))
+        return view(request)
+
+    def test_routing(self):
+        """
+        Чтения в помеченных представлениях идут на реплику, запись,
+        POST и прочие представления - на основную базу.
+
+        """
+        self.assertEqual(self._read_db(self.factory.get("/")), "replica")
+        self.assertEqual(self._read_db(self.factory.post("/")), "default")
+        self.assertEqual(router.db_for_read(Post), "default")
+        self.assertEqual(router.db_for_write(Post), "default")
+        self.assertEqual(
+            replica_reads(lambda request: router.db_for_read(Session))(
+                self.factory.get("/")
+            ),
+            "default",
+        )
+
+    def test_sticky_after_write(self):
+        """Свежая cookie после записи возвращает чтения на default."""
+        request = self.factory.get("/")
+        request.COOKIES[STICKY_COOKIE] = str(time.time() + 5)
+        self.assertEqual(self._read_db(request), "default")
+        request.COOKIES[STICKY_COOKIE] = str(time.time() - 1)
+        self.assertEqual(self._read_db(request), "replica")
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaFileTest(TestCase):
+    """Реплика - отдельный файл SQLite с другими данными."""
+
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        connections.databases["replica"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(Path(cls.directory) / "replica.sqlite3"),
+        }
+        call_command("migrate", database="replica", verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections.databases["replica"]
+        del connections._connections.replica
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="author")
+        # реплика - копия пользователей основной базы, но со своими постами
+        replica_user = User.objects.using("replica").create(
+            pk=self.user.pk,
+            username=self.user.username,
+            password=self.user.password,
+        )
+        Post.objects.create(text="пост на основной базе", author=self.user)
+        Post.objects.using("replica").create(
+            text="пост на реплике", author=replica_user
+        )
+        self.client.force_login(self.user)
+
+    def test_read_your_writes(self):
+        """
+        Лента читается с реплики, а после POST - с основной базы.
+
+        """
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, "пост на реплике")
+        self.client.post(reverse("posts:post_create"), {"text": "новый пост"})
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, "новый пост")
+        self.assertNotContains(response, "пост на реплике")
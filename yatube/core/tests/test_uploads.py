@@ -0,0 +1,52 @@
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+from ..uploads import strip_jpeg, strip_png
+
+
+class StripMetadataTest(SimpleTestCase):
+    def test_strip_jpeg(self):
+        """
+        Из JPEG уходят EXIF и комментарий, пиксели не меняются.
+
+        """
+        exif = Image.Exif()
+        exif[0x010F] = "Camera maker"
+        source = BytesIO()
+        Image.new("RGB", (8, 8), "blue").save(
+            source, "JPEG", exif=exif.tobytes(), comment=b"secret"
+        )
+        source.seek(0)
+        target = BytesIO()
+        strip_jpeg(source, target)
+        self.assertNotIn(b"Camera maker", target.getvalue())
+        target.seek(0)
+        source.seek(0)
+        with Image.open(target) as stripped, Image.open(source) as original:
+            self.assertEqual(dict(stripped.getexif()), {})
+            self.assertEqual(stripped.tobytes(), original.tobytes())
+
+    def test_strip_png(self):
+        """Из PNG уходят текстовые чанки."""
+        info = PngInfo()
+        info.add_text("Author", "secret")
+        source = BytesIO()
+        Image.new("RGB", (8, 8), "blue").save(source, "PNG", pnginfo=info)
+        source.seek(0)
+        target = BytesIO()
+        strip_png(source, target)
+        self.assertNotIn(b"secret", target.getvalue())
+        target.seek(0)
+        with Image.open(target) as stripped:
+            stripped.load()
+            self.assertEqual(stripped.size, (8, 8))
+
+    def test_broken_file(self):
+        """Не картинка - ValueError, а не зависание."""
+        with self.assertRaises(ValueError):
+            strip_jpeg(BytesIO(b"not an image"), BytesIO())
+        with self.assertRaises(ValueError):
+            strip_png(BytesIO(b"not an image"), BytesIO())
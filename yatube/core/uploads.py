@@ -0,0 +1,265 @@
+import io
+import shutil
+import struct
+import tempfile
+from functools import partial
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+CHUNK_SIZE = 64 * 1024
+
+EXIF_ORIENTATION = 0x0112
+
+# сегменты JPEG с метаданными: APP1 (EXIF, XMP), APP13 (IPTC), COM
+JPEG_METADATA = {0xE1, 0xED, 0xFE}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_METADATA = {b"eXIf", b"tEXt", b"zTXt", b"iTXt"}
+
+
+class BoundedUploadHandler(TemporaryFileUploadHandler):
+    """
+    Пишет загрузку во временный файл на диске и перестает принимать
+    данные после FILE_UPLOAD_MAX_SIZE байт. Вместо обрезанного файла
+    форма получает пустой файл с настоящим размером и отклоняет его.
+
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.FILE_UPLOAD_MAX_SIZE:
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self.received <= settings.FILE_UPLOAD_MAX_SIZE:
+            return super().file_complete(file_size)
+        self.file.close()
+        return UploadedFile(
+            io.BytesIO(),
+            self.file_name,
+            self.content_type,
+            file_size,
+            self.charset,
+        )
+
+
+def _copy(source, target, size):
+    while size > 0:
+        chunk = source.read(min(size, CHUNK_SIZE))
+        if not chunk:
+            raise ValueError("Unexpected end of file")
+        target.write(chunk)
+        size -= len(chunk)
+
+
+def orientation_segment(orientation):
+    """
+    APP1 с минимальным EXIF, в котором есть только ориентация.
+
+    """
+    tiff = (
+        struct.pack(">2sHI", b"MM", 42, 8)
+        + struct.pack(">HHHIHH", 1, EXIF_ORIENTATION, 3, 1, orientation, 0)
+        + struct.pack(">I", 0)
+    )
+    payload = b"Exif\x00\x00" + tiff
+    return b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+
+
+def strip_jpeg(source, target, orientation=None):
+    """
+    Копирует JPEG без сегментов метаданных, не декодируя пиксели.
+    Ориентация снимка сохраняется, чтобы фото не развернулись.
+
+    """
+    if source.read(2) != b"\xff\xd8":
+        raise ValueError("Not a JPEG file")
+    target.write(b"\xff\xd8")
+    pending = b""
+    if orientation not in (None, 1):
+        pending = orientation_segment(orientation)
+    while True:
+        marker = source.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise ValueError("Broken JPEG marker")
+        while marker[1] == 0xFF:
+            marker = b"\xff" + source.read(1)
+        code = marker[1]
+        if code != 0xE0 and pending:
+            target.write(pending)
+            pending = b""
+        if code in (0xDA, 0xD9):
+            # дальше идут сжатые данные изображения
+            target.write(marker)
+            shutil.copyfileobj(source, target, CHUNK_SIZE)
+            return
+        if 0xD0 <= code <= 0xD7 or code == 0x01:
+            target.write(marker)
+            continue
+        length = source.read(2)
+        size = struct.unpack(">H", length)[0] - 2
+        if code in JPEG_METADATA:
+            source.seek(size, io.SEEK_CUR)
+            continue
+        target.write(marker + length)
+        _copy(source, target, size)
+
+
+def strip_png(source, target):
+    """
+    Копирует PNG без текстовых чанков и eXIf.
+
+    """
+    if source.read(8) != PNG_SIGNATURE:
+        raise ValueError("Not a PNG file")
+    target.write(PNG_SIGNATURE)
+    while True:
+        header = source.read(8)
+        if not header:
+            return
+        if len(header) < 8:
+            raise ValueError("Broken PNG chunk")
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type in PNG_METADATA:
+            source.seek(length + 4, io.SEEK_CUR)
+            continue
+        target.write(header)
+        _copy(source, target, length + 4)
+        if chunk_type == b"IEND":
+            return
+
+
+STRIPPERS = {
+    "JPEG": strip_jpeg,
+    "PNG": strip_png,
+}
+
+
+ERROR_MESSAGES = {
+    "too_large": "Файл больше %(limit)s.",
+    "too_many_pixels": "Картинка больше %(limit)s мегапикселей.",
+    "unsupported_format": "Поддерживаются только %(formats)s.",
+}
+
+
+def bound_image_field(field):
+    """
+    Ограничивает размер файла и число пикселей у forms.ImageField.
+    Тип поля остается прежним, меняется только to_python.
+
+    """
+    field.error_messages = {**field.error_messages, **ERROR_MESSAGES}
+    field.to_python = BoundedImage(field)
+    return field
+
+
+class BoundedImage:
+    """
+    Замена ImageField.to_python: вместо verify() читается только
+    заголовок картинки, а метаданные вырезаются потоковым копированием
+    во временный файл на диске.
+
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.error_messages = field.error_messages
+
+    def __call__(self, data):
+        upload = forms.FileField.to_python(self.field, data)
+        if upload is None:
+            return None
+        if upload.size > settings.FILE_UPLOAD_MAX_SIZE:
+            raise ValidationError(
+                self.error_messages["too_large"],
+                code="too_large",
+                params={
+                    "limit": filesizeformat(settings.FILE_UPLOAD_MAX_SIZE)
+                },
+            )
+        image_format, orientation = self.check_header(upload)
+        content_type = Image.MIME.get(image_format)
+        strip = STRIPPERS.get(image_format)
+        if strip is None:
+            upload.seek(0)
+            upload.content_type = content_type
+            return upload
+        if image_format == "JPEG":
+            strip = partial(strip, orientation=orientation)
+        return self.strip_metadata(upload, strip, content_type)
+
+    def check_header(self, upload):
+        """
+        Проверяет формат и число пикселей по заголовку картинки.
+        Возвращает формат и EXIF-ориентацию JPEG.
+
+        """
+        if hasattr(upload, "temporary_file_path"):
+            source = upload.temporary_file_path()
+        else:
+            upload.seek(0)
+            source = upload
+        try:
+            # Image.open читает только заголовок, пиксели не декодируются
+            with Image.open(source) as image:
+                image_format = image.format
+                width, height = image.size
+                orientation = None
+                if image_format == "JPEG":
+                    orientation = image.getexif().get(EXIF_ORIENTATION)
+        except Exception as exc:
+            raise ValidationError(
+                self.error_messages["invalid_image"], code="invalid_image"
+            ) from exc
+        if image_format not in settings.IMAGE_UPLOAD_FORMATS:
+            raise ValidationError(
+                self.error_messages["unsupported_format"],
+                code="unsupported_format",
+                params={"formats": ", ".join(settings.IMAGE_UPLOAD_FORMATS)},
+            )
+        if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+            raise ValidationError(
+                self.error_messages["too_many_pixels"],
+                code="too_many_pixels",
+                params={"limit": settings.IMAGE_UPLOAD_MAX_PIXELS // 10**6},
+            )
+        return image_format, orientation
+
+    def strip_metadata(self, upload, strip, content_type):
+        """
+        Подменяет содержимое загрузки копией без метаданных. Загрузка
+        с диска копируется в новый временный файл, который закроется
+        вместе с запросом, как и исходный.
+
+        """
+        if hasattr(upload, "temporary_file_path"):
+            stripped = tempfile.NamedTemporaryFile(
+                suffix=".upload", dir=settings.FILE_UPLOAD_TEMP_DIR
+            )
+        else:
+            stripped = io.BytesIO()
+        upload.seek(0)
+        try:
+            strip(upload, stripped)
+        except (ValueError, struct.error) as exc:
+            stripped.close()
+            raise ValidationError(
+                self.error_messages["invalid_image"], code="invalid_image"
+            ) from exc
+        upload.close()
+        upload.file = stripped
+        upload.size = stripped.tell()
+        upload.content_type = content_type
+        upload.seek(0)
+        return upload
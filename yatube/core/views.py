@@ -1,4 +1,10 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+
+from .metrics import registry
 
 
 def page_not_found(request, exception):
@@ -15,3 +21,22 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=""):
     return render(request, "core/403csrf.html")
+
+
+def metrics(request):
+    """
+    Метрики процесса для Prometheus. Доступны персоналу и по токену
+    METRICS_TOKEN в заголовке «Authorization: Bearer».
+
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+    if not (
+        request.user.is_staff
+        or token
+        and constant_time_compare(authorization, f"Bearer {token}")
+    ):
+        raise PermissionDenied
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4"
+    )
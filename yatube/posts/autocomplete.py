@@ -0,0 +1,196 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+from .models import Group, User
+from .utils import bump_generation, get_generation
+
+SEPARATOR = "\0"
+
+
+class PrefixIndex:
+    """
+    Отсортированный список строк «ключ\\0значение» в памяти процесса.
+    Поиск по префиксу - bisect и проход по соседним элементам,
+    O(log n + limit) без обращений к базе.
+
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.by_pk = {}
+
+    @staticmethod
+    def make_entry(value):
+        return f"{value.lower()}{SEPARATOR}{value}"
+
+    def load(self, rows):
+        """Строит индекс целиком из пар (pk, значение)."""
+        self.by_pk = {pk: self.make_entry(value) for pk, value in rows}
+        self.entries = sorted(self.by_pk.values())
+
+    def add(self, pk, value):
+        entry = self.make_entry(value)
+        old = self.by_pk.get(pk)
+        if old == entry:
+            return
+        if old is not None:
+            self.remove(pk)
+        self.by_pk[pk] = entry
+        insort(self.entries, entry)
+
+    def remove(self, pk):
+        entry = self.by_pk.pop(pk, None)
+        if entry is None:
+            return
+        index = bisect_left(self.entries, entry)
+        if index < len(self.entries) and self.entries[index] == entry:
+            del self.entries[index]
+
+    def search(self, prefix, limit):
+        prefix = prefix.lower()
+        found = []
+        index = bisect_left(self.entries, prefix)
+        while index < len(self.entries) and len(found) < limit:
+            entry = self.entries[index]
+            if not entry.startswith(prefix):
+                break
+            found.append(entry.split(SEPARATOR, 1)[1])
+            index += 1
+        return found
+
+
+class ModelIndex:
+    """
+    Индекс одного поля модели. Загружается при старте воркера
+    (AUTOCOMPLETE_WARMUP) или при первом обращении, изменения в своем
+    процессе приходят сигналами. Не чаще раза
+    в AUTOCOMPLETE_SYNC_INTERVAL секунд новые записи из других
+    процессов дочитываются по возрастанию pk, а после удаления или
+    переименования в любом процессе (общее поколение в кэше) индекс
+    перестраивается целиком.
+
+    """
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.generation_name = (
+            f"autocomplete:{model._meta.label_lower}.{field}"
+        )
+        self.previous_attr = f"_autocomplete_previous_{field}"
+        self.index = PrefixIndex()
+        self.loaded = False
+        self.generation = None
+        self.last_pk = 0
+        self.last_sync = 0.0
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.index = PrefixIndex()
+            self.loaded = False
+            self.generation = None
+            self.last_pk = 0
+            self.last_sync = 0.0
+
+    def _rows(self, queryset):
+        return queryset.order_by("pk").values_list("pk", self.field)
+
+    def _sync(self):
+        now = time.monotonic()
+        if (
+            self.loaded
+            and now - self.last_sync < settings.AUTOCOMPLETE_SYNC_INTERVAL
+        ):
+            return
+        # поколение читается до строк: сдвиг между ними приведет
+        # к лишней перезагрузке, а не к пропущенной
+        generation = get_generation(self.generation_name)
+        if not self.loaded or generation != self.generation:
+            rows = list(self._rows(self.model.objects.all()))
+            self.index.load(rows)
+            self.loaded = True
+            self.last_pk = 0
+        else:
+            rows = list(
+                self._rows(self.model.objects.filter(pk__gt=self.last_pk))
+            )
+            for pk, value in rows:
+                self.index.add(pk, value)
+        if rows:
+            self.last_pk = max(self.last_pk, rows[-1][0])
+        self.generation = generation
+        self.last_sync = now
+
+    def search(self, prefix, limit=None):
+        limit = limit or settings.AUTOCOMPLETE_LIMIT
+        with self.lock:
+            self._sync()
+            return self.index.search(prefix, limit)
+
+    def warm(self):
+        """Загружает индекс заранее, до первого запроса подсказок."""
+        with self.lock:
+            self._sync()
+
+    def remember(self, instance, update_fields=None):
+        """
+        Запоминает значение поля до сохранения: по нему add узнает
+        о переименовании, даже если индекс в процессе не загружен.
+
+        """
+        previous = None
+        if instance.pk and (
+            update_fields is None or self.field in update_fields
+        ):
+            previous = (
+                self.model.objects.filter(pk=instance.pk)
+                .values_list(self.field, flat=True)
+                .first()
+            )
+        setattr(instance, self.previous_attr, previous)
+
+    def add(self, instance, created=True):
+        """
+        Запись после сохранения. Переименование сдвигает поколение,
+        чтобы другие процессы убрали старое значение.
+
+        """
+        value = getattr(instance, self.field)
+        with self.lock:
+            if self.loaded:
+                self.index.add(instance.pk, value)
+        previous = getattr(instance, self.previous_attr, None)
+        if not created and previous is not None and previous != value:
+            bump_generation(self.generation_name)
+
+    def remove(self, instance):
+        with self.lock:
+            if self.loaded:
+                self.index.remove(instance.pk)
+        bump_generation(self.generation_name)
+
+
+users = ModelIndex(User, "username")
+groups = ModelIndex(Group, "slug")
+
+TRIGGERS = {"@": users, "#": groups}
+
+
+def warm():
+    """Загружает все индексы подсказок, см. AUTOCOMPLETE_WARMUP."""
+    for index in TRIGGERS.values():
+        index.warm()
+
+
+def suggest(query):
+    """
+    Подсказки для упоминания: «@ali» - пользователи, «#cat» - группы.
+
+    """
+    if len(query) < 2 or query[0] not in TRIGGERS:
+        return []
+    return TRIGGERS[query[0]].search(query[1:])
@@ -0,0 +1,277 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from . import invalidation
+from .models import Comment, Post, User
+
+logger = logging.getLogger(__name__)
+
+# Очереди и поток сброса общие для всех потоков процесса.
+_buffers = {}
+_flusher = None
+_lock = threading.Lock()
+
+
+class CommentBuffer:
+    """
+    Очередь комментариев в локальном файле SQLite. Добавление - одна
+    короткая транзакция в своем файле, не в основной базе. Сброс
+    забирает пачку строк с арендой на COMMENT_BUFFER_LEASE секунд,
+    поэтому несколько процессов не запишут одну строку дважды, а строки
+    упавшего процесса заберут после окончания аренды.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.thread = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self.thread, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            # подтвержденный комментарий должен пережить и сбой питания
+            connection.execute("PRAGMA synchronous=FULL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS comments ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "post_id INTEGER NOT NULL, author_id INTEGER NOT NULL, "
+                "text TEXT NOT NULL, created REAL NOT NULL, "
+                "claimed_until REAL NOT NULL DEFAULT 0)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS comments_post_author "
+                "ON comments (post_id, author_id)"
+            )
+            self.thread.connection = connection
+        return connection
+
+    def append(self, post_id, author_id, text):
+        self.connection.execute(
+            "INSERT INTO comments (post_id, author_id, text, created) "
+            "VALUES (?, ?, ?, ?)",
+            (post_id, author_id, text, time.time()),
+        )
+
+    def pending(self, post_id, author_id):
+        """Строки автора к посту, которых еще нет в основной базе."""
+        return self.connection.execute(
+            "SELECT text, created FROM comments "
+            "WHERE post_id = ? AND author_id = ? ORDER BY id",
+            (post_id, author_id),
+        ).fetchall()
+
+    def claim(self, limit):
+        """Забирает в аренду пачку свободных строк по порядку id."""
+        now = time.time()
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                "SELECT id, post_id, author_id, text, created FROM comments "
+                "WHERE claimed_until < ? ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE comments SET claimed_until = ? WHERE id = ?",
+                [
+                    (now + settings.COMMENT_BUFFER_LEASE, row[0])
+                    for row in rows
+                ],
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return rows
+
+    def delete(self, ids):
+        self.connection.executemany(
+            "DELETE FROM comments WHERE id = ?", [(pk,) for pk in ids]
+        )
+
+    def size(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM comments"
+        ).fetchone()[0]
+
+
+def get_buffer():
+    path = str(settings.COMMENT_BUFFER_PATH)
+    with _lock:
+        buffer = _buffers.get(path)
+        if buffer is None:
+            buffer = _buffers[path] = CommentBuffer(path)
+    return buffer
+
+
+def enqueue(post_id, author, text):
+    """
+    Ставит комментарий в очередь. Он появится в базе при следующем
+    сбросе, а автору показывается сразу через pending_comments.
+
+    """
+    get_buffer().append(post_id, author.pk, text)
+    if settings.COMMENT_BUFFER_THREAD:
+        start_flusher()
+
+
+def pending_comments(post_id, user):
+    """
+    Комментарии пользователя к посту из очереди, еще не записанные
+    в базу, как несохраненные объекты Comment.
+
+    """
+    if not settings.COMMENT_BUFFER or not user.is_authenticated:
+        return []
+    return [
+        Comment(
+            post_id=post_id,
+            author=user,
+            text=text,
+            created=datetime.fromtimestamp(created, timezone.utc),
+        )
+        for text, created in get_buffer().pending(post_id, user.pk)
+    ]
+
+
+@contextmanager
+def queued_time():
+    """
+    Отключает auto_now_add у Comment.created на время пакетной
+    записи: иначе bulk_create заменит время постановки в очередь
+    временем сброса. При включенной очереди комментарии с сайта
+    пишутся только сбросом.
+
+    """
+    field = Comment._meta.get_field("created")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def unwritten(comments):
+    """
+    Комментарии пачки, которых еще нет в базе. Если процесс упал
+    между записью пачки и удалением ее из очереди, строки вернутся
+    после аренды - уже записанные узнаются по посту, автору, времени
+    постановки в очередь и тексту.
+
+    """
+    if not comments:
+        return []
+    written = set(
+        Comment.objects.filter(
+            post_id__in={comment.post_id for comment in comments},
+            created__in={comment.created for comment in comments},
+        ).values_list("post_id", "author_id", "created", "text")
+    )
+    return [
+        comment
+        for comment in comments
+        if (comment.post_id, comment.author_id, comment.created, comment.text)
+        not in written
+    ]
+
+
+def flush(batch_size=None):
+    """
+    Записывает пачку комментариев из очереди одним INSERT.
+    Счетчики постов сдвигаются одним UPDATE на пост, страницы постов
+    сбрасываются в кэше перед сайтом. Возвращает число обработанных
+    строк очереди.
+
+    bulk_create не шлет сигналов Comment, поэтому их учет сделан
+    здесь тем же invalidation.comments_changed. Строки, записанные
+    до падения процесса, при повторном сбросе пропускаются.
+
+    """
+    buffer = get_buffer()
+    rows = buffer.claim(batch_size or settings.COMMENT_BUFFER_BATCH)
+    if not rows:
+        return 0
+    # пост или автор могли быть удалены, пока комментарий ждал
+    post_ids = set(
+        Post.objects.filter(pk__in={row[1] for row in rows}).values_list(
+            "pk", flat=True
+        )
+    )
+    author_ids = set(
+        User.objects.filter(pk__in={row[2] for row in rows}).values_list(
+            "pk", flat=True
+        )
+    )
+    # время комментария - время постановки в очередь, а не сброса
+    comments = [
+        Comment(
+            post_id=post_id,
+            author_id=author_id,
+            text=text,
+            created=datetime.fromtimestamp(created, timezone.utc),
+        )
+        for _, post_id, author_id, text, created in rows
+        if post_id in post_ids and author_id in author_ids
+    ]
+    with transaction.atomic():
+        comments = unwritten(comments)
+        if comments:
+            with queued_time():
+                Comment.objects.bulk_create(comments)
+        invalidation.comments_changed(
+            Counter(comment.post_id for comment in comments)
+        )
+    buffer.delete([row[0] for row in rows])
+    return len(rows)
+
+
+def flush_all():
+    """Сбрасывает очередь, пока в ней есть свободные строки."""
+    total = 0
+    while True:
+        done = flush()
+        total += done
+        if done < settings.COMMENT_BUFFER_BATCH:
+            return total
+
+
+class Flusher(threading.Thread):
+    """
+    Фоновый поток процесса, который сбрасывает очередь раз
+    в COMMENT_BUFFER_INTERVAL секунд.
+
+    """
+
+    def run(self):
+        while True:
+            time.sleep(settings.COMMENT_BUFFER_INTERVAL)
+            try:
+                flush_all()
+            except Exception:
+                logger.exception("Comment buffer flush failed")
+            finally:
+                # соединения потока не должны висеть между сбросами
+                connections.close_all()
+
+
+def start_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = Flusher(name="comment-buffer-flusher", daemon=True)
+            _flusher.start()
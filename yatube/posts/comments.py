@@ -0,0 +1,111 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.utils.dateparse import parse_datetime
+
+from .comment_buffer import pending_comments
+from .models import Comment, User
+from .utils import cached_in_bulk, is_bigint
+
+
+def encode_key(created, pk):
+    payload = json.dumps([created.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def encode_cursor(comment):
+    return encode_key(comment.created, comment.pk)
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created = parse_datetime(created)
+        pk = int(pk)
+    except (binascii.Error, ValueError, TypeError, OverflowError):
+        return None
+    if created is None or not is_bigint(pk):
+        return None
+    return created, pk
+
+
+def page_size(value):
+    """Размер страницы из запроса, не больше COMMENTS_MAX_PAGE_SIZE."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return settings.COMMENTS_PAGE_SIZE
+    return min(max(size, 1), settings.COMMENTS_MAX_PAGE_SIZE)
+
+
+def with_pending(comments, pending):
+    """
+    Добавляет в конец комментарии из очереди, кроме тех, что уже
+    записаны в базу и попали на страницу.
+
+    """
+    # из одинаковых комментариев автора в словаре остается последний
+    stored = {
+        (comment.author_id, comment.text): comment.created
+        for comment in comments
+    }
+
+    def written(comment):
+        created = stored.get((comment.author_id, comment.text))
+        return created is not None and created >= comment.created
+
+    return comments + [comment for comment in pending if not written(comment)]
+
+
+def seek(comments, after):
+    """Комментарии строго после пары (created, id) из курсора."""
+    created, pk = after
+    # created__gte задает диапазон по индексу, остальное
+    # отсекает уже показанные комментарии с тем же created
+    return comments.filter(
+        Q(created__gt=created) | Q(pk__gt=pk), created__gte=created
+    )
+
+
+def comment_page(post_id, cursor=None, limit=None, user=None):
+    """
+    Страница комментариев поста по порядку (created, id) и курсор
+    следующей страницы (None, если она последняя). Страница после
+    курсора читается по индексу (post, created, id) без OFFSET,
+    авторы собираются одним запросом через кэш объектов. На последнюю
+    страницу попадают и еще не записанные комментарии user из очереди.
+
+    """
+    limit = limit or settings.COMMENTS_PAGE_SIZE
+    comments = Comment.objects.filter(post_id=post_id)
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None:
+        comments = seek(comments, after)
+    comments = list(comments.order_by("created", "pk")[: limit + 1])
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        next_cursor = encode_cursor(comments[-1])
+    authors = cached_in_bulk(
+        User.objects.all(),
+        {comment.author_id for comment in comments if comment.author_id},
+    )
+    for comment in comments:
+        comment.author = authors.get(comment.author_id)
+    if next_cursor is None and user is not None:
+        comments = with_pending(comments, pending_comments(post_id, user))
+    return comments, next_cursor
+
+
+def more_url(post_id, cursor):
+    """Адрес фрагмента со следующей страницей комментариев."""
+    if cursor is None:
+        return None
+    url = reverse("posts:post_comments", args=[post_id])
+    return f"{url}?{urlencode({'cursor': cursor})}"
@@ -0,0 +1,140 @@
+import calendar
+import hashlib
+from functools import wraps
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .comment_buffer import pending_comments
+from .models import Follow, Group, Post, User
+from .utils import feed_generation, generation_time
+
+
+def page_state(request, newest, generation, *extra):
+    """
+    ETag и Last-Modified страницы. ETag зависит от поколения ленты,
+    пользователя и адреса с параметрами страницы, Last-Modified -
+    самое позднее из времени новейшей записи и изменения ленты.
+
+    """
+    parts = [
+        generation,
+        newest and newest.isoformat(),
+        request.user.pk,
+        request.get_full_path(),
+        *extra,
+    ]
+    etag = hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()
+    last_modified = generation_time(generation)
+    if newest is not None:
+        last_modified = max(last_modified, newest)
+    return etag, last_modified
+
+
+def newest_pub_date(posts):
+    return (
+        posts.order_by("-pub_date").values_list("pub_date", flat=True).first()
+    )
+
+
+def index_state(request):
+    return page_state(
+        request, newest_pub_date(Post.objects), feed_generation("index")
+    )
+
+
+def group_state(request, slug):
+    group_id = (
+        Group.objects.filter(slug=slug).values_list("pk", flat=True).first()
+    )
+    if group_id is None:
+        return None
+    return page_state(
+        request,
+        newest_pub_date(Post.objects.filter(group_id=group_id)),
+        feed_generation(f"group:{group_id}"),
+    )
+
+
+def profile_state(request, username):
+    author_id = (
+        User.objects.filter(username=username)
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if author_id is None:
+        return None
+    following = (
+        request.user.is_authenticated
+        and Follow.objects.filter(
+            user=request.user, author_id=author_id
+        ).exists()
+    )
+    return page_state(
+        request,
+        newest_pub_date(Post.objects.filter(author_id=author_id)),
+        feed_generation(f"author:{author_id}"),
+        following,
+    )
+
+
+def post_state(request, post_id):
+    post = (
+        Post.objects.filter(pk=post_id)
+        .order_by()
+        .values_list("pub_date", "author_id", "group_id", "comments_count")
+        .annotate(newest_comment=Max("comments__created"))
+        .first()
+    )
+    if post is None:
+        return None
+    pub_date, author_id, group_id, comments_count, newest_comment = post
+    # на странице видны автор и группа поста; поколение - время
+    # изменения, поэтому большее из двух сдвигается при любом из них
+    generation = feed_generation(f"author:{author_id}")
+    if group_id is not None:
+        generation = max(generation, feed_generation(f"group:{group_id}"))
+    # свои комментарии из очереди автор должен увидеть без 304
+    pending = len(pending_comments(post_id, request.user))
+    return page_state(
+        request,
+        max(pub_date, newest_comment or pub_date),
+        generation,
+        comments_count,
+        pending,
+    )
+
+
+def conditional_page(state):
+    """
+    Отвечает 304 Not Modified без вызова представления, если ETag или
+    Last-Modified из state(request, ...) совпадают с заголовками
+    запроса. state возвращает None, если страницы нет.
+
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            result = state(request, *args, **kwargs)
+            if result is None:
+                return view(request, *args, **kwargs)
+            etag = quote_etag(result[0])
+            timestamp = calendar.timegm(result[1].utctimetuple())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is not None:
+                return response
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.setdefault("ETag", etag)
+                response.setdefault("Last-Modified", http_date(timestamp))
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,110 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Group, Post, User, UserCounters
+
+
+def get_user_counters(user):
+    """
+    Счетчики пользователя, загруженные через select_related("counters").
+    Для пользователей без строки счетчиков возвращает нули.
+
+    """
+    try:
+        return user.counters
+    except UserCounters.DoesNotExist:
+        return UserCounters(user=user)
+
+
+def shifted(field, delta):
+    """
+    F(field) + delta не ниже нуля: счетчик, разошедшийся с данными
+    (например, после bulk_create без сигналов), не должен нарушать
+    ограничение положительного поля при уменьшении.
+
+    """
+    return Greatest(F(field) + delta, 0)
+
+
+def change_user_counter(user_id, field, delta):
+    """
+    Атомарно сдвигает счетчик пользователя выражением F().
+
+    """
+    updated = UserCounters.objects.filter(user_id=user_id).update(
+        **{field: shifted(field, delta)}
+    )
+    if not updated:
+        UserCounters.objects.get_or_create(user_id=user_id)
+        UserCounters.objects.filter(user_id=user_id).update(
+            **{field: shifted(field, delta)}
+        )
+
+
+def change_users_counter(user_ids, field, delta):
+    """
+    Сдвигает один счетчик нескольких пользователей одним UPDATE.
+    Недостающие строки счетчиков создаются одним INSERT.
+
+    """
+    user_ids = list(user_ids)
+    counters = UserCounters.objects.filter(user_id__in=user_ids)
+    if counters.update(**{field: shifted(field, delta)}) == len(user_ids):
+        return
+    present = set(counters.values_list("user_id", flat=True))
+    missing = [user_id for user_id in user_ids if user_id not in present]
+    UserCounters.objects.bulk_create(
+        (UserCounters(user_id=user_id) for user_id in missing),
+        ignore_conflicts=True,
+    )
+    UserCounters.objects.filter(user_id__in=missing).update(
+        **{field: shifted(field, delta)}
+    )
+
+
+def change_group_counter(group_id, delta):
+    Group.objects.filter(pk=group_id).update(
+        posts_count=shifted("posts_count", delta)
+    )
+
+
+def change_post_counter(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=shifted("comments_count", delta)
+    )
+
+
+def _count_of(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def recount():
+    """
+    Пересчитывает все счетчики по данным таблиц.
+
+    """
+    UserCounters.objects.bulk_create(
+        (
+            UserCounters(user_id=user_id)
+            for user_id in User.objects.filter(
+                counters__isnull=True
+            ).values_list("pk", flat=True)
+        ),
+        ignore_conflicts=True,
+    )
+    Group.objects.update(posts_count=_count_of(Post.objects, "group"))
+    Post.objects.update(comments_count=_count_of(Comment.objects, "post"))
+    UserCounters.objects.update(
+        posts_count=_count_of(Post.objects, "author"),
+        followers_count=_count_of(Follow.objects, "author"),
+        following_count=_count_of(Follow.objects, "user"),
+    )
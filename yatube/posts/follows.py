@@ -0,0 +1,117 @@
+from django.db import IntegrityError, transaction
+from django.dispatch import Signal
+
+from .models import BulkFollow, Follow, UserCounters
+
+# Подписки user_id на author_ids созданы (delta=1) или удалены
+# (delta=-1). Учет подписок (счетчики, лента, поколение) подключен
+# к этому сигналу, а не к post_save/post_delete Follow: пакетные
+# пути не шлют сигналов модели на каждую строку.
+follows_changed = Signal(providing_args=["user_id", "author_ids", "delta"])
+
+
+def changed(user_id, author_ids, delta):
+    """
+    Единая точка учета подписок: ее вызывают и сигналы Follow
+    для одной строки, и пакетные пути для пачки.
+
+    """
+    follows_changed.send(
+        sender=Follow, user_id=user_id, author_ids=author_ids, delta=delta
+    )
+
+
+def follow(user, author):
+    """
+    Подписка одним INSERT. Повторы и гонки двойного клика отсекает
+    уникальное ограничение (user, author). Возвращает True, если
+    подписка создана.
+
+    """
+    if user.pk == author.pk:
+        return False
+    try:
+        with transaction.atomic():
+            Follow.objects.create(user=user, author=author)
+    except IntegrityError:
+        return False
+    return True
+
+
+def unfollow(user, author):
+    """
+    Отписка одним DELETE. Учет ведется по числу удаленных строк
+    в той же транзакции. Возвращает True, если подписка была удалена.
+
+    """
+    with transaction.atomic():
+        deleted, _ = BulkFollow.objects.filter(
+            user=user, author=author
+        ).delete()
+        if deleted:
+            changed(user.pk, [author.pk], -1)
+    return bool(deleted)
+
+
+def follow_many(user, authors):
+    """
+    Подписка на список авторов: один SELECT существующих подписок
+    и один пакетный INSERT. Возвращает число новых подписок.
+
+    """
+    author_ids = {author.pk for author in authors} - {user.pk}
+    with transaction.atomic():
+        return _follow_many(user, author_ids)
+
+
+def _follow_many(user, author_ids):
+    # строка счетчиков подписчика выстраивает пачки одного
+    # пользователя в очередь
+    list(
+        UserCounters.objects.select_for_update()
+        .filter(user=user)
+        .values_list("pk", flat=True)
+    )
+    existing = set(
+        Follow.objects.filter(user=user, author_id__in=author_ids).values_list(
+            "author_id", flat=True
+        )
+    )
+    missing = author_ids - existing
+    Follow.objects.bulk_create(
+        (Follow(user=user, author_id=author_id) for author_id in missing),
+        ignore_conflicts=True,
+    )
+    # ignore_conflicts молча пропускает строки, поэтому учитываются
+    # только те, что действительно легли в таблицу
+    added = sorted(
+        Follow.objects.filter(user=user, author_id__in=missing).values_list(
+            "author_id", flat=True
+        )
+    )
+    if added:
+        changed(user.pk, added, 1)
+    return len(added)
+
+
+def unfollow_many(user, authors):
+    """
+    Отписка от списка авторов одним DELETE. Возвращает число
+    удаленных подписок.
+
+    """
+    author_ids = [author.pk for author in authors]
+    with transaction.atomic():
+        return _unfollow_many(user, author_ids)
+
+
+def _unfollow_many(user, author_ids):
+    existing = list(
+        Follow.objects.select_for_update()
+        .filter(user=user, author_id__in=author_ids)
+        .values_list("author_id", flat=True)
+    )
+    if existing:
+        BulkFollow.objects.filter(user=user, author_id__in=existing).delete()
+        changed(user.pk, existing, -1)
+    return len(existing)
@@ -1,4 +1,7 @@
 from django import forms
+
+from core.uploads import bound_image_field
+
 from .models import Comment, Post
 
 
@@ -6,6 +9,7 @@ class PostForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields["group"].empty_label = "Группа не выбрана"
+        bound_image_field(self.fields["image"])
 
     class Meta:
         model = Post
@@ -0,0 +1,135 @@
+import json
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from . import invalidation
+from .models import Post
+
+FORMATS = {
+    "avif": ("AVIF", "image/avif"),
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+EXIF_ORIENTATION = 0x0112
+# ориентации EXIF с поворотом на 90°: ширина и высота меняются местами
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def available_formats():
+    """
+    Форматы из IMAGE_VARIANT_FORMATS, которые умеет сохранять
+    установленный Pillow. JPEG нужен всегда как запасной вариант.
+
+    """
+    Image.init()
+    formats = [
+        name
+        for name in settings.IMAGE_VARIANT_FORMATS
+        if FORMATS[name][0] in Image.SAVE
+    ]
+    if "jpeg" not in formats:
+        formats.append("jpeg")
+    return formats
+
+
+def variant_size(width):
+    ratio_width, ratio_height = settings.IMAGE_VARIANT_RATIO
+    return width, round(width * ratio_height / ratio_width)
+
+
+def build_variants(image_name, storage=default_storage):
+    """
+    Сохраняет лестницу ширин картинки во всех доступных форматах
+    и возвращает их описание для Post.image_variants. Описание помнит
+    картинку: варианты прежней не показываются после ее замены.
+
+    """
+    with storage.open(image_name) as image_file:
+        source = Image.open(image_file)
+        size = variant_size(max(settings.IMAGE_VARIANT_WIDTHS))
+        if source.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+            size = size[::-1]
+        # JPEG декодируется сразу в уменьшенном масштабе
+        source.draft("RGB", size)
+        source.load()
+    # снимки с телефонов хранятся повернутыми, браузер поворачивает их
+    # по EXIF, а у вариантов EXIF уже нет
+    source = ImageOps.exif_transpose(source).convert("RGB")
+    stem = posixpath.splitext(posixpath.basename(image_name))[0]
+    sources = []
+    for name in available_formats():
+        pil_format, mime_type = FORMATS[name]
+        files = []
+        for width in settings.IMAGE_VARIANT_WIDTHS:
+            image = ImageOps.fit(
+                source, variant_size(width), Image.LANCZOS
+            )
+            buffer = BytesIO()
+            image.save(
+                buffer, pil_format, quality=settings.IMAGE_VARIANT_QUALITY
+            )
+            saved_name = storage.save(
+                f"posts/variants/{stem}-{width}.{name}",
+                ContentFile(buffer.getvalue()),
+            )
+            files.append([saved_name, width, buffer.tell()])
+        sources.append({"type": mime_type, "files": files})
+    width, height = variant_size(max(settings.IMAGE_VARIANT_WIDTHS))
+    return {
+        "image": image_name,
+        "width": width,
+        "height": height,
+        "sources": sources,
+    }
+
+
+def variant_files(variants):
+    return {
+        name
+        for source in variants["sources"]
+        for name, width, size in source["files"]
+    }
+
+
+def store_variants(image_name):
+    """
+    Строит варианты картинки, записывает их во все посты с ней
+    и удаляет файлы вариантов, которые эти посты показывали раньше.
+
+    """
+    posts = list(Post.objects.filter(image=image_name))
+    if not posts:
+        return
+    variants = build_variants(image_name)
+    Post.objects.filter(image=image_name).update(
+        image_variants=json.dumps(variants)
+    )
+    stale = set()
+    for post in posts:
+        if post.image_variants:
+            previous = json.loads(post.image_variants)
+            stale |= stale_variant_files(previous, image_name)
+        invalidation.post_changed(post)
+    for name in stale - variant_files(variants):
+        default_storage.delete(name)
+
+
+def stale_variant_files(previous, image_name):
+    """
+    Файлы прежних вариантов поста. Варианты замененной картинки
+    остаются, пока ее показывает другой пост.
+
+    """
+    previous_image = previous.get("image")
+    if (
+        previous_image != image_name
+        and Post.objects.filter(image=previous_image).exists()
+    ):
+        return set()
+    return variant_files(previous)
@@ -0,0 +1,33 @@
+from core import edge
+
+from . import counters, surrogates
+from .utils import bump_generation, forget_object
+
+
+def post_changed(post, previous_group_id=None):
+    """
+    Сбрасывает кэши, в которых виден пост: объект cached_in_bulk,
+    фрагменты лент (главная, профиль автора, текущая и прежняя группа)
+    и страницы в кэше перед сайтом.
+
+    """
+    forget_object(post)
+    scopes = {"index", f"author:{post.author_id}"}
+    group_ids = {post.group_id, previous_group_id} - {None}
+    scopes.update(f"group:{group_id}" for group_id in group_ids)
+    for scope in scopes:
+        bump_generation(f"feed:{scope}")
+    if edge.get_purge_backend().enabled:
+        edge.purge(surrogates.post_change_keys(post, previous_group_id))
+
+
+def comments_changed(per_post):
+    """
+    Учет комментариев по постам: счетчик сдвигается на число
+    добавленных (со знаком минус - удаленных) одним UPDATE на пост,
+    страницы постов сбрасываются в кэше перед сайтом.
+
+    """
+    for post_id, delta in per_post.items():
+        counters.change_post_counter(post_id, delta)
+    edge.purge(surrogates.post_key(post_id) for post_id in per_post)
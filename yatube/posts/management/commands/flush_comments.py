@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.comment_buffer import flush_all
+
+
+class Command(BaseCommand):
+    help = "Записывает в базу комментарии из очереди comment_buffer"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Пауза в секундах, когда очередь пуста",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Сбросить текущую очередь и завершиться",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            done = flush_all()
+            if done:
+                self.stdout.write(f"Обработано комментариев: {done}")
+            elif options["once"]:
+                return
+            else:
+                time.sleep(options["interval"])
@@ -0,0 +1,43 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.thumbnails import process_pending
+
+
+class Command(BaseCommand):
+    help = "Генерирует миниатюры картинок постов из очереди"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count(),
+            help="Число процессов пула, 0 - обработка в текущем процессе",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Пауза в секундах, когда очередь пуста",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Обработать текущую очередь и завершиться",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            done = process_pending(
+                processes=options["processes"],
+                batch_size=options["batch_size"],
+            )
+            if done:
+                self.stdout.write(f"Обработано картинок: {done}")
+            elif options["once"]:
+                return
+            else:
+                time.sleep(options["interval"])
@@ -0,0 +1,105 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count_of(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Comment = apps.get_model("posts", "Comment")
+    Follow = apps.get_model("posts", "Follow")
+    Group = apps.get_model("posts", "Group")
+    Post = apps.get_model("posts", "Post")
+    UserCounters = apps.get_model("posts", "UserCounters")
+    UserCounters.objects.bulk_create(
+        [
+            UserCounters(user_id=pk)
+            for pk in User.objects.values_list("pk", flat=True)
+        ]
+    )
+    Group.objects.update(posts_count=_count_of(Post, "group"))
+    Post.objects.update(comments_count=_count_of(Comment, "post"))
+    UserCounters.objects.update(
+        posts_count=_count_of(Post, "author"),
+        followers_count=_count_of(Follow, "author"),
+        following_count=_count_of(Follow, "user"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("posts", "0009_timelineentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserCounters",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="counters",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+                (
+                    "posts_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Число постов"
+                    ),
+                ),
+                (
+                    "followers_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Число подписчиков"
+                    ),
+                ),
+                (
+                    "following_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Число подписок"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Счетчики пользователя",
+            },
+        ),
+        migrations.AddField(
+            model_name="group",
+            name="posts_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Число постов"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="comments_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Число комментариев"
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
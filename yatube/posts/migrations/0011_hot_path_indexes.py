@@ -0,0 +1,87 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:24
+
+from django.db import migrations, models
+import django.db.models.expressions
+from django.db.models import Count, F, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model("posts", "Follow")
+    UserCounters = apps.get_model("posts", "UserCounters")
+    Follow.objects.filter(user=F("author")).delete()
+    duplicates = (
+        Follow.objects.values("user", "author")
+        .annotate(first_id=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+    for row in duplicates:
+        Follow.objects.filter(user=row["user"], author=row["author"]).exclude(
+            id=row["first_id"]
+        ).delete()
+
+    def count_of(field):
+        return Coalesce(
+            Subquery(
+                Follow.objects.filter(**{field: OuterRef("pk")})
+                .order_by()
+                .values(field)
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+
+    UserCounters.objects.update(
+        followers_count=count_of("author"), following_count=count_of("user")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0010_counters"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_follows, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "created", "id"],
+                name="comment_post_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="post_author_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["group", "-pub_date", "-id"],
+                name="post_group_date_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="follow",
+            constraint=models.UniqueConstraint(
+                fields=("user", "author"), name="follow_unique_user_author"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="follow",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    _negated=True,
+                    user=django.db.models.expressions.F("author"),
+                ),
+                name="follow_prevent_self_follow",
+            ),
+        ),
+    ]
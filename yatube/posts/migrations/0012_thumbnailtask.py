@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0011_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThumbnailTask",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "image",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Картинка"
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата постановки"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Задача миниатюр",
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:29
+
+from django.db import migrations, models
+
+
+def enqueue_images(apps, schema_editor):
+    Post = apps.get_model("posts", "Post")
+    ThumbnailTask = apps.get_model("posts", "ThumbnailTask")
+    images = (
+        Post.objects.exclude(image="")
+        .values_list("image", flat=True)
+        .distinct()
+    )
+    ThumbnailTask.objects.bulk_create(
+        [ThumbnailTask(image=image) for image in images],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0012_thumbnailtask"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="image_variants",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                verbose_name="Варианты картинки",
+            ),
+        ),
+        migrations.RunPython(enqueue_images, migrations.RunPython.noop),
+    ]
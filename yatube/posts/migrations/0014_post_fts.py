@@ -0,0 +1,32 @@
+from django.db import migrations
+
+FTS_TABLE = "posts_post_fts"
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "text, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, text) "
+        "SELECT id, text FROM posts_post"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0013_post_image_variants"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0014_post_fts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["-pub_date", "-id"], name="post_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0015_post_date_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="timelineentry",
+            name="timeline_user_date_idx",
+        ),
+        migrations.AddIndex(
+            model_name="timelineentry",
+            index=models.Index(
+                fields=["user", "-pub_date", "-post"],
+                name="timeline_user_date_post_idx",
+            ),
+        ),
+    ]
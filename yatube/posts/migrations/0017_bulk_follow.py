@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:19
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0016_timeline_entry_order_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BulkFollow",
+            fields=[],
+            options={
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("posts.follow",),
+        ),
+    ]
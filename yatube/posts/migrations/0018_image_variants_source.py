@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:48
+
+import json
+
+from django.db import migrations
+
+
+def remember_variant_images(apps, schema_editor):
+    Post = apps.get_model("posts", "Post")
+    posts = (
+        Post.objects.exclude(image_variants="")
+        .values_list("pk", "image", "image_variants")
+        .iterator()
+    )
+    for pk, image, image_variants in posts:
+        variants = json.loads(image_variants)
+        variants["image"] = image
+        Post.objects.filter(pk=pk).update(image_variants=json.dumps(variants))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0017_bulk_follow"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remember_variant_images, migrations.RunPython.noop
+        ),
+    ]
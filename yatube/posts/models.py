@@ -1,6 +1,9 @@
+import json
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils.functional import cached_property
 
 User = get_user_model()
 
@@ -16,6 +19,9 @@ class Group(models.Model):
         verbose_name="Идентификатор",
     )
     description = models.TextField(verbose_name="Описание")
+    posts_count = models.PositiveIntegerField(
+        "Число постов", default=0, editable=False
+    )
 
     def __str__(self):
         return self.title
@@ -47,13 +53,67 @@ class Post(models.Model):
         upload_to="posts/",
         blank=True,
     )
+    comments_count = models.PositiveIntegerField(
+        "Число комментариев", default=0, editable=False
+    )
+    image_variants = models.TextField(
+        "Варианты картинки", blank=True, default="", editable=False
+    )
 
     class Meta:
         ordering = ["-pub_date"]
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "-id"],
+                name="post_date_idx",
+            ),
+            models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="post_author_date_idx",
+            ),
+            models.Index(
+                fields=["group", "-pub_date", "-id"],
+                name="post_group_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.text[: settings.NUM_OF_SYMBOLS_ON_TEXT]
 
+    @cached_property
+    def image_picture(self):
+        """
+        Данные для <picture> из готовых вариантов картинки: source
+        для современных форматов и img с JPEG. None, пока варианты
+        текущей картинки не построены.
+
+        """
+        if not self.image or not self.image_variants:
+            return None
+        variants = json.loads(self.image_variants)
+        if variants.get("image") != self.image.name:
+            return None
+        storage = self.image.storage
+        sources = [
+            {
+                "type": source["type"],
+                "srcset": ", ".join(
+                    f"{storage.url(name)} {width}w"
+                    for name, width, size in source["files"]
+                ),
+            }
+            for source in variants["sources"]
+        ]
+        fallback = sources.pop()
+        return {
+            "sources": sources,
+            "srcset": fallback["srcset"],
+            "src": storage.url(variants["sources"][-1]["files"][-1][0]),
+            "sizes": settings.IMAGE_VARIANT_SIZES,
+            "width": variants["width"],
+            "height": variants["height"],
+        }
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -80,6 +140,12 @@ class Comment(models.Model):
     class Meta:
         ordering = ["created"]
         verbose_name = "Комментарий"
+        indexes = [
+            models.Index(
+                fields=["post", "created", "id"],
+                name="comment_post_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.text[: settings.NUM_OF_SYMBOLS_ON_TEXT]
@@ -98,3 +164,100 @@ class Follow(models.Model):
         related_name="following",
         verbose_name="Подписка",
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "author"], name="follow_unique_user_author"
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F("author")),
+                name="follow_prevent_self_follow",
+            ),
+        ]
+
+
+class BulkFollow(Follow):
+    """
+    Подписки для пакетного удаления: на прокси не подписаны сигналы
+    удаления, поэтому DELETE через него - один запрос без чтения строк.
+    Учет удаленных подписок делает follows.changed.
+
+    """
+
+    class Meta:
+        proxy = True
+
+
+class TimelineEntry(models.Model):
+    """
+    Запись материализованной ленты подписок: пост автора,
+    разложенный в ленту подписчика при публикации.
+
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Читатель",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Пост",
+    )
+    pub_date = models.DateTimeField("Дата публикации")
+
+    class Meta:
+        ordering = ["-pub_date"]
+        verbose_name = "Запись ленты"
+        indexes = [
+            models.Index(
+                fields=["user", "-pub_date", "-post"],
+                name="timeline_user_date_post_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="timeline_unique_user_post"
+            ),
+        ]
+
+
+class UserCounters(models.Model):
+    """
+    Денормализованные счетчики пользователя. Обновляются сигналами,
+    пересчитываются командой recount.
+
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="counters",
+        verbose_name="Пользователь",
+    )
+    posts_count = models.PositiveIntegerField("Число постов", default=0)
+    followers_count = models.PositiveIntegerField(
+        "Число подписчиков", default=0
+    )
+    following_count = models.PositiveIntegerField("Число подписок", default=0)
+
+    class Meta:
+        verbose_name = "Счетчики пользователя"
+
+
+class ThumbnailTask(models.Model):
+    """
+    Очередь фоновой генерации миниатюр для загруженных картинок.
+
+    """
+
+    image = models.CharField("Картинка", max_length=255, unique=True)
+    created = models.DateTimeField("Дата постановки", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Задача миниатюр"
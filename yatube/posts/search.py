@@ -0,0 +1,213 @@
+import base64
+import binascii
+import json
+import math
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections, router
+from django.utils.module_loading import import_string
+
+from .models import Post
+from .utils import is_bigint
+
+FTS_TABLE = "posts_post_fts"
+MAX_TERMS = 10
+
+
+def parse_terms(query):
+    """
+    Слова запроса в нижнем регистре без синтаксиса FTS. Слово
+    со звездочкой на конце («дожд*») ищется как префикс.
+
+    """
+    return [
+        word + star
+        for word, star in re.findall(r"(\w+)(\*?)", query.lower())
+    ][:MAX_TERMS]
+
+
+def quote_term(term):
+    if term.endswith("*"):
+        return f'"{term[:-1]}"*'
+    return f'"{term}"'
+
+
+class SearchBackend:
+    """
+    Интерфейс поискового индекса постов. search возвращает пары
+    (rank, post_id) по возрастанию rank: чем меньше, тем выше пост
+    в выдаче. after - пара, после которой начинается страница.
+
+    """
+
+    def index(self, post):
+        raise NotImplementedError
+
+    def remove(self, post_id):
+        raise NotImplementedError
+
+    def search(self, terms, limit, after=None):
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Переиндексирует все посты."""
+        for post in Post.objects.only("pk", "text").iterator():
+            self.index(post)
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    Полнотекстовый индекс SQLite FTS5 с ранжированием bm25 среди
+    свежих совпадений. Таблица создается миграцией 0014 и обновляется
+    сигналами.
+
+    """
+
+    def __init__(self):
+        self.alias = router.db_for_write(Post)
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def index(self, post):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post.pk]
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)",
+                [post.pk, post.text],
+            )
+
+    def remove(self, post_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id]
+            )
+
+    def search(self, terms, limit, after=None):
+        """
+        bm25 считается только для последних SEARCH_RANK_WINDOW
+        совпадений, иначе частое слово ранжирует весь индекс. Более
+        старые совпадения идут после них от новых к старым с рангом
+        1 / rowid: он больше любого bm25 (тот отрицателен) и растет
+        к старым постам, поэтому курсор (rank, rowid) общий для обеих
+        частей выдачи.
+
+        """
+        match = " AND ".join(quote_term(term) for term in terms)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COALESCE(MIN(rowid), 0) FROM (SELECT rowid "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                "ORDER BY rowid DESC LIMIT %s)",
+                [match, settings.SEARCH_RANK_WINDOW],
+            )
+            boundary = cursor.fetchone()[0]
+            hits = []
+            if after is None or after[0] <= 0:
+                sql = (
+                    f"SELECT rank, rowid FROM {FTS_TABLE} "
+                    f"WHERE {FTS_TABLE} MATCH %s AND rowid >= %s"
+                )
+                params = [match, boundary]
+                if after is not None:
+                    sql += " AND (rank, rowid) > (%s, %s)"
+                    params.extend(after)
+                cursor.execute(
+                    f"{sql} ORDER BY rank, rowid LIMIT %s", [*params, limit]
+                )
+                hits = cursor.fetchall()
+            else:
+                boundary = min(boundary, after[1])
+            if len(hits) < limit:
+                cursor.execute(
+                    f"SELECT rowid FROM {FTS_TABLE} "
+                    f"WHERE {FTS_TABLE} MATCH %s AND rowid < %s "
+                    "ORDER BY rowid DESC LIMIT %s",
+                    [match, boundary, limit - len(hits)],
+                )
+                hits += [(1 / rowid, rowid) for rowid, in cursor.fetchall()]
+        return hits
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, text) "
+                f"SELECT id, text FROM {Post._meta.db_table}"
+            )
+
+
+class DatabaseSearchBackend(SearchBackend):
+    """
+    Запасной вариант без индекса для СУБД без FTS5: LIKE по тексту,
+    новые посты выше.
+
+    """
+
+    def index(self, post):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def search(self, terms, limit, after=None):
+        posts = Post.objects.all()
+        for term in terms:
+            posts = posts.filter(text__icontains=term.rstrip("*"))
+        if after is not None:
+            posts = posts.filter(pk__lt=after[1])
+        post_ids = posts.order_by("-pk").values_list("pk", flat=True)
+        return [(-pk, pk) for pk in post_ids[:limit]]
+
+    def rebuild(self):
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+def encode_cursor(rank, post_id):
+    payload = json.dumps([rank, post_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, post_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        rank, post_id = float(rank), int(post_id)
+    except (binascii.Error, ValueError, TypeError, OverflowError):
+        return None
+    if not math.isfinite(rank) or not is_bigint(post_id):
+        return None
+    return rank, post_id
+
+
+def search_posts(query, cursor=None, per_page=None):
+    """
+    Страница результатов поиска: посты в порядке ранга и курсор
+    следующей страницы (None, если она последняя).
+
+    """
+    per_page = per_page or settings.NUM_OF_POSTS_ON_PAGE
+    terms = parse_terms(query)
+    if not terms:
+        return [], None
+    after = decode_cursor(cursor) if cursor else None
+    hits = get_backend().search(terms, per_page + 1, after)
+    next_cursor = None
+    if len(hits) > per_page:
+        hits = hits[:per_page]
+        next_cursor = encode_cursor(*hits[-1])
+    posts = Post.objects.select_related("author", "group").in_bulk(
+        [post_id for rank, post_id in hits]
+    )
+    found = [posts[post_id] for rank, post_id in hits if post_id in posts]
+    return found, next_cursor
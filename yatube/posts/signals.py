@@ -0,0 +1,214 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core import edge
+
+from . import (
+    autocomplete,
+    counters,
+    follows,
+    invalidation,
+    search,
+    surrogates,
+    timeline,
+)
+from .models import Comment, Follow, Group, Post, User, UserCounters
+from .utils import POSTS_GENERATION, bump_generation, forget_object
+
+# Посты, которые удаляются в этом потоке. Их комментарии удаляются
+# каскадом в той же транзакции, и сдвигать счетчик и сбрасывать
+# страницу поста для каждого из них незачем. Порядок post_delete
+# поста и комментариев не задан, поэтому отметка снимается после
+# коммита или при новом сохранении поста с тем же id.
+_deleting = threading.local()
+
+
+def deleting_posts():
+    if not hasattr(_deleting, "post_ids"):
+        _deleting.post_ids = set()
+    return _deleting.post_ids
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_posts_generation(sender, **kwargs):
+    """Сбрасывает кэшированные счетчики лент."""
+    bump_generation(POSTS_GENERATION)
+
+
+@receiver(post_save, sender=User)
+def create_user_counters(sender, instance, created, **kwargs):
+    if created:
+        UserCounters.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_group(sender, instance, **kwargs):
+    instance._previous_group_id = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list("group_id", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    deleting_posts().discard(instance.pk)
+    previous_group_id = getattr(instance, "_previous_group_id", None)
+    group_changed = created or previous_group_id != instance.group_id
+    if created:
+        counters.change_user_counter(instance.author_id, "posts_count", 1)
+        timeline.fan_out(instance)
+    if group_changed and previous_group_id:
+        counters.change_group_counter(previous_group_id, -1)
+    if group_changed and instance.group_id:
+        counters.change_group_counter(instance.group_id, 1)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleting_post(sender, instance, **kwargs):
+    post_id = instance.pk
+    deleting_posts().add(post_id)
+    transaction.on_commit(lambda: deleting_posts().discard(post_id))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_user_counter(instance.author_id, "posts_count", -1)
+    if instance.group_id:
+        counters.change_group_counter(instance.group_id, -1)
+    timeline.post_removed(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if not instance.post_id:
+        return
+    if created:
+        invalidation.comments_changed({instance.post_id: 1})
+    else:
+        edge.purge([surrogates.post_key(instance.post_id)])
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id and instance.post_id not in deleting_posts():
+        invalidation.comments_changed({instance.post_id: -1})
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        follows.changed(instance.user_id, [instance.author_id], 1)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    follows.changed(instance.user_id, [instance.author_id], -1)
+
+
+@receiver(follows.follows_changed)
+def count_follows(sender, user_id, author_ids, delta, **kwargs):
+    """
+    Учет подписок для одной строки и для пачки: счетчики сдвигаются
+    двумя UPDATE, лента пользователя обновляется одной выборкой.
+
+    """
+    counters.change_users_counter(author_ids, "followers_count", delta)
+    counters.change_user_counter(
+        user_id, "following_count", delta * len(author_ids)
+    )
+    if delta > 0:
+        timeline.follows_added(user_id, author_ids)
+    else:
+        timeline.follows_removed(user_id, author_ids)
+    bump_generation(POSTS_GENERATION)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, signal, **kwargs):
+    previous_group_id = (
+        getattr(instance, "_previous_group_id", None)
+        if signal is post_save
+        else None
+    )
+    invalidation.post_changed(instance, previous_group_id)
+
+
+@receiver(post_save, sender=Group)
+def bump_group_feed_generation(sender, instance, **kwargs):
+    """Заголовок и описание группы видны на странице ее ленты."""
+    bump_generation(f"feed:group:{instance.pk}")
+
+
+@receiver(post_save, sender=User)
+def bump_author_feed_generation(sender, instance, **kwargs):
+    """Имя автора видно на странице профиля."""
+    bump_generation(f"feed:author:{instance.pk}")
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    """Обновляет пост в поисковом индексе."""
+    if update_fields is None or "text" in update_fields:
+        search.get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.get_backend().remove(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    autocomplete.users.remember(instance, update_fields)
+
+
+@receiver(post_save, sender=User)
+def index_username(sender, instance, created, **kwargs):
+    autocomplete.users.add(instance, created)
+
+
+@receiver(post_delete, sender=User)
+def unindex_username(sender, instance, **kwargs):
+    autocomplete.users.remove(instance)
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_slug(sender, instance, update_fields=None, **kwargs):
+    autocomplete.groups.remember(instance, update_fields)
+
+
+@receiver(post_save, sender=Group)
+def index_group_slug(sender, instance, created, **kwargs):
+    autocomplete.groups.add(instance, created)
+
+
+@receiver(post_delete, sender=Group)
+def unindex_group_slug(sender, instance, **kwargs):
+    autocomplete.groups.remove(instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def forget_cached_object(sender, instance, **kwargs):
+    """Сбрасывает объект в кэше cached_in_bulk."""
+    forget_object(instance)
+
+
+@receiver(post_save, sender=Group)
+def purge_group_page(sender, instance, **kwargs):
+    edge.purge([surrogates.group_key(instance.slug)])
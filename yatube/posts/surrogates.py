@@ -0,0 +1,59 @@
+from urllib.parse import quote
+
+from .models import Group
+
+INDEX_KEY = "index"
+
+
+def surrogate_key(prefix, value):
+    # заголовок должен оставаться ASCII без пробелов, а имена
+    # пользователей могут быть в юникоде
+    return f"{prefix}-{quote(str(value), safe='')}"
+
+
+def post_key(post_id):
+    return surrogate_key("post", post_id)
+
+
+def group_key(slug):
+    return surrogate_key("group", slug)
+
+
+def author_key(username):
+    return surrogate_key("author", username)
+
+
+def index_keys(request):
+    return [INDEX_KEY]
+
+
+def group_keys(request, slug):
+    return [group_key(slug)]
+
+
+def profile_keys(request, username):
+    return [author_key(username)]
+
+
+def post_keys(request, post_id):
+    return [post_key(post_id)]
+
+
+def post_change_keys(post, previous_group_id=None):
+    """
+    Страницы, на которых виден пост: он сам, главная, профиль автора,
+    текущая группа и группа, из которой его перенесли.
+
+    """
+    group_ids = {post.group_id, previous_group_id} - {None}
+    slugs = (
+        Group.objects.filter(pk__in=group_ids).values_list("slug", flat=True)
+        if group_ids
+        else []
+    )
+    return [
+        post_key(post.pk),
+        INDEX_KEY,
+        author_key(post.author.username),
+        *map(group_key, slugs),
+    ]
@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import autocomplete
+from ..autocomplete import PrefixIndex
+from ..models import Group
+from ..utils import get_generation
+
+User = get_user_model()
+
+
+class PrefixIndexTest(TestCase):
+    def test_search(self):
+        """
+        Поиск по префиксу без учета регистра, переименование
+        и удаление обновляют индекс.
+
+        """
+        index = PrefixIndex()
+        index.load([(1, "alice"), (2, "Alex"), (3, "bob")])
+        self.assertEqual(index.search("AL", 10), ["Alex", "alice"])
+        self.assertEqual(index.search("al", 1), ["Alex"])
+        index.add(2, "robert")
+        self.assertEqual(index.search("al", 10), ["alice"])
+        self.assertEqual(index.search("r", 10), ["robert"])
+        index.remove(1)
+        self.assertEqual(index.search("al", 10), [])
+        self.assertEqual(index.search("", 10), ["bob", "robert"])
+
+
+class AutocompleteViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User.objects.create_user(username="alice")
+        User.objects.create_user(username="alex")
+        Group.objects.create(title="Котики", slug="cats", description="-")
+
+    def setUp(self):
+        autocomplete.users.reset()
+        autocomplete.groups.reset()
+        self.addCleanup(autocomplete.users.reset)
+        self.addCleanup(autocomplete.groups.reset)
+
+    def _suggest(self, query):
+        response = self.client.get(reverse("posts:autocomplete"), {"q": query})
+        return response.json()["results"]
+
+    def test_mentions(self):
+        """@ подсказывает пользователей, # - группы."""
+        self.assertEqual(self._suggest("@al"), ["alex", "alice"])
+        self.assertEqual(self._suggest("#ca"), ["cats"])
+        self.assertEqual(self._suggest("al"), [])
+
+    def test_no_queries_per_keystroke(self):
+        """
+        После загрузки индекса подсказки не обращаются к базе,
+        а новые пользователи приходят сигналами.
+
+        """
+        self._suggest("@a")
+        User.objects.create_user(username="albert")
+        with self.assertNumQueries(0):
+            self.assertEqual(autocomplete.suggest("@alb"), ["albert"])
+
+    @override_settings(AUTOCOMPLETE_SYNC_INTERVAL=0)
+    def test_sync_from_other_processes(self):
+        """Записи, созданные без сигналов, дочитываются по pk."""
+        self._suggest("@a")
+        User.objects.bulk_create([User(username="alfred")])
+        self.assertIn("alfred", self._suggest("@alf"))
+
+    @override_settings(AUTOCOMPLETE_SYNC_INTERVAL=0)
+    def test_deletes_and_renames_from_other_processes(self):
+        """
+        Удаление и переименование видны индексу другого процесса:
+        общее поколение сдвигается, и он перестраивается.
+
+        """
+        other = autocomplete.ModelIndex(User, "username")
+        self.assertEqual(other.search("al"), ["alex", "alice"])
+        user = User.objects.get(username="alex")
+        user.username = "bob"
+        user.save()
+        User.objects.get(username="alice").delete()
+        self.assertEqual(other.search("al"), [])
+        self.assertEqual(other.search("bo"), ["bob"])
+
+    def test_save_without_rename_keeps_generation(self):
+        """
+        Сохранение без смены имени не сдвигает поколение, даже если
+        индекс в процессе не загружен.
+
+        """
+        user = User.objects.get(username="alice")
+        generation = get_generation(autocomplete.users.generation_name)
+        user.first_name = "Алиса"
+        user.save()
+        self.assertFalse(autocomplete.users.loaded)
+        self.assertEqual(
+            get_generation(autocomplete.users.generation_name), generation
+        )
+        user.username = "alicia"
+        user.save()
+        self.assertNotEqual(
+            get_generation(autocomplete.users.generation_name), generation
+        )
+
+    def test_warm(self):
+        """Прогретый индекс отвечает без обращений к базе."""
+        autocomplete.warm()
+        with self.assertNumQueries(0):
+            self.assertEqual(autocomplete.suggest("#ca"), ["cats"])
@@ -0,0 +1,158 @@
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..comment_buffer import CommentBuffer, flush, get_buffer
+from ..models import Comment, Post
+
+User = get_user_model()
+
+TEMP_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    COMMENT_BUFFER=True,
+    COMMENT_BUFFER_PATH=f"{TEMP_DIR}/buffer.sqlite3",
+    COMMENT_BUFFER_THREAD=False,
+)
+class CommentBufferTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.post = Post.objects.create(text="Текст", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        get_buffer().connection.execute("DELETE FROM comments")
+        self.client.force_login(self.reader)
+        self.detail = reverse("posts:post_detail", args=[self.post.pk])
+
+    def comment(self, text="Комментарий", post_id=None):
+        return self.client.post(
+            reverse("posts:add_comment", args=[post_id or self.post.pk]),
+            {"text": text},
+        )
+
+    def texts(self, client):
+        response = client.get(self.detail)
+        return [comment.text for comment in response.context["comments"]]
+
+    def test_comment_is_queued(self):
+        """
+        Комментарий попадает в очередь без записи в базу, автор видит
+        его сразу, остальные - после сброса.
+
+        """
+        response = self.comment()
+        self.assertRedirects(response, self.detail)
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(get_buffer().size(), 1)
+        self.assertEqual(self.texts(self.client), ["Комментарий"])
+        self.assertEqual(self.texts(self.client_class()), [])
+
+    def test_flush_writes_batch(self):
+        for n in range(3):
+            self.comment(f"Комментарий {n}")
+        with self.assertNumQueries(7):
+            # посты, авторы, SAVEPOINT, записанные, INSERT, счетчик,
+            # RELEASE
+            self.assertEqual(flush(), 3)
+        self.assertEqual(get_buffer().size(), 0)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 3)
+        self.assertEqual(
+            self.texts(self.client),
+            ["Комментарий 0", "Комментарий 1", "Комментарий 2"],
+        )
+
+    def test_flush_keeps_queued_time(self):
+        """Записанный комментарий сохраняет время постановки в очередь."""
+        self.comment()
+        queued = get_buffer().pending(self.post.pk, self.reader.pk)[0][1]
+        flush()
+        self.assertEqual(
+            Comment.objects.get().created,
+            datetime.fromtimestamp(queued, timezone.utc),
+        )
+
+    @override_settings(COMMENT_BUFFER_LEASE=0)
+    def test_replayed_batch_not_doubled(self):
+        """
+        Пачка, записанная до падения процесса, но не удаленная
+        из очереди, при повторном сбросе не дублируется.
+
+        """
+        self.comment("Первый")
+        self.comment("Второй")
+        with mock.patch.object(
+            CommentBuffer, "delete", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                flush()
+        self.comment("Третий")
+        self.assertEqual(flush(), 3)
+        texts = Comment.objects.order_by("pk").values_list("text", flat=True)
+        self.assertEqual(list(texts), ["Первый", "Второй", "Третий"])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 3)
+
+    def test_written_comment_not_doubled(self):
+        """
+        Пока строка очереди не удалена после записи, комментарий
+        не показывается автору дважды.
+
+        """
+        self.comment()
+        rows = get_buffer().claim(10)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text="Комментарий"
+        )
+        self.assertEqual(self.texts(self.client), ["Комментарий"])
+        get_buffer().delete([row[0] for row in rows])
+
+    def test_claimed_rows_leased(self):
+        """
+        Забранные строки не достаются другому сбросу, пока не кончится
+        аренда.
+
+        """
+        self.comment()
+        self.assertEqual(len(get_buffer().claim(10)), 1)
+        self.assertEqual(get_buffer().claim(10), [])
+        get_buffer().connection.execute(
+            "UPDATE comments SET claimed_until = 0"
+        )
+        self.assertEqual(len(get_buffer().claim(10)), 1)
+
+    def test_deleted_post_dropped(self):
+        post = Post.objects.create(text="Другой", author=self.author)
+        self.comment(post_id=post.pk)
+        post.delete()
+        call_command("flush_comments", "--once", stdout=StringIO())
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(get_buffer().size(), 0)
+
+    def test_missing_post(self):
+        self.assertEqual(self.comment(post_id=999999).status_code, 404)
+
+    def test_pending_comment_changes_etag(self):
+        response = self.client.get(self.detail)
+        self.comment()
+        repeat = self.client.get(
+            self.detail, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(repeat.status_code, 200)
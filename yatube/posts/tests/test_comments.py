@@ -0,0 +1,97 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..comments import comment_page, page_size
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(COMMENTS_PAGE_SIZE=3, COMMENTS_MAX_PAGE_SIZE=5)
+class CommentPageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="author")
+        cls.post = Post.objects.create(text="Текст", author=cls.author)
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.author, text=f"comment{i}")
+            for i in range(7)
+        )
+        # часть комментариев с одинаковым временем: курсор должен
+        # различать их по id
+        same = timezone.now()
+        Comment.objects.filter(
+            pk__in=Comment.objects.order_by("pk").values("pk")[2:5]
+        ).update(created=same)
+        cls.texts = list(
+            Comment.objects.order_by("created", "pk").values_list(
+                "text", flat=True
+            )
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_follow_each_other(self):
+        """
+        Страницы по курсору идут подряд без пропусков и повторов.
+
+        """
+        texts = []
+        cursor = None
+        while True:
+            comments, cursor = comment_page(self.post.pk, cursor)
+            self.assertLessEqual(len(comments), 3)
+            texts += [comment.text for comment in comments]
+            if cursor is None:
+                break
+        self.assertEqual(texts, self.texts)
+
+    def test_authors_hydrated_in_bulk(self):
+        comment_page(self.post.pk)
+        with self.assertNumQueries(1):
+            comments, _ = comment_page(self.post.pk)
+            self.assertEqual(comments[0].author.username, "author")
+
+    def test_bad_cursor_starts_over(self):
+        comments, _ = comment_page(self.post.pk, "не курсор")
+        self.assertEqual(comments[0].text, self.texts[0])
+        created = timezone.now().isoformat()
+        cursor = base64.urlsafe_b64encode(
+            json.dumps([created, 10 ** 30]).encode()
+        ).decode()
+        comments, _ = comment_page(self.post.pk, cursor)
+        self.assertEqual(comments[0].text, self.texts[0])
+
+    def test_page_size_capped(self):
+        self.assertEqual(page_size("1000"), 5)
+        self.assertEqual(page_size("0"), 1)
+        self.assertEqual(page_size("abc"), 3)
+
+    def test_load_more(self):
+        """
+        Страница поста выводит первые комментарии и ссылку на фрагмент
+        со следующими.
+
+        """
+        response = self.client.get(
+            reverse("posts:post_detail", args=[self.post.pk])
+        )
+        self.assertEqual(len(response.context["comments"]), 3)
+        more = response.context["more_comments_url"]
+        texts = []
+        while more:
+            # ?limit= выше предела урезается до COMMENTS_MAX_PAGE_SIZE
+            response = self.client.get(f"{more}&limit=1000")
+            self.assertTemplateUsed(response, "includes/comment_list.html")
+            comments = response.context["comments"]
+            self.assertLessEqual(len(comments), 5)
+            texts += [comment.text for comment in comments]
+            more = response.context["more_comments_url"]
+        self.assertEqual(texts, self.texts[3:])
@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import render
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.group = Group.objects.create(
+            title="Группа", slug="group", description="Описание"
+        )
+        cls.post = Post.objects.create(
+            text="Текст", author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.urls = {
+            "index": reverse("posts:index"),
+            "group": reverse("posts:group_list", args=["group"]),
+            "profile": reverse("posts:profile", args=["author"]),
+            "post": reverse("posts:post_detail", args=[self.post.pk]),
+        }
+
+    def revalidate(self, url, response):
+        """Повторный запрос с валидаторами из прошлого ответа."""
+        with mock.patch("posts.views.render", wraps=render) as rendered:
+            repeat = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        return repeat, rendered.called
+
+    def test_not_modified_skips_render(self):
+        """
+        Страница с тем же ETag отдается как 304 без рендеринга шаблона.
+
+        """
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("Last-Modified", response)
+                repeat, rendered = self.revalidate(url, response)
+                self.assertEqual(repeat.status_code, 304)
+                self.assertFalse(rendered)
+                self.assertEqual(repeat.content, b"")
+
+    def test_if_modified_since(self):
+        response = self.client.get(self.urls["index"])
+        repeat = self.client.get(
+            self.urls["index"],
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_changes_invalidate(self):
+        """
+        Новый пост, правка и комментарий меняют ETag своих страниц.
+
+        """
+        responses = {
+            name: self.client.get(url) for name, url in self.urls.items()
+        }
+        Post.objects.create(text="Новый", author=self.author, group=self.group)
+        for name in ("index", "group", "profile"):
+            with self.subTest(page=name):
+                repeat, rendered = self.revalidate(
+                    self.urls[name], responses[name]
+                )
+                self.assertEqual(repeat.status_code, 200)
+                self.assertTrue(rendered)
+        response = self.client.get(self.urls["post"])
+        Comment.objects.create(post=self.post, author=self.reader, text="К")
+        repeat, _ = self.revalidate(self.urls["post"], response)
+        self.assertEqual(repeat.status_code, 200)
+
+    def test_group_rename_invalidates_post(self):
+        """Новое название группы меняет ETag страницы поста."""
+        response = self.client.get(self.urls["post"])
+        self.group.title = "Новое название"
+        self.group.save()
+        repeat, rendered = self.revalidate(self.urls["post"], response)
+        self.assertEqual(repeat.status_code, 200)
+        self.assertTrue(rendered)
+
+    def test_etag_depends_on_user_and_page(self):
+        """Страница другого пользователя или номера не совпадает."""
+        anonymous = self.client.get(self.urls["index"])
+        self.client.force_login(self.reader)
+        repeat, _ = self.revalidate(self.urls["index"], anonymous)
+        self.assertEqual(repeat.status_code, 200)
+        page = self.client.get(self.urls["index"], {"page": 2})
+        self.assertNotEqual(page["ETag"], repeat["ETag"])
+
+    def test_missing_page(self):
+        response = self.client.get(reverse("posts:group_list", args=["no"]))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response)
@@ -0,0 +1,182 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..follows import follow_many, unfollow_many
+from ..models import Comment, Follow, Group, Post, TimelineEntry, UserCounters
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.group = Group.objects.create(
+            title="test_title",
+            slug="test_slug",
+            description="test_description",
+        )
+        cls.other_group = Group.objects.create(
+            title="other_title",
+            slug="other_slug",
+            description="other_description",
+        )
+
+    def _counters(self, user):
+        return UserCounters.objects.get(user=user)
+
+    def test_post_counters(self):
+        """
+        Счетчики постов автора и группы следуют за созданием,
+        сменой группы и удалением поста.
+
+        """
+        post = Post.objects.create(
+            text="text", author=self.author, group=self.group
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self._counters(self.author).posts_count, 1)
+        self.assertEqual(self.group.posts_count, 1)
+        post.group = self.other_group
+        post.save()
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 1)
+        post.delete()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self._counters(self.author).posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 0)
+
+    def test_comment_and_follow_counters(self):
+        """
+        Счетчики комментариев и подписок обновляются сигналами.
+
+        """
+        post = Post.objects.create(text="text", author=self.author)
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text="comment"
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self._counters(self.author).followers_count, 1)
+        self.assertEqual(self._counters(self.reader).following_count, 1)
+        Follow.objects.all().delete()
+        self.assertEqual(self._counters(self.author).followers_count, 0)
+        self.assertEqual(self._counters(self.reader).following_count, 0)
+
+    def test_drifted_counter_not_below_zero(self):
+        """
+        Уменьшение разошедшегося с данными нулевого счетчика
+        оставляет ноль, а не нарушает ограничение поля.
+
+        """
+        post = Post.objects.create(text="text", author=self.author)
+        Comment.objects.bulk_create(
+            [Comment(post=post, author=self.reader, text="comment")]
+        )
+        Comment.objects.get().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        UserCounters.objects.filter(user=self.reader).update(
+            following_count=0
+        )
+        Follow.objects.bulk_create(
+            [Follow(user=self.reader, author=self.author)]
+        )
+        Follow.objects.get().delete()
+        self.assertEqual(self._counters(self.reader).following_count, 0)
+
+    def test_post_delete_skips_comment_counters(self):
+        """
+        Каскадное удаление комментариев вместе с постом не сдвигает
+        счетчик удаляемого поста для каждого комментария.
+
+        """
+        post = Post.objects.create(text="text", author=self.author)
+        for number in range(3):
+            Comment.objects.create(
+                post=post, author=self.reader, text=f"comment {number}"
+            )
+        with CaptureQueriesContext(connection) as queries:
+            post.delete()
+        self.assertFalse(
+            [
+                query
+                for query in queries
+                if "comments_count" in query["sql"]
+                and query["sql"].startswith("UPDATE")
+            ]
+        )
+        comment = Comment.objects.create(
+            post=Post.objects.create(text="text", author=self.author),
+            author=self.reader,
+            text="comment",
+        )
+        comment.delete()
+        comment.post.refresh_from_db()
+        self.assertEqual(comment.post.comments_count, 0)
+
+    def test_follow_many_batched(self):
+        """
+        Пакетная подписка и отписка обновляют счетчики и ленту
+        числом запросов, не зависящим от числа авторов.
+
+        """
+        authors = [
+            User.objects.create_user(username=f"batch{number}")
+            for number in range(6)
+        ]
+        for author in authors:
+            Post.objects.create(text="text", author=author)
+        queries = []
+        for batch in (authors[:2], authors[2:]):
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(follow_many(self.reader, batch), len(batch))
+            queries.append(len(captured))
+        self.assertEqual(queries[0], queries[1])
+        self.assertEqual(self._counters(self.reader).following_count, 6)
+        self.assertEqual(self._counters(authors[0]).followers_count, 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 6
+        )
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(unfollow_many(self.reader, authors[1:]), 5)
+        self.assertLessEqual(len(captured), queries[0])
+        self.assertEqual(self._counters(self.reader).following_count, 1)
+        self.assertEqual(self._counters(authors[1]).followers_count, 0)
+        self.assertEqual(
+            list(
+                TimelineEntry.objects.filter(user=self.reader).values_list(
+                    "post__author", flat=True
+                )
+            ),
+            [authors[0].pk],
+        )
+
+    def test_recount_repairs_drift(self):
+        """
+        Команда recount восстанавливает счетчики по данным.
+
+        """
+        Post.objects.bulk_create(
+            Post(text=f"text{i}", author=self.author, group=self.group)
+            for i in range(3)
+        )
+        UserCounters.objects.filter(user=self.reader).delete()
+        call_command("recount", stdout=StringIO())
+        self.group.refresh_from_db()
+        self.assertEqual(self._counters(self.author).posts_count, 3)
+        self.assertEqual(self._counters(self.reader).posts_count, 0)
+        self.assertEqual(self.group.posts_count, 3)
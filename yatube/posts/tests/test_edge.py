@@ -0,0 +1,145 @@
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.edge import get_purge_backend
+from core.purge_server import LocalPurgeServer
+
+from ..images import store_variants
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class EdgeHeadersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Группа", slug="group", description="Описание"
+        )
+        cls.post = Post.objects.create(
+            text="Текст", author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.pages = {
+            reverse("posts:index"): "index",
+            reverse("posts:group_list", args=["group"]): "group-group",
+            reverse("posts:profile", args=["author"]): "author-author",
+            reverse(
+                "posts:post_detail", args=[self.post.pk]
+            ): f"post-{self.post.pk}",
+        }
+
+    def test_anonymous_pages_are_public(self):
+        """
+        Анонимная страница кэшируется прокси, несет суррогатный ключ
+        и не зависит от cookie.
+
+        """
+        for url, key in self.pages.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                cache_control = response["Cache-Control"]
+                self.assertIn("public", cache_control)
+                self.assertIn("s-maxage=60", cache_control)
+                self.assertIn("max-age=0", cache_control)
+                self.assertEqual(response["Surrogate-Key"], key)
+                self.assertNotIn("Cookie", response.get("Vary", ""))
+                self.assertFalse(response.cookies)
+
+    def test_not_modified_keeps_headers(self):
+        url = reverse("posts:index")
+        response = self.client.get(url)
+        repeat = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertIn("public", repeat["Cache-Control"])
+        self.assertEqual(repeat["Surrogate-Key"], "index")
+
+    def test_authenticated_pages_are_private(self):
+        self.client.force_login(self.author)
+        for url in self.pages:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn("private", response["Cache-Control"])
+                self.assertNotIn("Surrogate-Key", response)
+                self.assertIn("Cookie", response["Vary"])
+
+    def test_other_pages_untouched(self):
+        response = self.client.get(reverse("posts:search"), {"q": "текст"})
+        self.assertNotIn("Cache-Control", response)
+
+
+class EdgePurgeTest(TransactionTestCase):
+    def setUp(self):
+        self.server = LocalPurgeServer()
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__)
+        overrides = override_settings(
+            EDGE_PURGE_BACKEND="core.edge.HTTPPurgeBackend",
+            EDGE_PURGE_URL=self.server.url,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        get_purge_backend.cache_clear()
+        self.addCleanup(get_purge_backend.cache_clear)
+        cache.clear()
+        self.author = User.objects.create_user(username="author")
+        self.group = Group.objects.create(title="Группа", slug="group")
+        self.other = Group.objects.create(title="Другая", slug="other")
+
+    def purged_keys(self, count):
+        requests = self.server.wait(count)
+        self.assertEqual(len(requests), count)
+        return [
+            set(request["headers"]["Surrogate-Key"].split())
+            for request in requests
+        ]
+
+    def test_post_changes_purge_feeds(self):
+        post = Post.objects.create(
+            text="Текст", author=self.author, group=self.group
+        )
+        keys = {f"post-{post.pk}", "index", "author-author"}
+        post.group = self.other
+        post.save()
+        post.delete()
+        created, moved, deleted = self.purged_keys(5)[2:]
+        self.assertEqual(created, keys | {"group-group"})
+        self.assertEqual(moved, keys | {"group-group", "group-other"})
+        self.assertEqual(deleted, keys | {"group-other"})
+
+    def test_comment_purges_post(self):
+        post = Post.objects.create(text="Текст", author=self.author)
+        Comment.objects.create(post=post, author=self.author, text="Да")
+        self.assertEqual(self.purged_keys(4)[-1], {f"post-{post.pk}"})
+        self.assertEqual(self.server.requests[-1]["method"], "PURGE")
+
+    def test_image_variants_purge_post(self):
+        """Готовые варианты картинки сбрасывают страницы поста."""
+        buffer = BytesIO()
+        Image.new("RGB", (40, 20), "blue").save(buffer, "JPEG")
+        with tempfile.TemporaryDirectory(
+            dir=settings.BASE_DIR
+        ) as media_root, override_settings(MEDIA_ROOT=media_root):
+            name = default_storage.save(
+                "posts/edge.jpg", ContentFile(buffer.getvalue())
+            )
+            post = Post.objects.create(
+                text="Текст", author=self.author, group=self.group, image=name
+            )
+            store_variants(name)
+        self.assertEqual(
+            self.purged_keys(4)[-1],
+            {f"post-{post.pk}", "index", "author-author", "group-group"},
+        )
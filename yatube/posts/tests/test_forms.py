@@ -1,11 +1,13 @@
 import shutil
 import tempfile
+from io import BytesIO
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
 from ..models import Comment, Group, Post
 
@@ -141,3 +143,79 @@ class PostFormTests(TestCase):
         self.assertRedirects(
             response, reverse("posts:post_detail", kwargs={"post_id": post_id})
         )
+
+
+def make_jpeg(size=(4, 4), exif=None):
+    buffer = BytesIO()
+    image = Image.new("RGB", size, "red")
+    if exif is None:
+        image.save(buffer, "JPEG")
+    else:
+        image.save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageUploadLimitsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="uploader")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def _upload(self, content, name="photo.jpg"):
+        return self.authorized_client.post(
+            reverse("posts:post_create"),
+            data={
+                "text": "text",
+                "image": SimpleUploadedFile(
+                    name=name, content=content, content_type="image/jpeg"
+                ),
+            },
+        )
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0, FILE_UPLOAD_MAX_SIZE=100)
+    def test_too_large_file(self):
+        """
+        Загрузка больше FILE_UPLOAD_MAX_SIZE обрывается обработчиком
+        и отклоняется формой.
+
+        """
+        response = self._upload(make_jpeg(size=(64, 64)))
+        self.assertFormError(
+            response, "form", "image", "Файл больше 100\xa0байт."
+        )
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=100)
+    def test_too_many_pixels(self):
+        """Картинка больше IMAGE_UPLOAD_MAX_PIXELS отклоняется."""
+        response = self._upload(make_jpeg(size=(20, 20)))
+        self.assertEqual(
+            response.context["form"].errors["image"][0].count("мегапиксел"), 1
+        )
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_exif_stripped(self):
+        """
+        Из сохраненной картинки вырезан EXIF, кроме ориентации.
+
+        """
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = "Camera maker"
+        self._upload(make_jpeg(exif=exif.tobytes()))
+        post = Post.objects.get()
+        with Image.open(post.image.path) as image:
+            self.assertEqual(dict(image.getexif()), {0x0112: 6})
+            image.load()
+            self.assertEqual(image.size, (4, 4))
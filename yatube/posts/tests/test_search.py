@@ -0,0 +1,124 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post
+from ..search import get_backend, search_posts
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+
+    def _search(self, query, **kwargs):
+        posts, next_cursor = search_posts(query, **kwargs)
+        return [post.text for post in posts], next_cursor
+
+    def test_index_follows_save_and_delete(self):
+        """
+        Индекс обновляется при создании, изменении и удалении поста.
+
+        """
+        post = Post.objects.create(text="Первый снег", author=self.author)
+        self.assertEqual(self._search("снег"), (["Первый снег"], None))
+        post.text = "Летний дождь"
+        post.save()
+        self.assertEqual(self._search("снег"), ([], None))
+        self.assertEqual(self._search("дожд"), ([], None))
+        self.assertEqual(self._search("дожд*"), (["Летний дождь"], None))
+        post.delete()
+        self.assertEqual(self._search("дождь"), ([], None))
+
+    def test_ranking_and_cursor(self):
+        """
+        Более релевантные посты выше, курсор ведет по всей выдаче
+        без повторов.
+
+        """
+        Post.objects.create(text="кот " + "слово " * 20, author=self.author)
+        Post.objects.create(text="кот кот кот", author=self.author)
+        for number in range(3):
+            Post.objects.create(text=f"кот {number} " * 5, author=self.author)
+        texts, next_cursor = self._search("КОТ", per_page=2)
+        self.assertEqual(texts[0], "кот кот кот")
+        found = list(texts)
+        while next_cursor:
+            texts, next_cursor = self._search(
+                "кот", cursor=next_cursor, per_page=2
+            )
+            found.extend(texts)
+        self.assertEqual(len(found), 5)
+        self.assertEqual(len(set(found)), 5)
+        self.assertEqual(found[-1], "кот " + "слово " * 20)
+
+    @override_settings(SEARCH_RANK_WINDOW=3)
+    def test_pages_past_rank_window(self):
+        """
+        Совпадения старше окна ранжирования не теряются: они идут
+        после ранжированных, от новых к старым.
+
+        """
+        posts = [
+            Post.objects.create(text=f"дом {number}", author=self.author)
+            for number in range(7)
+        ]
+        texts, next_cursor = self._search("дом", per_page=2)
+        found = list(texts)
+        while next_cursor:
+            texts, next_cursor = self._search(
+                "дом", cursor=next_cursor, per_page=2
+            )
+            found.extend(texts)
+        self.assertEqual(len(found), 7)
+        self.assertEqual(set(found[:3]), {post.text for post in posts[-3:]})
+        self.assertEqual(found[3:], [post.text for post in posts[3::-1]])
+
+    def test_crafted_cursor_starts_over(self):
+        """
+        Курсор с бесконечным рангом или id вне 64 бит считается
+        битым: выдача начинается с первой страницы.
+
+        """
+        Post.objects.create(text="лес", author=self.author)
+        for after in ([-1.0, 10 ** 30], [float("nan"), 1], ["inf", 1]):
+            with self.subTest(after=after):
+                cursor = base64.urlsafe_b64encode(
+                    json.dumps(after).encode()
+                ).decode()
+                self.assertEqual(
+                    self._search("лес", cursor=cursor), (["лес"], None)
+                )
+
+    def test_query_syntax_is_escaped(self):
+        """Операторы FTS в запросе считаются обычными словами."""
+        Post.objects.create(text="NEAR AND OR", author=self.author)
+        self.assertEqual(self._search('"near" OR (*')[0], ["NEAR AND OR"])
+        self.assertEqual(self._search("!!!"), ([], None))
+
+    @override_settings(SEARCH_BACKEND="posts.search.DatabaseSearchBackend")
+    def test_database_backend(self):
+        """Запасной бэкенд ищет LIKE-ом и отдает новые посты первыми."""
+        get_backend.cache_clear()
+        self.addCleanup(get_backend.cache_clear)
+        Post.objects.create(text="старый пост", author=self.author)
+        Post.objects.create(text="новый пост", author=self.author)
+        texts, next_cursor = self._search("пост", per_page=1)
+        self.assertEqual(texts, ["новый пост"])
+        self.assertEqual(
+            self._search("пост", cursor=next_cursor, per_page=1),
+            (["старый пост"], None),
+        )
+
+    def test_search_page(self):
+        """Страница /search/ показывает найденные посты."""
+        Post.objects.create(text="искомый текст", author=self.author)
+        response = self.client.get(reverse("posts:search"), {"q": "иском*"})
+        self.assertContains(response, "искомый текст")
+        self.assertTemplateUsed(response, "posts/search.html")
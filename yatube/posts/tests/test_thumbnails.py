@@ -0,0 +1,164 @@
+import json
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+
+from ..images import EXIF_ORIENTATION, build_variants, variant_files
+from ..models import Post, ThumbnailTask
+from ..thumbnails import process_pending
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailQueueTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="NoName")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def _create_post(self):
+        self.authorized_client.post(
+            reverse("posts:post_create"),
+            data={
+                "text": "text",
+                "image": SimpleUploadedFile(
+                    name="small.gif",
+                    content=SMALL_GIF,
+                    content_type="image/gif",
+                ),
+            },
+        )
+        return Post.objects.get()
+
+    def test_create_schedules_thumbnails(self):
+        """Создание поста с картинкой ставит ее в очередь миниатюр."""
+        post = self._create_post()
+        self.assertTrue(
+            ThumbnailTask.objects.filter(image=post.image.name).exists()
+        )
+
+    def test_placeholder_until_worker(self):
+        """
+        До обработки очереди шаблон получает оригинал картинки,
+        после - готовую миниатюру, без генерации внутри запроса.
+
+        """
+        post = self._create_post()
+        options = {"crop": "center", "upscale": True}
+        placeholder = get_thumbnail(post.image, "960x339", **options)
+        self.assertEqual(placeholder.name, post.image.name)
+
+        self.assertEqual(process_pending(), 1)
+        self.assertFalse(ThumbnailTask.objects.exists())
+        thumbnail = get_thumbnail(post.image, "960x339", **options)
+        self.assertNotEqual(thumbnail.name, post.image.name)
+        self.assertEqual((thumbnail.width, thumbnail.height), (960, 339))
+        self.assertFalse(ThumbnailTask.objects.exists())
+
+    def test_variants_after_worker(self):
+        """
+        Воркер строит лестницу ширин, и лента отдает srcset
+        вместо единственной миниатюры.
+
+        """
+        post = self._create_post()
+        self.assertIsNone(post.image_picture)
+        process_pending()
+        post.refresh_from_db()
+        variants = json.loads(post.image_variants)
+        jpeg = variants["sources"][-1]
+        self.assertEqual(jpeg["type"], "image/jpeg")
+        self.assertEqual(
+            [width for name, width, size in jpeg["files"]],
+            list(settings.IMAGE_VARIANT_WIDTHS),
+        )
+        response = self.authorized_client.get(reverse("posts:index"))
+        self.assertContains(response, "320w")
+        self.assertContains(response, 'sizes="')
+
+    def test_variants_follow_exif_orientation(self):
+        """
+        Снимок, повернутый тегом EXIF, нарезается так, как его
+        показывает браузер.
+
+        """
+        # в файле левая четверть красная, на экране - верхняя
+        image = Image.new("RGB", (400, 200), "blue")
+        image.paste("red", (0, 0, 100, 200))
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = 6
+        buffer = BytesIO()
+        image.save(buffer, "JPEG", exif=exif.tobytes())
+        name = default_storage.save("posts/rotated.jpg", buffer)
+        variants = build_variants(name)
+        variant_name = variants["sources"][-1]["files"][0][0]
+        with default_storage.open(variant_name) as variant_file:
+            variant = Image.open(variant_file).convert("RGB")
+            red, green, blue = variant.getpixel((0, variant.height // 2))
+        self.assertGreater(blue, red)
+
+    def test_edit_replaces_variants(self):
+        """
+        Варианты старой картинки не показываются после замены,
+        а их файлы удаляются, когда готовы варианты новой.
+
+        """
+        post = self._create_post()
+        process_pending()
+        post.refresh_from_db()
+        old_files = variant_files(json.loads(post.image_variants))
+        self.authorized_client.post(
+            reverse("posts:post_edit", args=(post.pk,)),
+            data={
+                "text": "text",
+                "image": SimpleUploadedFile(
+                    name="other.gif",
+                    content=SMALL_GIF,
+                    content_type="image/gif",
+                ),
+            },
+        )
+        post = Post.objects.get(pk=post.pk)
+        self.assertIsNone(post.image_picture)
+        self.assertTrue(
+            ThumbnailTask.objects.filter(image=post.image.name).exists()
+        )
+        process_pending()
+        post = Post.objects.get(pk=post.pk)
+        self.assertIsNotNone(post.image_picture)
+        for name in old_files:
+            self.assertFalse(default_storage.exists(name))
+        for name in variant_files(json.loads(post.image_variants)):
+            self.assertTrue(default_storage.exists(name))
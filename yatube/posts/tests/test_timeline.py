@@ -0,0 +1,169 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Follow, Post, TimelineEntry
+from ..timeline import (
+    get_timeline,
+    get_timeline_ids,
+    get_timeline_page,
+    timeline_paginator,
+)
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username="reader")
+        cls.author = User.objects.create_user(username="author")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_new_post_fanned_out_to_followers(self):
+        """
+        Новый пост автора попадает в материализованную ленту подписчика.
+
+        """
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text="text", author=self.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(list(get_timeline(self.reader)), [post])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """
+        Подписка копирует старые посты автора в ленту,
+        отписка удаляет их.
+
+        """
+        post = Post.objects.create(text="text", author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(list(get_timeline(self.reader)), [post])
+        Follow.objects.filter(user=self.reader, author=self.author).delete()
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(list(get_timeline(self.reader)), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_celebrity_posts_merged_on_read(self):
+        """
+        Посты «знаменитостей» не раскладываются по лентам,
+        но попадают в ленту при чтении.
+
+        """
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text="text", author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(list(get_timeline(self.reader)), [post])
+
+
+@override_settings(NUM_OF_POSTS_ON_PAGE=2, TIMELINE_CACHE_SIZE=3)
+class TimelineCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username="reader")
+        cls.author = User.objects.create_user(username="author")
+        cls.other = User.objects.create_user(username="other")
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.reader, author=self.other)
+        self.posts = [
+            Post.objects.create(text=f"post {n}", author=self.author)
+            for n in range(2)
+        ]
+
+    def page(self, **params):
+        return get_timeline_page(self.reader, self.factory.get("/", params))
+
+    def test_cached_page_without_queries(self):
+        """
+        Повторное чтение первых страниц ленты не ходит в базу.
+
+        """
+        expected = list(get_timeline(self.reader))
+        self.assertEqual(list(self.page()), expected)
+        with self.assertNumQueries(0):
+            page = self.page()
+            self.assertEqual(list(page), expected)
+            self.assertEqual(page.paginator.num_pages, 1)
+            self.assertEqual(page[0].author.username, "author")
+
+    def test_new_post_resets_cached_ids(self):
+        """
+        Новый пост сбрасывает закэшированную ленту и попадает в ее
+        начало, а когда в кэше не вся лента, дальние страницы читаются
+        из базы.
+
+        """
+        self.page()
+        new = Post.objects.create(text="new", author=self.other)
+        ids, complete = get_timeline_ids(self.reader)
+        self.assertEqual(
+            list(ids), [new.pk, *[p.pk for p in self.posts[::-1]]]
+        )
+        self.assertTrue(complete)
+        Post.objects.create(text="newer", author=self.other)
+        ids, complete = get_timeline_ids(self.reader)
+        self.assertEqual(len(ids), 3)
+        self.assertFalse(complete)
+        self.assertEqual(
+            list(self.page(page=2)), list(get_timeline(self.reader)[2:4])
+        )
+
+    def test_unfollow_filters_cached_ids(self):
+        """Отписка убирает посты автора из закэшированной ленты."""
+        own = Post.objects.create(text="own", author=self.other)
+        self.page()
+        Follow.objects.filter(user=self.reader, author=self.author).delete()
+        ids, complete = get_timeline_ids(self.reader)
+        self.assertEqual(list(ids), [own.pk])
+        self.assertEqual(list(self.page()), [own])
+
+    def test_deleted_post_resets_cached_ids(self):
+        """Удаленный пост пропадает из кэша ленты и из числа страниц."""
+        self.page()
+        self.posts[0].delete()
+        ids, complete = get_timeline_ids(self.reader)
+        self.assertEqual(list(ids), [self.posts[1].pk])
+        page = self.page()
+        self.assertEqual(list(page), [self.posts[1]])
+        self.assertEqual(page.paginator.count, 1)
+
+    def test_edited_post_refreshed(self):
+        """Измененный пост не остается в кэше объектов."""
+        self.page()
+        post = self.posts[-1]
+        post.text = "edited"
+        post.save()
+        self.assertEqual(self.page()[0].text, "edited")
+
+    def test_pages_read_by_entry_index(self):
+        """
+        Страницы из базы идут по курсорам подряд и читаются по индексу
+        записей ленты без сортировки всей ленты.
+
+        """
+        for n in range(3):
+            Post.objects.create(text=f"more {n}", author=self.other)
+        paginator = timeline_paginator(self.reader, 2)
+        page = paginator.get_page(1)
+        found = list(page)
+        with CaptureQueriesContext(connection) as queries:
+            while page.next_cursor:
+                page = paginator.cursor_page(page.next_cursor)
+                found += list(page)
+        self.assertEqual(found, list(get_timeline(self.reader)))
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries[0]['sql']}")
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("timeline_user_date_post_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
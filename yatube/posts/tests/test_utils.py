@@ -0,0 +1,147 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Post
+from ..utils import CursorPaginator, cached_count, estimated_count
+
+User = get_user_model()
+
+
+class CountProvidersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="NoName")
+
+    def setUp(self):
+        cache.clear()
+        Post.objects.bulk_create(
+            Post(text=f"text{i}", author=self.author) for i in range(3)
+        )
+
+    def test_cached_count_invalidated_by_signal(self):
+        """
+        Кэшированный счетчик сбрасывается при создании и удалении поста.
+
+        """
+        queryset = Post.objects.filter(author=self.author)
+        self.assertEqual(cached_count(queryset), 3)
+        post = Post.objects.create(text="new", author=self.author)
+        self.assertEqual(cached_count(queryset), 4)
+        post.delete()
+        self.assertEqual(cached_count(queryset), 3)
+
+    def test_cached_count_hits_cache(self):
+        """
+        Повторный подсчет не выполняет COUNT(*).
+
+        """
+        queryset = Post.objects.filter(author=self.author)
+        cached_count(queryset)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_count(queryset), 3)
+
+    def test_estimated_count_uses_statistics(self):
+        """
+        Оценка берется из sqlite_stat1, без статистики -
+        используется точный подсчет.
+
+        """
+        queryset = Post.objects.all()
+        self.assertEqual(estimated_count(queryset), 3)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        Post.objects.bulk_create(
+            Post(text="extra", author=self.author) for i in range(2)
+        )
+        self.assertEqual(estimated_count(queryset), 3)
+        self.assertEqual(
+            estimated_count(queryset.filter(author=self.author)), 5
+        )
+
+
+class PageWindowTest(TestCase):
+    @override_settings(PAGINATOR_WINDOW=2)
+    def test_page_window(self):
+        """
+        Окно страниц содержит только соседей текущей страницы.
+
+        """
+        paginator = CursorPaginator(
+            Post.objects.all(), 10, count=lambda queryset: 1000
+        )
+        self.assertEqual(list(paginator.page_window(50)), [48, 49, 50, 51, 52])
+        self.assertEqual(list(paginator.page_window(1)), [1, 2, 3])
+        self.assertEqual(list(paginator.page_window(100)), [98, 99, 100])
+
+
+@override_settings(PAGINATOR_WINDOW=2)
+class PageLinksTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username="NoName")
+        Post.objects.bulk_create(
+            Post(text=f"text{i}", author=author) for i in range(11)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.paginator = CursorPaginator(Post.objects.all(), 2)
+        self.pages = [
+            list(Post.objects.order_by("-pub_date", "-pk")[n: n + 2])
+            for n in range(0, 11, 2)
+        ]
+
+    def follow(self, query):
+        return self.paginator.cursor_page(query.split("=", 1)[1])
+
+    def test_links_are_cursors(self):
+        """
+        Ссылки на соседние и последнюю страницы - курсоры, и ни одна
+        выборка не использует OFFSET.
+
+        """
+        with CaptureQueriesContext(connection) as queries:
+            page = self.paginator.cursor_page(None)
+            links = self.paginator.page_links(page)
+            self.assertEqual([number for number, _ in links], [1, 2, 3])
+            third = self.follow(links[-1][1])
+            self.assertEqual(list(third), self.pages[2])
+            back = self.paginator.page_links(self.follow(links[-1][1]))
+            self.assertEqual([number for number, _ in back], [1, 2, 3, 4, 5])
+            self.assertEqual(list(self.follow(back[0][1])), self.pages[0])
+            last = self.follow(self.paginator.last_page_query())
+        self.assertEqual(last.number, 6)
+        self.assertEqual(list(last), self.pages[-2][1:] + self.pages[-1])
+        self.assertIsNone(last.next_cursor)
+        for query in queries.captured_queries:
+            self.assertNotIn("OFFSET", query["sql"])
+
+    def test_crafted_cursor_starts_over(self):
+        """
+        Курсор неверной формы или с числом вне 64 бит открывает
+        первую страницу, а не падает.
+
+        """
+        pub_date = self.pages[0][0].pub_date.isoformat()
+        payloads = [
+            {"d": "n", "v": 5, "n": 1},
+            {"d": "n", "v": [pub_date, 10 ** 30], "n": 1},
+            {"d": "n", "v": [pub_date, 1], "n": 10 ** 30},
+            {"d": "l", "v": [], "n": 1e400},
+            [1, 2],
+        ]
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                cursor = base64.urlsafe_b64encode(
+                    json.dumps(payload).encode()
+                ).decode()
+                page = self.paginator.cursor_page(cursor)
+                self.assertEqual(page.number, 1)
+                self.assertEqual(list(page), self.pages[0])
@@ -1,15 +1,19 @@
 import shutil
 import tempfile
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django import forms
 
-from ..models import Follow, Group, Post
+from ..follows import follow, follow_many, unfollow
+from ..models import Comment, Follow, Group, Post, UserCounters
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 User = get_user_model()
@@ -319,6 +323,42 @@ class PaginatorViewsTest(TestCase):
         """
         self._test_pagination("?page=2", TEMP_NUM_OF_POSTS_ON_LAST_PAGE)
 
+    def test_cursor_pagination(self):
+        """
+        Курсоры next/previous листают ленту без OFFSET
+        и возвращают те же записи, что и номера страниц.
+
+        """
+        first = self.client.get(reverse("posts:index")).context["page_obj"]
+        self.assertIsNone(first.previous_cursor)
+        self.assertIsNotNone(first.next_cursor)
+        second = self.client.get(
+            reverse("posts:index"), {"cursor": first.next_cursor}
+        ).context["page_obj"]
+        self.assertEqual(second.number, 2)
+        self.assertEqual(len(second), TEMP_NUM_OF_POSTS_ON_LAST_PAGE)
+        self.assertIsNone(second.next_cursor)
+        by_number = self.client.get(
+            reverse("posts:index"), {"page": 2}
+        ).context["page_obj"]
+        self.assertEqual(list(second), list(by_number))
+        back = self.client.get(
+            reverse("posts:index"), {"cursor": second.previous_cursor}
+        ).context["page_obj"]
+        self.assertEqual(back.number, 1)
+        self.assertEqual(list(back), list(first))
+        self.assertIsNone(back.previous_cursor)
+
+    def test_broken_cursor_returns_first_page(self):
+        """
+        Битый курсор не ломает страницу, а отдает первую страницу.
+
+        """
+        response = self.client.get(reverse("posts:index"), {"cursor": "xx"})
+        page_obj = response.context["page_obj"]
+        self.assertEqual(page_obj.number, 1)
+        self.assertEqual(len(page_obj), settings.NUM_OF_POSTS_ON_PAGE)
+
 
 class CacheViewsTest(TestCase):
     @classmethod
@@ -346,10 +386,7 @@ class CacheViewsTest(TestCase):
         """
         response = self.authorized_client.get(reverse("posts:index"))
         posts = response.content
-        Post.objects.create(
-            text="test_new_text",
-            author=self.author,
-        )
+        Post.objects.filter(pk=self.post.pk).update(text="test_changed_text")
         response_old = self.authorized_client.get(reverse("posts:index"))
         old_posts = response_old.content
         self.assertEqual(old_posts, posts, "cached_page_not_return")
@@ -357,3 +394,178 @@ class CacheViewsTest(TestCase):
         response_new = self.authorized_client.get(reverse("posts:index"))
         new_posts = response_new.content
         self.assertNotEqual(old_posts, new_posts, "cache_not_cleared")
+
+    def test_cache_invalidated_by_new_post(self):
+        """
+        Новый пост сразу виден в закэшированных лентах.
+
+        """
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:profile", kwargs={"username": self.author}),
+        )
+        for url in urls:
+            self.authorized_client.get(url)
+        Post.objects.create(
+            text="test_new_text", author=self.author, group=self.group
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertContains(response, "test_new_text")
+
+    def test_cache_keyed_by_page(self):
+        """
+        Разные страницы ленты не отдают один и тот же фрагмент.
+
+        """
+        for i in range(settings.NUM_OF_POSTS_ON_PAGE):
+            Post.objects.create(text=f"filler{i}", author=self.author)
+        first = self.authorized_client.get(reverse("posts:index"))
+        second = self.authorized_client.get(
+            reverse("posts:index"), {"page": 2}
+        )
+        self.assertNotContains(first, "test_text")
+        self.assertContains(second, "test_text")
+
+
+class PostDetailQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="NoName")
+        cls.group = Group.objects.create(
+            title="test_group",
+            slug="test_slug",
+            description="test_description",
+        )
+        cls.post = Post.objects.create(
+            text="test_text",
+            group=cls.group,
+            author=cls.author,
+        )
+
+    def _add_comments(self, count):
+        Comment.objects.bulk_create(
+            Comment(
+                post=self.post,
+                author=User.objects.create_user(username=f"user{i}"),
+                text=f"comment{i}",
+            )
+            for i in range(Comment.objects.count(), count)
+        )
+
+    def test_post_detail_query_budget(self):
+        """
+        Число запросов post_detail не зависит от числа комментариев.
+
+        """
+        url = reverse("posts:post_detail", kwargs={"post_id": self.post.pk})
+        for comments_count in (1, 30):
+            with self.subTest(comments_count=comments_count):
+                self._add_comments(comments_count)
+                cache.clear()
+                # запрос ETag/Last-Modified, пост, комментарии
+                # и их авторы
+                with self.assertNumQueries(4):
+                    response = self.client.get(url)
+                self.assertEqual(
+                    len(response.context["comments"]),
+                    min(comments_count, settings.COMMENTS_PAGE_SIZE),
+                )
+
+
+class FollowWritesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username="reader")
+        cls.authors = [
+            User.objects.create_user(username=f"author{i}") for i in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.reader)
+
+    def test_follow_and_unfollow_idempotent(self):
+        """
+        Повторная подписка и отписка ничего не меняют,
+        счетчики не расходятся.
+
+        """
+        author = self.authors[0]
+        self.assertTrue(follow(self.reader, author))
+        self.assertFalse(follow(self.reader, author))
+        self.assertFalse(follow(self.reader, self.reader))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertTrue(unfollow(self.reader, author))
+        self.assertFalse(unfollow(self.reader, author))
+        self.assertFalse(Follow.objects.exists())
+        counters = UserCounters.objects.get(user=author)
+        self.assertEqual(counters.followers_count, 0)
+
+    def test_unfollow_is_single_delete(self):
+        """
+        Отписка - один DELETE без чтения подписок, без подписки
+        учет не трогается.
+
+        """
+        author = self.authors[0]
+        with CaptureQueriesContext(connection) as queries:
+            unfollow(self.reader, author)
+        self.assertEqual(
+            [q["sql"].split()[0] for q in queries.captured_queries],
+            ["SAVEPOINT", "DELETE", "RELEASE"],
+        )
+        follow(self.reader, author)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(unfollow(self.reader, author))
+        follow_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "posts_follow" in query["sql"]
+        ]
+        self.assertEqual(len(follow_queries), 1)
+        self.assertTrue(follow_queries[0].startswith("DELETE"))
+
+    def test_follow_many_counts_inserted_rows(self):
+        """
+        Строки, пропущенные пакетным INSERT, не попадают в счетчики.
+
+        """
+        with mock.patch.object(Follow.objects, "bulk_create"):
+            self.assertEqual(follow_many(self.reader, self.authors), 0)
+        counters = UserCounters.objects.get(user=self.reader)
+        self.assertEqual(counters.following_count, 0)
+        self.assertEqual(follow_many(self.reader, self.authors), 3)
+        counters = UserCounters.objects.get(user=self.reader)
+        self.assertEqual(counters.following_count, 3)
+
+    def test_follow_bulk(self):
+        """
+        Подписка и отписка списком за один запрос.
+
+        """
+        url = reverse("posts:follow_bulk")
+        usernames = [author.username for author in self.authors]
+        follow(self.reader, self.authors[0])
+        response = self.client.post(
+            url, {"username": usernames + ["reader", "missing"]}
+        )
+        self.assertEqual(response.json(), {"changed": 2})
+        self.assertEqual(Follow.objects.filter(user=self.reader).count(), 3)
+        response = self.client.post(
+            url, {"username": usernames[:2], "action": "unfollow"}
+        )
+        self.assertEqual(response.json(), {"changed": 2})
+        self.assertEqual(
+            list(
+                Follow.objects.filter(user=self.reader).values_list(
+                    "author__username", flat=True
+                )
+            ),
+            [usernames[2]],
+        )
+        counters = UserCounters.objects.get(user=self.reader)
+        self.assertEqual(counters.following_count, 1)
@@ -0,0 +1,112 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from . import images
+from .models import ThumbnailTask
+
+logger = logging.getLogger(__name__)
+
+PENDING_TIMEOUT = 60
+
+
+def is_standard(geometry_string, options):
+    return settings.THUMBNAIL_STANDARD_SIZES.get(geometry_string) == options
+
+
+def schedule(image_name):
+    """
+    Ставит картинку в очередь генерации стандартных миниатюр.
+    Флаг в кэше не дает писать в очередь на каждом показе страницы.
+
+    """
+    if cache.add(f"thumbnail-pending:{image_name}", True, PENDING_TIMEOUT):
+        ThumbnailTask.objects.bulk_create(
+            [ThumbnailTask(image=image_name)], ignore_conflicts=True
+        )
+
+
+class QueuedThumbnailBackend(ThumbnailBackend):
+    """
+    Бэкенд sorl-thumbnail, который не генерирует стандартные миниатюры
+    внутри запроса: готовая миниатюра берется из kvstore, иначе картинка
+    ставится в очередь и вместо миниатюры отдается оригинал.
+
+    """
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if (
+            not file_
+            or not settings.THUMBNAIL_QUEUE
+            or not is_standard(geometry_string, options)
+        ):
+            return super().get_thumbnail(file_, geometry_string, **options)
+        source = ImageFile(file_)
+        thumbnail = self.get_ready_thumbnail(source, geometry_string, options)
+        if thumbnail:
+            return thumbnail
+        schedule(source.name)
+        return source
+
+    def get_ready_thumbnail(self, source, geometry_string, options):
+        """
+        Миниатюра из kvstore без обращения к исходному файлу.
+
+        """
+        options = dict(options)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault("format", self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+def generate(image_name):
+    """
+    Генерирует все стандартные миниатюры картинки и ее варианты
+    для srcset.
+
+    """
+    backend = ThumbnailBackend()
+    for geometry_string, options in settings.THUMBNAIL_STANDARD_SIZES.items():
+        try:
+            backend.get_thumbnail(image_name, geometry_string, **options)
+        except Exception:
+            logger.exception("Thumbnail failed for %s", image_name)
+    try:
+        images.store_variants(image_name)
+    except Exception:
+        logger.exception("Image variants failed for %s", image_name)
+
+
+def process_pending(processes=0, batch_size=100):
+    """
+    Обрабатывает пачку задач очереди. При processes > 0 картинки
+    обрабатываются пулом процессов. Возвращает число задач.
+
+    """
+    tasks = list(ThumbnailTask.objects.order_by("pk")[:batch_size])
+    names = [task.image for task in tasks]
+    if processes and names:
+        # дочерние процессы не должны наследовать открытые соединения
+        connections.close_all()
+        with ProcessPoolExecutor(processes) as pool:
+            list(pool.map(generate, names))
+    else:
+        for name in names:
+            generate(name)
+    ThumbnailTask.objects.filter(pk__in=[task.pk for task in tasks]).delete()
+    return len(tasks)
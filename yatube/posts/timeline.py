@@ -0,0 +1,345 @@
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+
+from .models import Follow, Group, Post, TimelineEntry, User, UserCounters
+from .utils import CursorPaginator, cached_in_bulk, paginate
+
+
+def get_followers_counts(author_ids):
+    """
+    Число подписчиков авторов из денормализованных счетчиков.
+
+    """
+    counts = dict.fromkeys(author_ids, 0)
+    counts.update(
+        UserCounters.objects.filter(user_id__in=author_ids).values_list(
+            "user_id", "followers_count"
+        )
+    )
+    return counts
+
+
+def is_celebrity(followers):
+    return followers > settings.TIMELINE_FANOUT_LIMIT
+
+
+def backfill(author_id, user_ids):
+    """
+    Копирует последние посты автора в ленты перечисленных читателей.
+
+    """
+    posts = Post.objects.filter(author_id=author_id).order_by("-pub_date")
+    posts = list(
+        posts.values_list("pk", "pub_date")[: settings.TIMELINE_BACKFILL]
+    )
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for user_id in user_ids
+            for post_id, pub_date in posts
+        ),
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_authors(user_id, author_ids):
+    """
+    Копирует последние посты нескольких авторов в ленту одного
+    читателя: одна выборка с коррелированным LIMIT на автора вместо
+    запроса на каждого.
+
+    """
+    latest = (
+        Post.objects.filter(author_id=OuterRef("author_id"))
+        .order_by("-pub_date")
+        .values("pk")[: settings.TIMELINE_BACKFILL]
+    )
+    posts = Post.objects.filter(
+        author_id__in=author_ids, pk__in=Subquery(latest)
+    ).values_list("pk", "pub_date")
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        ),
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out(post):
+    """
+    Раскладывает новый пост в ленты подписчиков. Посты авторов
+    с большим числом подписчиков не раскладываются, а подмешиваются
+    при чтении ленты.
+
+    """
+    followers = get_followers_counts([post.author_id])[post.author_id]
+    if is_celebrity(followers):
+        return
+    user_ids = list(
+        Follow.objects.filter(author_id=post.author_id).values_list(
+            "user_id", flat=True
+        )
+    )
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in user_ids
+        ),
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    forget_cached_timelines(user_ids)
+
+
+def follows_added(user_id, author_ids):
+    """
+    Раскладывает в ленту посты новых подписок. Посты «знаменитостей»
+    не раскладываются: они подмешиваются при чтении.
+
+    """
+    counts = get_followers_counts(author_ids)
+    backfill_authors(
+        user_id,
+        [
+            author_id
+            for author_id in author_ids
+            if not is_celebrity(counts[author_id])
+        ],
+    )
+    forget_cached_timelines([user_id])
+
+
+def follows_removed(user_id, author_ids):
+    """
+    Убирает из ленты посты авторов, от которых отписались.
+    Счетчики подписчиков должны быть уже уменьшены.
+
+    """
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id__in=author_ids
+    ).delete()
+    forget_cached_timelines([user_id])
+    counts = get_followers_counts(author_ids)
+    for author_id in author_ids:
+        if counts[author_id] == settings.TIMELINE_FANOUT_LIMIT:
+            # автор перестал быть «знаменитостью»: его посты больше
+            # не подмешиваются при чтении и должны лежать в лентах
+            backfill(
+                author_id,
+                Follow.objects.filter(author_id=author_id).values_list(
+                    "user_id", flat=True
+                ),
+            )
+
+
+# ключи записи ленты в порядке индекса timeline_user_date_post_idx
+ENTRY_KEYS = ("-pub_date", "-post_id")
+
+
+def timeline_source(user):
+    """
+    Источник ленты подписок и признак подмешивания. Без «знаменитостей»
+    это записи TimelineEntry пользователя: порядок и условие курсора
+    берутся из индекса (user, -pub_date, -post), без сортировки всей
+    ленты. Иначе - посты записей и «знаменитостей».
+
+    """
+    followed = list(
+        Follow.objects.filter(user=user).values_list("author_id", flat=True)
+    )
+    counts = get_followers_counts(followed)
+    celebrities = [
+        author_id for author_id in followed if is_celebrity(counts[author_id])
+    ]
+    if not celebrities:
+        entries = TimelineEntry.objects.filter(user=user)
+        return entries.order_by(*ENTRY_KEYS), False
+    entries = TimelineEntry.objects.filter(user=user).values("post_id")
+    posts = Post.objects.select_related("author", "group").filter(
+        Q(pk__in=entries) | Q(author_id__in=celebrities)
+    )
+    return posts, True
+
+
+def get_timeline(user):
+    """
+    Лента подписок: материализованные записи пользователя
+    плюс посты «знаменитостей», на которых он подписан.
+
+    """
+    timeline, merged = timeline_source(user)
+    if merged:
+        return timeline
+    return Post.objects.select_related("author", "group").filter(
+        timeline_entries__user=user
+    )
+
+
+class TimelinePaginator(CursorPaginator):
+    """
+    Пагинатор по записям ленты. На странице - посты записей, ключ
+    записи (pub_date, post_id) совпадает с ключом поста (pub_date, id),
+    поэтому курсоры общие с пагинатором постов.
+
+    """
+
+    def __init__(self, entries, per_page):
+        entries = entries.select_related("post__author", "post__group")
+        super().__init__(entries, per_page, keys=ENTRY_KEYS)
+
+    def _key_values(self, obj):
+        return [obj.pub_date, obj.pk]
+
+    def _get_cursor_page(self, items, number, has_next, has_previous):
+        posts = [
+            item.post if isinstance(item, TimelineEntry) else item
+            for item in items
+        ]
+        return super()._get_cursor_page(posts, number, has_next, has_previous)
+
+
+def timeline_paginator(user, per_page):
+    timeline, merged = timeline_source(user)
+    if merged:
+        return CursorPaginator(timeline, per_page)
+    return TimelinePaginator(timeline, per_page)
+
+
+# Кэш ленты: id первых TIMELINE_CACHE_SIZE постов в массиве int64.
+# Значение - (complete, merged, bytes): complete - в массиве вся лента,
+# merged - в ленту подмешиваются посты «знаменитостей», которые
+# не сбрасывают кэши подписчиков, поэтому такая запись живет недолго.
+
+
+def timeline_key(user_id):
+    return f"timeline:{user_id}"
+
+
+def _timeline_ttl(merged):
+    if merged:
+        return settings.TIMELINE_CACHE_MERGED_TTL
+    return settings.TIMELINE_CACHE_TTL
+
+
+def _unpack(data):
+    ids = array("q")
+    ids.frombytes(data)
+    return ids
+
+
+def get_timeline_ids(user):
+    """
+    Id первых постов ленты подписок и признак того, что это вся лента.
+    При промахе кэша - одна выборка id без чтения строк постов.
+
+    """
+    key = timeline_key(user.pk)
+    cached = cache.get(key)
+    if cached is not None:
+        complete, merged, data = cached
+        return _unpack(data), complete
+    size = settings.TIMELINE_CACHE_SIZE
+    timeline, merged = timeline_source(user)
+    if merged:
+        timeline = timeline.order_by("-pub_date", "-pk")
+    ids = timeline.values_list("pk" if merged else "post_id", flat=True)
+    ids = list(ids[: size + 1])
+    complete = len(ids) <= size
+    ids = array("q", ids[:size])
+    cache.set(key, (complete, merged, ids.tobytes()), _timeline_ttl(merged))
+    return ids, complete
+
+
+def forget_cached_timelines(user_ids):
+    """
+    Сбрасывает закэшированные ленты, при следующем чтении массив
+    перечитается одной выборкой id. Массив не переписывается на месте:
+    get_many и set_many из двух процессов теряют id друг друга. Ключи
+    сбрасываются еще раз после коммита - до него читатель мог положить
+    в кэш ленту без изменения.
+
+    """
+    keys = [timeline_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def post_removed(post):
+    """Удаленный пост мог лежать в кэше лент всех подписчиков автора."""
+    forget_cached_timelines(
+        Follow.objects.filter(author_id=post.author_id).values_list(
+            "user_id", flat=True
+        )
+    )
+
+
+def hydrate(post_ids):
+    """
+    Посты по списку id в том же порядке с авторами и группами,
+    собранные из кэша объектов. Удаленные посты пропускаются.
+
+    """
+    posts = cached_in_bulk(Post.objects.all(), post_ids)
+    authors = cached_in_bulk(
+        User.objects.all(), {post.author_id for post in posts.values()}
+    )
+    groups = cached_in_bulk(
+        Group.objects.all(),
+        {post.group_id for post in posts.values() if post.group_id},
+    )
+    found = []
+    for pk in post_ids:
+        post = posts.get(pk)
+        if post is None or post.author_id not in authors:
+            continue
+        post.author = authors[post.author_id]
+        if post.group_id:
+            post.group = groups.get(post.group_id)
+        found.append(post)
+    return found
+
+
+def _page_number(value):
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def get_timeline_page(user, request):
+    """
+    Страница ленты подписок. Страницы из первых TIMELINE_CACHE_SIZE
+    постов собираются по id из кэша, курсоры и дальние страницы
+    читаются из базы.
+
+    """
+    per_page = settings.NUM_OF_POSTS_ON_PAGE
+    if request.GET.get("cursor"):
+        return paginate(timeline_paginator(user, per_page), request)
+    ids, complete = get_timeline_ids(user)
+    number = _page_number(request.GET.get("page"))
+    if complete:
+        number = min(number, max(1, -(-len(ids) // per_page)))
+    start = (number - 1) * per_page
+    has_next = len(ids) > start + per_page
+    if not (has_next or complete):
+        return paginate(timeline_paginator(user, per_page), request)
+    if complete:
+        paginator = CursorPaginator(
+            Post.objects.select_related("author", "group"), per_page
+        )
+        paginator.count = len(ids)
+        paginator.numbered = True
+    else:
+        paginator = timeline_paginator(user, per_page)
+    posts = hydrate(ids[start: start + per_page])
+    return paginator._get_cursor_page(posts, number, has_next, number > 1)
@@ -1,9 +1,483 @@
+import base64
+import binascii
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+FORWARD = "n"
+BACKWARD = "p"
+LAST = "l"
+
+POSTS_GENERATION = "posts"
+
+# значения, которые СУБД примет как знаковое 64-битное целое
+BIGINT_RANGE = range(-(2 ** 63), 2 ** 63)
+
+
+def is_bigint(value):
+    """
+    Проверяет целое из курсора: большее число не передать в запрос,
+    драйвер СУБД падает с OverflowError.
+
+    """
+    return isinstance(value, int) and value in BIGINT_RANGE
+
+
+def get_generation(name):
+    """
+    Текущее поколение именованного набора данных. Начальное значение
+    берется от времени, чтобы после вытеснения из кэша счетчик
+    не вернулся к уже использованным номерам.
+
+    """
+    return cache.get_or_set(
+        f"generation:{name}", int(time.time() * 1000), None
+    )
+
+
+def bump_generation(name):
+    """
+    Сдвигает поколение не меньше чем до текущего времени в мс, поэтому
+    значение поколения - это и время последнего изменения.
+
+    """
+    key = f"generation:{name}"
+    now = int(time.time() * 1000)
+    current = cache.get(key)
+    try:
+        if current is None:
+            raise ValueError
+        return cache.incr(key, max(now - current, 1))
+    except ValueError:
+        cache.set(key, now, None)
+        return now
+
+
+def generation_time(generation):
+    """Время изменения, записанное в поколении."""
+    return datetime.fromtimestamp(generation / 1000, timezone.utc)
+
+
+def feed_generation(scope):
+    """
+    Версия ленты для ключа кэша фрагментов. Сдвигается сигналами
+    при создании, изменении и удалении постов этой ленты.
+
+    """
+    return get_generation(f"feed:{scope}")
+
+
+def object_cache_key(model, pk):
+    return f"object:{model._meta.label_lower}:{pk}"
+
+
+def cached_in_bulk(queryset, ids):
+    """
+    in_bulk через кэш объектов: из базы одним запросом читаются только
+    строки, которых нет в кэше. Записи сбрасываются сигналами
+    при сохранении и удалении объекта.
+
+    """
+    model = queryset.model
+    keys = [object_cache_key(model, pk) for pk in ids]
+    found = {obj.pk: obj for obj in cache.get_many(keys).values()}
+    missing = [pk for pk in ids if pk not in found]
+    if missing:
+        fetched = queryset.in_bulk(missing)
+        cache.set_many(
+            {object_cache_key(model, pk): obj for pk, obj in fetched.items()},
+            settings.OBJECT_CACHE_TTL,
+        )
+        found.update(fetched)
+    return found
+
+
+def forget_object(instance):
+    cache.delete(object_cache_key(type(instance), instance.pk))
+
+
+def exact_count(queryset):
+    return queryset.count()
+
+
+def cached_count(queryset):
+    """
+    COUNT(*) из кэша. Ключ включает поколение постов, которое сдвигается
+    сигналами при сохранении и удалении Post и Follow.
+
+    """
+    digest = hashlib.md5(str(queryset.query).encode()).hexdigest()
+    key = f"count:{get_generation(POSTS_GENERATION)}:{digest}"
+    return cache.get_or_set(
+        key, queryset.count, settings.PAGINATOR_COUNT_TTL
+    )
+
+
+def _estimate_from_stats(queryset):
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return int(plan[0]["Plan"]["Plan Rows"])
+            if queryset.query.where:
+                return None
+            if connection.vendor == "sqlite":
+                cursor.execute(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+                    [table],
+                )
+            elif connection.vendor == "mysql":
+                cursor.execute(
+                    "SELECT table_rows FROM information_schema.tables "
+                    "WHERE table_schema = DATABASE() AND table_name = %s",
+                    [table],
+                )
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None:
+        return None
+    return int(str(row[0]).split()[0])
+
+
+def estimated_count(queryset):
+    """
+    Оценка числа строк по статистике СУБД (EXPLAIN в PostgreSQL,
+    sqlite_stat1 после ANALYZE, information_schema в MySQL).
+    Если оценки нет, используется кэшированный COUNT(*).
+
+    """
+    estimate = _estimate_from_stats(queryset)
+    if estimate is None:
+        return cached_count(queryset)
+    return estimate
+
+
+COUNT_PROVIDERS = {
+    "exact": exact_count,
+    "cached": cached_count,
+    "estimated": estimated_count,
+}
+
+
+class CursorPaginator(Paginator):
+    """
+    Keyset-пагинатор: страницы выбираются условием по ключам сортировки
+    вместо OFFSET, поэтому тысячная страница стоит столько же, сколько
+    первая. Возвращает обычный Page с атрибутами next_cursor
+    и previous_cursor.
+
+    """
+
+    # страницы можно брать по номеру без OFFSET в базе (лента из кэша)
+    numbered = False
+
+    def __init__(
+        self, object_list, per_page, keys=("-pub_date", "-pk"), count=None
+    ):
+        self.keys = keys
+        self.count_provider = count or COUNT_PROVIDERS[
+            settings.PAGINATOR_COUNT_MODE
+        ]
+        self.descending = keys[0].startswith("-")
+        self.fields = [key.lstrip("-") for key in keys]
+        super().__init__(object_list.order_by(*keys), per_page)
+
+    @cached_property
+    def count(self):
+        return self.count_provider(self.object_list)
+
+    def page_window(self, number, on_each_side=None):
+        """
+        Номера страниц вокруг текущей, без построения полного page_range.
+
+        """
+        if on_each_side is None:
+            on_each_side = settings.PAGINATOR_WINDOW
+        first = max(number - on_each_side, 1)
+        last = min(number + on_each_side, self.num_pages)
+        return range(first, last + 1)
+
+    def page_links(self, page, on_each_side=None):
+        """
+        Пары (номер, параметры запроса) для ссылок на страницы рядом
+        с текущей. Соседние страницы адресуются курсорами от границ
+        текущей: ключи их границ читаются одной выборкой в каждую
+        сторону, без OFFSET.
+
+        """
+        if on_each_side is None:
+            on_each_side = settings.PAGINATOR_WINDOW
+        number = page.number
+        if self.numbered:
+            return [
+                (n, f"page={n}")
+                for n in self.page_window(number, on_each_side)
+            ]
+        items = list(page.object_list)
+        if not items:
+            return [(number, None)]
+        before = self._neighbour_cursors(
+            items[0], BACKWARD, number, min(on_each_side, number - 1)
+        )
+        after = self._neighbour_cursors(
+            items[-1], FORWARD, number, on_each_side if page.next_cursor else 0
+        )
+        return [*reversed(before), (number, None), *after]
+
+    def _neighbour_cursors(self, obj, direction, number, count):
+        """
+        Курсоры count страниц подряд от границы obj в направлении
+        direction. Страница number ± k начинается после ключа строки
+        (k - 1) * per_page - 1 за границей.
+
+        """
+        if count <= 0:
+            return []
+        forward = direction == FORWARD
+        step = 1 if forward else -1
+        boundaries = [self._key_values(obj)]
+        if count > 1:
+            keys = self.object_list.filter(
+                self._seek(boundaries[0], after=forward)
+            )
+            if not forward:
+                keys = keys.order_by(*self._reversed_keys())
+            rows = list(
+                keys.values_list(*self.fields)[
+                    : self.per_page * (count - 1) + 1
+                ]
+            )
+            boundaries += [
+                list(rows[self.per_page * k - 1])
+                for k in range(1, count)
+                if len(rows) > self.per_page * k
+            ]
+        links = []
+        for k, values in enumerate(boundaries, start=1):
+            cursor = self.encode_values(values, direction, number + step * k)
+            links.append((number + step * k, f"cursor={cursor}"))
+        return links
+
+    def last_page_query(self):
+        """
+        Параметры ссылки на последнюю страницу: курсор обратной
+        выборки без OFFSET.
+
+        """
+        if self.numbered:
+            return f"page={self.num_pages}"
+        return f"cursor={self.encode_values([], LAST, 0)}"
+
+    def _key_values(self, obj):
+        return [
+            getattr(obj, self._get_field(field).attname)
+            for field in self.fields
+        ]
+
+    def encode_values(self, values, direction, number):
+        row = SimpleNamespace(
+            **{
+                self._get_field(field).attname: value
+                for field, value in zip(self.fields, values)
+            }
+        )
+        values = [
+            self._get_field(field).value_to_string(row)
+            for field in self.fields[: len(values)]
+        ]
+        payload = json.dumps({"d": direction, "v": values, "n": number})
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        return token.rstrip("=")
+
+    def encode_cursor(self, obj, direction, number):
+        return self.encode_values(self._key_values(obj), direction, number)
+
+    def decode_cursor(self, cursor):
+        """
+        Возвращает (direction, values, number) или None для битого курсора.
+
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, values = payload["d"], payload["v"]
+            number = int(payload["n"])
+        except (
+            binascii.Error,
+            ValueError,
+            TypeError,
+            KeyError,
+            OverflowError,
+        ):
+            return None
+        if not is_bigint(number):
+            return None
+        number = max(number, 1)
+        if direction == LAST:
+            return direction, [], number
+        if direction not in (FORWARD, BACKWARD):
+            return None
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            return None
+        try:
+            values = [
+                self._get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (ValidationError, TypeError, OverflowError):
+            return None
+        if not all(is_bigint(v) for v in values if isinstance(v, int)):
+            return None
+        return direction, values, number
+
+    def _get_field(self, name):
+        opts = self.object_list.model._meta
+        return opts.pk if name == "pk" else opts.get_field(name)
+
+    def _seek(self, values, after):
+        """
+        Условие «строго после/до ключа values» в порядке сортировки.
+        Отдельное условие по первому ключу задает диапазон индекса,
+        иначе СУБД читает индекс с начала до курсора.
+
+        """
+        lookup = "lt" if self.descending == after else "gt"
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            step = Q(**{f"{field}__{lookup}": values[index]})
+            for prev_field, prev_value in zip(self.fields, values[:index]):
+                step &= Q(**{prev_field: prev_value})
+            condition |= step
+        return condition & Q(**{f"{self.fields[0]}__{lookup}e": values[0]})
+
+    def _reversed_keys(self):
+        return [
+            key[1:] if key.startswith("-") else f"-{key}" for key in self.keys
+        ]
+
+    def _get_cursor_page(self, items, number, has_next, has_previous):
+        page = self._get_page(items, number, self)
+        page.next_cursor = (
+            self.encode_cursor(items[-1], FORWARD, number + 1)
+            if has_next and items
+            else None
+        )
+        page.previous_cursor = (
+            self.encode_cursor(items[0], BACKWARD, number - 1)
+            if has_previous and items
+            else None
+        )
+        return page
+
+    def cursor_page(self, cursor):
+        """
+        Страница по курсору: одна выборка per_page + 1 строк без COUNT.
+
+        """
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            return self.get_page(1)
+        direction, values, number = decoded
+        if direction == LAST:
+            return self.last_page()
+        if direction == FORWARD:
+            items = list(
+                self.object_list.filter(self._seek(values, after=True))[
+                    : self.per_page + 1
+                ]
+            )
+            has_next = len(items) > self.per_page
+            items = items[: self.per_page]
+            if not items:
+                return self.get_page(1)
+            return self._get_cursor_page(items, number, has_next, True)
+        items = list(
+            self.object_list.filter(self._seek(values, after=False))
+            .order_by(*self._reversed_keys())[: self.per_page + 1]
+        )
+        has_previous = len(items) > self.per_page
+        items = items[: self.per_page][::-1]
+        if not items:
+            return self.get_page(1)
+        if not has_previous:
+            number = 1
+        return self._get_cursor_page(items, number, True, has_previous)
+
+    def last_page(self):
+        """
+        Последние per_page записей обратной сортировкой. Номер страницы
+        берется из count, сама выборка не зависит от глубины ленты.
+
+        """
+        items = list(
+            self.object_list.order_by(*self._reversed_keys())[
+                : self.per_page + 1
+            ]
+        )
+        has_previous = len(items) > self.per_page
+        items = items[: self.per_page][::-1]
+        if not items:
+            return self.get_page(1)
+        number = max(self.num_pages, 2) if has_previous else 1
+        return self._get_cursor_page(items, number, False, has_previous)
+
+    def get_page(self, number):
+        """
+        Страница по номеру для старых ссылок ?page=N. Наличие следующей
+        страницы определяется лишней строкой, а не COUNT(*).
+
+        """
+        try:
+            number = max(int(number), 1)
+        except (TypeError, ValueError):
+            number = 1
+        bottom = (number - 1) * self.per_page
+        items = list(self.object_list[bottom: bottom + self.per_page + 1])
+        if not items and number > 1:
+            page = super().get_page(number)
+            return self._get_cursor_page(
+                list(page.object_list), page.number, False, page.number > 1
+            )
+        has_next = len(items) > self.per_page
+        items = items[: self.per_page]
+        return self._get_cursor_page(items, number, has_next, number > 1)
+
+
+def get_paginator(queryset, request, total=None):
+    """
+    Страница ленты по ?cursor= или ?page=. total - заранее известное
+    число записей (денормализованный счетчик) вместо COUNT(*).
+
+    """
+    count = None if total is None else (lambda queryset: total)
+    paginator = CursorPaginator(
+        queryset, settings.NUM_OF_POSTS_ON_PAGE, count=count
+    )
+    return paginate(paginator, request)
 
 
-def get_paginator(queryset, request):
-    paginator = Paginator(queryset, settings.NUM_OF_POSTS_ON_PAGE)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-    return page_obj
+def paginate(paginator, request):
+    """Страница пагинатора по ?cursor= или ?page=."""
+    cursor = request.GET.get("cursor")
+    if cursor:
+        return paginator.cursor_page(cursor)
+    return paginator.get_page(request.GET.get("page"))
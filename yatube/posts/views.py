@@ -1,11 +1,34 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
 
+from core.edge import edge_cacheable
+from core.routers import replica_reads
+
+from . import comment_buffer, follows, thumbnails
+from .comments import comment_page, more_url, page_size
+from .conditional import (
+    conditional_page,
+    group_state,
+    index_state,
+    post_state,
+    profile_state,
+)
+from .autocomplete import suggest
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
-from .utils import get_paginator
+from .models import Follow, Group, Post, User
+from .search import search_posts
+from .surrogates import group_keys, index_keys, post_keys, profile_keys
+from .timeline import get_timeline_page
+from .counters import get_user_counters
+from .utils import cached_in_bulk, feed_generation, get_paginator
 
 
+@replica_reads
+@edge_cacheable(index_keys)
+@conditional_page(index_state)
 def index(request):
     """
     Выводит шаблон главной страницы
@@ -14,9 +37,38 @@ def index(request):
     page_obj = get_paginator(
         Post.objects.select_related("author", "group"), request
     )
-    return render(request, "posts/index.html", {"page_obj": page_obj})
+    return render(
+        request,
+        "posts/index.html",
+        {"page_obj": page_obj, "feed_generation": feed_generation("index")},
+    )
 
 
+def search(request):
+    """
+    Выводит найденные по тексту посты в порядке релевантности
+
+    """
+    query = request.GET.get("q", "").strip()
+    posts, next_cursor = search_posts(query, request.GET.get("cursor"))
+    return render(
+        request,
+        "posts/search.html",
+        {"query": query, "posts": posts, "next_cursor": next_cursor},
+    )
+
+
+def autocomplete(request):
+    """
+    Подсказки для упоминаний @пользователя и #группы в тексте поста
+
+    """
+    return JsonResponse({"results": suggest(request.GET.get("q", ""))})
+
+
+@replica_reads
+@edge_cacheable(group_keys)
+@conditional_page(group_state)
 def group_posts(request, slug):
     """
     Выводит шаблон с группами постов
@@ -24,49 +76,96 @@ def group_posts(request, slug):
     """
     group = get_object_or_404(Group, slug=slug)
     posts = group.posts.select_related("author")
-    page_obj = get_paginator(posts, request)
+    page_obj = get_paginator(posts, request, total=group.posts_count)
     return render(
         request,
         "posts/group_list.html",
-        {"group": group, "page_obj": page_obj},
+        {
+            "group": group,
+            "page_obj": page_obj,
+            "feed_generation": feed_generation(f"group:{group.pk}"),
+        },
     )
 
 
+@replica_reads
+@edge_cacheable(profile_keys)
+@conditional_page(profile_state)
 def profile(request, username):
     """
     Выводит шаблон профайла пользователя
 
     """
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related("counters"), username=username
+    )
     posts = author.posts.select_related("group")
-    page_obj = get_paginator(posts, request)
-    following = Follow.objects.filter(
-        user__username=request.user, author=author
+    page_obj = get_paginator(
+        posts, request, total=get_user_counters(author).posts_count
+    )
+    following = (
+        request.user.is_authenticated
+        and Follow.objects.filter(user=request.user, author=author).exists()
     )
     return render(
         request,
         "posts/profile.html",
         {
             "author": author,
-            "posts": posts,
             "page_obj": page_obj,
             "following": following,
+            "feed_generation": feed_generation(f"author:{author.pk}"),
         },
     )
 
 
+@replica_reads
+@edge_cacheable(post_keys)
+@conditional_page(post_state)
 def post_detail(request, post_id):
     """
     Выводит детальное описание поста
 
     """
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related("author__counters", "group"), pk=post_id
+    )
     form = CommentForm(request.POST or None)
-    comments = Comment.objects.filter(post=post)
+    comments, next_cursor = comment_page(post.pk, user=request.user)
+    author_posts_count = get_user_counters(post.author).posts_count
     return render(
         request,
         "posts/post_detail.html",
-        {"post": post, "form": form, "comments": comments},
+        {
+            "post": post,
+            "form": form,
+            "comments": comments,
+            "more_comments_url": more_url(post.pk, next_cursor),
+            "author_posts_count": author_posts_count,
+        },
+    )
+
+
+@replica_reads
+@edge_cacheable(post_keys)
+def post_comments(request, post_id):
+    """
+    Выводит фрагмент со следующей страницей комментариев поста
+
+    """
+    comments, next_cursor = comment_page(
+        post_id,
+        request.GET.get("cursor"),
+        page_size(request.GET.get("limit")),
+        request.user,
+    )
+    return render(
+        request,
+        "includes/comment_list.html",
+        {
+            "comments": comments,
+            "more_comments_url": more_url(post_id, next_cursor),
+        },
     )
 
 
@@ -76,12 +175,14 @@ def post_create(request):
     Создает новый пост
 
     """
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if request.method != "POST" or not form.is_valid():
         return render(request, "posts/create_post.html", {"form": form})
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    if post.image:
+        thumbnails.schedule(post.image.name)
     return redirect("posts:profile", post.author)
 
 
@@ -105,8 +206,12 @@ def post_edit(request, post_id):
             {"form": form, "is_edit": is_edit},
         )
     post = form.save(commit=False)
-    post.author = request.user
-    post.save()
+    # счетчики обновляются F-выражениями, их нельзя перезаписывать;
+    # варианты старой картинки остаются до готовности новых,
+    # тогда их файлы удаляет images.store_variants
+    post.save(update_fields=PostForm.Meta.fields)
+    if "image" in form.changed_data and post.image:
+        thumbnails.schedule(post.image.name)
     return redirect("posts:post_detail", post_id)
 
 
@@ -116,6 +221,8 @@ def add_comment(request, post_id):
     Добавляет комментарий
 
     """
+    if settings.COMMENT_BUFFER:
+        return add_comment_buffered(request, post_id)
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
@@ -126,14 +233,29 @@ def add_comment(request, post_id):
     return redirect("posts:post_detail", post_id=post_id)
 
 
+def add_comment_buffered(request, post_id):
+    """
+    Ставит комментарий в очередь comment_buffer вместо INSERT
+    в основную базу. Пост проверяется через кэш объектов.
+
+    """
+    if not cached_in_bulk(Post.objects.all(), [post_id]):
+        raise Http404
+    form = CommentForm(request.POST or None)
+    if form.is_valid():
+        comment_buffer.enqueue(
+            post_id, request.user, form.cleaned_data["text"]
+        )
+    return redirect("posts:post_detail", post_id=post_id)
+
+
 @login_required
 def follow_index(request):
     """
-    Добавляет комментарий
+    Выводит ленту постов авторов, на которых подписан пользователь
 
     """
-    posts = Post.objects.filter(author__following__user=request.user)
-    page_obj = get_paginator(posts, request)
+    page_obj = get_timeline_page(request.user, request)
     return render(request, "posts/follow.html", {"page_obj": page_obj})
 
 
@@ -143,12 +265,8 @@ def profile_follow(request, username):
     Подписывает на автора
 
     """
-    user = request.user
     author = get_object_or_404(User, username=username)
-    following = Follow.objects.filter(author=author, user=user).exists()
-    if user != author and not following:
-        follow = Follow.objects.create(user=user, author=author)
-        follow.save()
+    follows.follow(request.user, author)
     return redirect("posts:profile", username=username)
 
 
@@ -158,7 +276,24 @@ def profile_unfollow(request, username):
     Отписывает от автора
 
     """
-    user = get_object_or_404(User, username=username)
-    unfollow = Follow.objects.filter(user=request.user, author=user)
-    unfollow.delete()
+    author = get_object_or_404(User, username=username)
+    follows.unfollow(request.user, author)
     return redirect("posts:profile", username)
+
+
+@login_required
+@require_POST
+def follow_bulk(request):
+    """
+    Подписывает на список авторов или отписывает от него за один запрос
+
+    """
+    usernames = request.POST.getlist("username")[
+        : settings.FOLLOW_BULK_LIMIT
+    ]
+    authors = User.objects.filter(username__in=usernames).only("pk")
+    if request.POST.get("action") == "unfollow":
+        changed = follows.unfollow_many(request.user, authors)
+    else:
+        changed = follows.follow_many(request.user, authors)
+    return JsonResponse({"changed": changed})
@@ -0,0 +1,9 @@
+# the profile is picked by YATUBE_ENV: "dev" (default) or "prod";
+# DJANGO_SETTINGS_MODULE=yatube.settings.prod selects one directly
+
+import os
+
+if os.getenv("YATUBE_ENV", "dev") == "prod":
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
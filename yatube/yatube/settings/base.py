@@ -0,0 +1,388 @@
+"""
+Django settings for yatube project.
+
+Generated by 'django-admin startproject' using Django 3.2.15.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/3.2/ref/settings/
+"""
+import os
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = (
+    "django-insecure-da&*3pg5g2v&_b7#ji1j5+**_))ahgtfo)cxkf+xd^yv3&3q@a"
+)
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    "localhost",
+    "127.0.0.1",
+    "[::1]",
+    "testserver",
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    "about.apps.AboutConfig",
+    "core.apps.CoreConfig",
+    "users.apps.UsersConfig",
+    "posts.apps.PostsConfig",
+    "api.apps.ApiConfig",
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.staticfiles",
+    "django.contrib.messages",
+    "sorl.thumbnail",
+]
+
+
+MIDDLEWARE = [
+    "core.metrics.MetricsMiddleware",
+    "core.edge.EdgeCacheMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "core.routers.ReplicaStickinessMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "yatube.urls"
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [TEMPLATES_DIR],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+                "core.context_processors.year.year",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "yatube.wsgi.application"
+
+# compile every template when a WSGI worker starts, see core.loaders
+
+TEMPLATE_WARMUP = False
+
+
+# Database
+# https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+
+# connections are kept open between requests, one per worker thread
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": str(BASE_DIR / "db.sqlite3"),
+        "CONN_MAX_AGE": 60,
+    }
+}
+
+# pragmas applied on every SQLite connection, see core.db.SQLITE_PROFILES
+
+SQLITE_PROFILE = os.getenv("YATUBE_SQLITE_PROFILE", "tuned")
+
+# read replica, e.g. a copy of db.sqlite3 kept in sync by litestream;
+# views marked with core.routers.replica_reads read from it
+
+if os.getenv("YATUBE_REPLICA_DB"):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("YATUBE_REPLICA_DB"),
+        "CONN_MAX_AGE": 60,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+
+DATABASE_ROUTERS = ["core.routers.PrimaryReplicaRouter"]
+
+# after a write the client reads from the primary for this many seconds
+
+REPLICA_STICKY_SECONDS = 5
+
+
+# Password validation
+# https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/3.2/topics/i18n/
+
+LANGUAGE_CODE = "ru"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/3.2/howto/static-files/
+
+STATIC_URL = "/static/"
+
+STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# number of posts displayed on page in view functions
+
+NUM_OF_POSTS_ON_PAGE = 10
+
+# comments on the post page, the rest are loaded by pages of the same
+# size; ?limit= of a comments fragment is capped by the maximum
+
+COMMENTS_PAGE_SIZE = 20
+
+COMMENTS_MAX_PAGE_SIZE = 100
+
+# buffered comments: add_comment appends to a local SQLite queue and a
+# background thread of every process writes it to the database in
+# batches; the flush_comments command drains the queue as well
+
+COMMENT_BUFFER = bool(os.getenv("YATUBE_COMMENT_BUFFER"))
+
+COMMENT_BUFFER_PATH = os.getenv(
+    "YATUBE_COMMENT_BUFFER_PATH", BASE_DIR / "comment-buffer.sqlite3"
+)
+
+COMMENT_BUFFER_THREAD = True
+
+COMMENT_BUFFER_BATCH = 500
+
+COMMENT_BUFFER_INTERVAL = 0.5
+
+COMMENT_BUFFER_LEASE = 30
+
+# how paginator counts rows: "exact", "cached" or "estimated"
+
+PAGINATOR_COUNT_MODE = "cached"
+
+PAGINATOR_COUNT_TTL = 60
+
+# number of page links shown on each side of the current page
+
+PAGINATOR_WINDOW = 2
+
+# authors with more followers are not fanned out to follower timelines,
+# their posts are merged into the follow feed at read time
+
+TIMELINE_FANOUT_LIMIT = 1000
+
+# number of recent posts copied into a timeline on follow
+
+TIMELINE_BACKFILL = 100
+
+# ids of the first TIMELINE_CACHE_SIZE posts of each follow feed are
+# cached and updated on new posts and unfollows; feeds that merge posts
+# of celebrities on read are only cached for TIMELINE_CACHE_MERGED_TTL
+
+TIMELINE_CACHE_SIZE = 200
+
+TIMELINE_CACHE_TTL = 60 * 60
+
+TIMELINE_CACHE_MERGED_TTL = 30
+
+# posts, users and groups cached one object per key, see cached_in_bulk
+
+OBJECT_CACHE_TTL = 10 * 60
+
+# max posts on one page of the JSON API, ?limit= is capped by it
+
+API_MAX_LIMIT = 100
+
+# max number of authors in one bulk follow/unfollow request
+
+FOLLOW_BULK_LIMIT = 1000
+
+# number of symbols displayed on text in Post.__str__
+
+NUM_OF_SYMBOLS_ON_TEXT = 15
+
+LOGIN_URL = "users:login"
+LOGIN_REDIRECT_URL = "posts:index"
+# LOGOUT_REDIRECT_URL = 'posts:index'
+# PASSWORD_CHANGE_URL = 'users:password_change'
+
+#  подключаем движок filebased.EmailBackend
+EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+# указываем директорию, в которую будут складываться файлы писем
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+MEDIA_URL = "/media/"
+MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
+# uploads bigger than FILE_UPLOAD_MAX_MEMORY_SIZE go straight to disk and
+# are cut off after FILE_UPLOAD_MAX_SIZE bytes; images are checked by
+# their headers only
+
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "core.uploads.BoundedUploadHandler",
+]
+
+FILE_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+
+IMAGE_UPLOAD_MAX_PIXELS = 40 * 10 ** 6
+
+IMAGE_UPLOAD_FORMATS = ("JPEG", "PNG", "GIF")
+
+# full-text search over posts, DatabaseSearchBackend for databases
+# without FTS5
+
+SEARCH_BACKEND = "posts.search.SQLiteFTSBackend"
+
+# relevance is ranked among this many newest matches
+
+SEARCH_RANK_WINDOW = 300
+
+# @user and #group suggestions are served from an in-memory index,
+# rows created by other processes are picked up every SYNC_INTERVAL seconds
+
+AUTOCOMPLETE_LIMIT = 10
+
+AUTOCOMPLETE_SYNC_INTERVAL = 5
+
+# load the suggestion indexes when a WSGI worker starts
+
+AUTOCOMPLETE_WARMUP = False
+
+# thumbnails of standard sizes are generated by the thumbnail_worker
+# command, pages show the original image until the thumbnail is ready
+
+THUMBNAIL_BACKEND = "posts.thumbnails.QueuedThumbnailBackend"
+
+THUMBNAIL_QUEUE = True
+
+THUMBNAIL_STANDARD_SIZES = {
+    "960x339": {"crop": "center", "upscale": True},
+}
+
+# responsive variants of post images built by the same worker, formats
+# the installed Pillow cannot write are skipped
+
+IMAGE_VARIANT_WIDTHS = (320, 640, 960)
+
+IMAGE_VARIANT_RATIO = (960, 339)
+
+IMAGE_VARIANT_FORMATS = ("avif", "webp", "jpeg")
+
+IMAGE_VARIANT_QUALITY = 80
+
+IMAGE_VARIANT_SIZES = "(min-width: 992px) 720px, 100vw"
+
+CSRF_FAILURE_VIEW = "core.views.csrf_failure"
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# shared cache for several worker processes on one host, e.g.
+# YATUBE_SHARED_CACHE=/var/tmp/yatube-cache.sqlite3
+
+if os.environ.get("YATUBE_SHARED_CACHE"):
+    CACHES["default"] = {
+        "BACKEND": "core.cache.SharedCache",
+        "LOCATION": os.environ["YATUBE_SHARED_CACHE"],
+        "OPTIONS": {
+            "MAX_ENTRIES": 100000,
+            "LOCAL_MAX_ENTRIES": 1000,
+            "LOCAL_TIMEOUT": 60,
+            "INVALIDATION_POLL": 0.5,
+        },
+    }
+
+# per-view metrics exposed on /metrics, see core.metrics
+
+METRICS_PREFIX = "yatube_"
+
+METRICS_TOKEN = os.getenv("YATUBE_METRICS_TOKEN", "")
+
+METRICS_DEFAULT_QUERY_BUDGET = 20
+
+METRICS_QUERY_BUDGETS = {
+    "posts:index": 6,
+    "posts:group_list": 6,
+    "posts:profile": 8,
+    "posts:post_detail": 8,
+    "posts:post_comments": 3,
+}
+
+# anonymous feeds and posts may be kept by a front cache for
+# EDGE_CACHE_SECONDS; it must bypass the cache for requests with the
+# session cookie. Pages are purged by surrogate keys when
+# YATUBE_EDGE_PURGE_URL is set, e.g. http://127.0.0.1:6081/
+
+EDGE_CACHE_SECONDS = int(os.getenv("YATUBE_EDGE_CACHE_SECONDS", 60))
+
+SURROGATE_KEY_HEADER = "Surrogate-Key"
+
+EDGE_PURGE_URL = os.getenv("YATUBE_EDGE_PURGE_URL", "")
+
+EDGE_PURGE_BACKEND = (
+    "core.edge.HTTPPurgeBackend"
+    if EDGE_PURGE_URL
+    else "core.edge.NullPurgeBackend"
+)
+
+EDGE_PURGE_METHOD = "PURGE"
+
+EDGE_PURGE_HEADERS = {}
+
+EDGE_PURGE_TIMEOUT = 2
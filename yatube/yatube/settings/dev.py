@@ -0,0 +1,17 @@
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = True
+
+# django-debug-toolbar is a dev dependency and is never loaded in prod
+
+INSTALLED_APPS = [*INSTALLED_APPS, "debug_toolbar"]
+
+MIDDLEWARE = [
+    *MIDDLEWARE,
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+]
+
+INTERNAL_IPS = [
+    "127.0.0.1",
+]
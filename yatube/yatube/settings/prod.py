@@ -0,0 +1,43 @@
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ["YATUBE_SECRET_KEY"]
+
+ALLOWED_HOSTS = os.environ["YATUBE_ALLOWED_HOSTS"].split(",")
+
+# templates are compiled once per process instead of on every render,
+# YATUBE_TEMPLATE_INLINE=1 also splices constant {% include %} tags
+# into the including template
+
+TEMPLATE_LOADER = (
+    "core.loaders.InliningLoader"
+    if os.getenv("YATUBE_TEMPLATE_INLINE")
+    else "django.template.loaders.cached.Loader"
+)
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "loaders": [
+                (
+                    TEMPLATE_LOADER,
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    },
+]
+
+TEMPLATE_WARMUP = True
+
+AUTOCOMPLETE_WARMUP = True
@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
 
 application = get_wsgi_application()
+
+if settings.TEMPLATE_WARMUP:
+    from core.loaders import warm_templates
+
+    warm_templates()
+
+if settings.AUTOCOMPLETE_WARMUP:
+    from posts import autocomplete
+
+    autocomplete.warm()